@@ -7,28 +7,48 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 src_dir = os.path.join(current_dir, 'src')
 sys.path.append(src_dir)
 
-from mcpi.minecraft import Minecraft
+from mcpi.minecraft import AsyncMinecraft
 from messages.message_bus import MessageBus
 from messages.message_parser import MessageParser
 from agents.agent_factory import AgentFactory
 from messages.chat_listener import ChatListener
 from utils.reflection import get_all_agents
 from agents.agent_manager import AgentManager
+from utils.connection_pool import ConnectionPool
+from utils.world_scheduler import WorldScheduler
+from utils.structure_registry import get_structure_registry
 from utils.logging import clear_prev_logs
 from utils.checkpoints import clear_prev_checkpoints
 
 # ---------------------------------------------------------------------
 # Conexión con el servidor de Minecraft
 # ---------------------------------------------------------------------
-def init_mc():
+async def init_mc():
     try:
-        mc = Minecraft.create()
+        mc = await AsyncMinecraft.create()
         print("[INFO] Conectado a Minecraft.")
         return mc
     except Exception as e:
         print("[ERROR] No se ha podido conectar a Minecraft:", e)
         sys.exit(1)
 
+# Conexiones independientes para los agentes
+POOL_SIZE = 4
+# Comandos por segundo que los agentes pueden enviar al servidor (y ráfaga máxima)
+WORLD_COMMAND_RATE = 500
+WORLD_COMMAND_BURST = 100
+
+async def init_pool():
+    pool = ConnectionPool("localhost", 4711, size=POOL_SIZE)
+    try:
+        await pool.open()
+        pool.start_health_checks()
+        print(f"[INFO] Pool de {POOL_SIZE} conexiones abierto para los agentes.")
+        return pool
+    except Exception as e:
+        print("[ERROR] No se ha podido abrir el pool de conexiones, los agentes compartirán la conexión:", e)
+        return None
+
 
 # ---------------------------------------------------------------------
 # Registro de agentes
@@ -59,7 +79,7 @@ async def main():
     clear_prev_checkpoints()
     
     # Crear el sistema
-    mc = init_mc()
+    mc = await init_mc()
 
     message_bus = MessageBus()
     parser = MessageParser(message_bus)
@@ -69,9 +89,16 @@ async def main():
 
     # Obtener la instancia Singleton del Factory
     factory = AgentFactory()
+    pool = await init_pool()
+    if pool:
+        factory.use_connection_pool(pool)
+    factory.use_world_scheduler(WorldScheduler(rate=WORLD_COMMAND_RATE, burst=WORLD_COMMAND_BURST))
     agents_path = os.path.join(src_dir, "agents")
     register_agents(factory, agents_path)
 
+    # Detectar estructuras nuevas o modificadas mientras el sistema está en marcha
+    get_structure_registry(os.path.join(current_dir, "builder_structures")).start_watching()
+
     # Iniciar el AgentManager para gestionar la creación de agentes
     manager = AgentManager(mc, message_bus)
     asyncio.create_task(manager.run())
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark de mcpi.connection.Connection.
+
+Mide peticiones por segundo de sendReceive (world.getHeight) y de envíos sin
+respuesta (world.setBlock) contra un servidor local mínimo, comparando la
+implementación original (makefile() por respuesta y select() antes de cada
+envío) con el lector persistente actual.
+
+Uso: python benchmarks/bench_connection.py [numero_de_peticiones]
+"""
+import os
+import select
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from mcpi.connection import Connection, RequestError
+
+class BaselineConnection(Connection):
+    """Comportamiento original: select() en cada envío y makefile() en cada respuesta."""
+
+    def _send(self, s):
+        while True:
+            readable, _, _ = select.select([self.socket], [], [], 0.0)
+            if not readable:
+                break
+            self.socket.recv(1500)
+        self.lastSent = s
+        self.socket.sendall(s)
+
+    def receive(self):
+        s = self.socket.makefile("r").readline().rstrip("\n")
+        if s == Connection.RequestFailed:
+            raise RequestError("%s failed" % self.lastSent.strip())
+        return s
+
+    def sendReceive(self, *data):
+        self.send(*data)
+        return self.receive()
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if line.startswith(b"world.get"):
+                self.wfile.write(b"64\n")
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def _measure(conn_cls, port, requests):
+    conn = conn_cls("127.0.0.1", port)
+    start = time.perf_counter()
+    for i in range(requests):
+        conn.sendReceive(b"world.getHeight", i, i)
+    reads = requests / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(requests):
+        conn.send(b"world.setBlock", i, 64, i, 1)
+    conn.sendReceive(b"world.getHeight", 0, 0) # Esperar a que el servidor lo procese todo
+    writes = requests / (time.perf_counter() - start)
+    conn.socket.close()
+    return reads, writes
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    server = _Server(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    print(f"{requests} peticiones por prueba")
+    print(f"{'':<10}{'getHeight/s':>14}{'setBlock/s':>14}")
+    results = {}
+    for name, cls in (("antes", BaselineConnection), ("después", Connection)):
+        results[name] = _measure(cls, port, requests)
+        print(f"{name:<10}{results[name][0]:>14.0f}{results[name][1]:>14.0f}")
+    print(f"{'mejora':<10}{results['después'][0] / results['antes'][0]:>13.2f}x"
+          f"{results['después'][1] / results['antes'][1]:>13.2f}x")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
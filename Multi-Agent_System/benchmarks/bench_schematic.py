@@ -0,0 +1,55 @@
+"""
+Benchmark del parseo de esquemáticos (.schem).
+
+Para cada fichero de builder_structures/ compara el lector NBT original
+(SimpleNBT, campo a campo sobre el stream gzip) con FastNBT (descompresión de
+una vez y recorrido de un memoryview), y mide la carga completa de
+SchematicParser hasta la lista de construcción.
+
+Uso: python benchmarks/bench_schematic.py [repeticiones]
+"""
+import gzip
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src"))
+
+from utils.schematic_parser import SimpleNBT, FastNBT, SchematicParser
+
+STRUCTURES_DIR = os.path.join(BASE_DIR, "builder_structures")
+
+def _best(func, repeat):
+    """Mejor tiempo (ms) de 'repeat' ejecuciones."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def _simple(path):
+    with gzip.open(path, "rb") as f:
+        return SimpleNBT.parse(f)
+
+def _fast(path):
+    with open(path, "rb") as f:
+        return FastNBT.parse(gzip.decompress(f.read()))
+
+def _full(path):
+    return SchematicParser(path).get_build_list()
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"{'estructura':<28}{'KB':>8}{'SimpleNBT ms':>15}{'FastNBT ms':>13}{'x':>7}{'parser ms':>12}")
+    for filename in sorted(f for f in os.listdir(STRUCTURES_DIR) if f.endswith(".schem")):
+        path = os.path.join(STRUCTURES_DIR, filename)
+        simple = _best(lambda: _simple(path), repeat)
+        fast = _best(lambda: _fast(path), repeat)
+        full = _best(lambda: _full(path), repeat)
+        size = os.path.getsize(path) / 1024
+        print(f"{filename[:-6]:<28}{size:>8.1f}{simple:>15.3f}{fast:>13.3f}{simple / fast:>7.1f}{full:>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Benchmark de extremo a extremo de /workflow run.
+
+Para cada estructura de builder_structures/ y cada estrategia de minería arranca
+un servidor RaspberryJuice simulado (utils.fake_server) con terreno plano, monta el
+sistema como StartFramework (MessageBus, AgentManager, pool de conexiones y
+WorldScheduler) y ejecuta WorkflowManager.execute_workflow hasta que el
+BuilderBot termina la construcción.
+
+Por ejecución se informa en JSON de:
+- tiempo total y duración de cada fase (explore, analyze, mine, build)
+- comandos al mundo (total y por tipo) y bytes en el cable
+- mensajes publicados en el MessageBus (total y por tipo)
+- profundidad máxima, esperas y descartes del buzón de cada agente
+- comandos al mundo y latencia p50/p95/p99 de esos comandos en cada fase
+
+Uso:
+    python benchmarks/bench_workflow.py --structures vsmall_bloque5x4 --strategies vertical
+    python benchmarks/bench_workflow.py --output report.json
+    python benchmarks/bench_workflow.py --structures big_phoenix --strategies vertical --builders 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BASE_DIR, "src"))
+
+from mcpi.connection import AsyncConnection
+from mcpi.minecraft import AsyncMinecraft
+from messages.message_bus import MessageBus
+from agents.agent_factory import AgentFactory
+from agents.agent_manager import AgentManager
+from utils.reflection import get_all_agents
+from utils.connection_pool import ConnectionPool
+from utils.world_scheduler import WorldScheduler
+from utils.fake_server import FakeRaspberryJuice
+
+STRUCTURES_DIR = os.path.join(BASE_DIR, "builder_structures")
+STRATEGIES = ("grid", "vein", "vertical")
+
+# Hitos que abren cada fase del workflow
+PHASE_MESSAGES = {"map.v1": "analyze", "materials.requirements.v1": "mine"}
+BUILD_STARTED = "Materiales recibidos"
+BUILD_FINISHED = "Construccion completada"
+BUILD_FAILED = "Error en construcción"
+
+def percentiles(samples):
+    """p50/p95/p99 (en ms) por el método del rango más cercano."""
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "p99": None}
+    ordered = sorted(samples)
+    def pick(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 3)
+    return {"count": len(ordered), "p50": pick(50), "p95": pick(95), "p99": pick(99)}
+
+class RunRecorder:
+    """Mide comandos, mensajes del bus y fases de una ejecución."""
+    ORDER = ("explore", "analyze", "mine", "build", "done")
+
+    def __init__(self):
+        self.phase = "explore"
+        self.phase_started = time.perf_counter()
+        self.phase_durations = Counter()
+        self.latencies = defaultdict(list)
+        self.bus_messages = Counter()
+        self.done = asyncio.Event()
+        self.completed = False
+
+    def switch(self, phase):
+        """Avanza a la fase indicada (las fases solo avanzan)."""
+        if self.ORDER.index(phase) <= self.ORDER.index(self.phase):
+            return
+        now = time.perf_counter()
+        self.phase_durations[self.phase] += now - self.phase_started
+        self.phase, self.phase_started = phase, now
+        if phase == "done":
+            self.done.set()
+
+    def on_chat(self, message):
+        if BUILD_STARTED in message:
+            self.switch("build")
+        elif BUILD_FINISHED in message:
+            self.completed = True
+            self.switch("done")
+        elif BUILD_FAILED in message:
+            self.switch("done")
+
+    def instrument(self, bus):
+        """
+        Envuelve AsyncConnection, AsyncMinecraft.postToChat y MessageBus.publish para
+        registrar latencias, mensajes y fases. Los hitos del chat se detectan al
+        llamar a postToChat: en el servidor llegarían con retraso, junto con los
+        comandos de construcción que el WorldWriteBuffer envía en la misma escritura.
+        Antes de cerrar una fase se vacía ese buffer, para que su duración incluya
+        el envío de sus escrituras.
+        """
+        recorder = self
+        send, send_receive = AsyncConnection.send, AsyncConnection.sendReceive
+        post_to_chat = AsyncMinecraft.postToChat
+
+        async def timed_send(conn, *data):
+            start = time.perf_counter()
+            try:
+                return await send(conn, *data)
+            finally:
+                recorder.latencies[recorder.phase].append(time.perf_counter() - start)
+
+        async def timed_send_receive(conn, *data):
+            start = time.perf_counter()
+            try:
+                return await send_receive(conn, *data)
+            finally:
+                recorder.latencies[recorder.phase].append(time.perf_counter() - start)
+
+        async def watched_post_to_chat(mc, msg):
+            if any(milestone in str(msg) for milestone in (BUILD_STARTED, BUILD_FINISHED, BUILD_FAILED)):
+                await mc.flush()
+            recorder.on_chat(str(msg))
+            return await post_to_chat(mc, msg)
+
+        publish = bus.publish
+        async def counted_publish(source_id, msg):
+            msg_type = msg.get("type", "generic.v1")
+            recorder.bus_messages[msg_type] += 1
+            if msg_type in PHASE_MESSAGES:
+                recorder.switch(PHASE_MESSAGES[msg_type])
+            return await publish(source_id, msg)
+
+        AsyncConnection.send = timed_send
+        AsyncConnection.sendReceive = timed_send_receive
+        AsyncMinecraft.postToChat = watched_post_to_chat
+        bus.publish = counted_publish
+        return lambda: (setattr(AsyncConnection, "send", send),
+                        setattr(AsyncConnection, "sendReceive", send_receive),
+                        setattr(AsyncMinecraft, "postToChat", post_to_chat))
+
+async def run_workflow(structure, strategy, args):
+    recorder = RunRecorder()
+    server = FakeRaspberryJuice(size=args.world_size, seed=args.seed, latency=args.latency, amplitude=0)
+    port = await server.start()
+
+    bus = MessageBus()
+    restore = recorder.instrument(bus)
+
+    factory = AgentFactory()
+    for name, cls in get_all_agents(os.path.join(BASE_DIR, "src", "agents")).items():
+        factory.register_agent_class(name, cls)
+    pool = ConnectionPool("127.0.0.1", port, size=args.pool_size)
+    await pool.open()
+    scheduler = WorldScheduler(rate=args.rate, burst=args.burst)
+    factory.use_connection_pool(pool)
+    factory.use_world_scheduler(scheduler)
+
+    mc = await AsyncMinecraft.create("127.0.0.1", port)
+    manager = AgentManager(mc, bus)
+    manager.setup_subscriptions()
+
+    command = f"/workflow run x=0 z=0 range={args.range} template={structure} miner.strategy={strategy}"
+    if args.builders > 1:
+        command += f" builders={args.builders} builder.mode={args.builder_mode}"
+    start = time.perf_counter()
+    try:
+        await manager.workflow_manager.execute_workflow(command)
+        await asyncio.wait_for(recorder.done.wait(), args.timeout)
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        wall_time = time.perf_counter() - start
+        recorder.switch("done")
+        restore()
+        factory.use_connection_pool(None)
+        factory.use_world_scheduler(None)
+        await scheduler.close()
+        await pool.close()
+        await mc.close()
+        await server.stop()
+
+    commands = {k: v for k, v in server.counters.items() if k not in ("invalid", "unsupported")}
+    # Una construcción completada tiene que haber enviado comandos en su fase
+    if recorder.completed and not recorder.latencies["build"]:
+        raise RuntimeError(f"{structure}/{strategy}: la fase build no registró comandos al mundo")
+    return {
+        "structure": structure,
+        "strategy": strategy,
+        "builders": args.builders,
+        "completed": recorder.completed,
+        "wall_time_s": round(wall_time, 3),
+        "world_commands": sum(commands.values()),
+        "world_commands_by_type": dict(sorted(commands.items())),
+        "bytes_on_wire": server.bytes_in + server.bytes_out,
+        "bytes_sent": server.bytes_in,
+        "bytes_received": server.bytes_out,
+        "bus_messages": sum(recorder.bus_messages.values()),
+        "bus_messages_by_type": dict(sorted(recorder.bus_messages.items())),
+        "mailboxes": {agent_id: {k: stats[k] for k in ("max_depth", "blocked", "dropped", "coalesced")}
+                      for agent_id, stats in sorted(bus.mailbox_stats().items())},
+        "phases": {
+            phase: {"duration_s": round(recorder.phase_durations[phase], 3),
+                    "world_commands": len(recorder.latencies[phase]),
+                    "world_command_latency_ms": percentiles(recorder.latencies[phase])}
+            for phase in ("explore", "analyze", "mine", "build")
+        },
+    }
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+def main():
+    structures = sorted(f[:-len(".schem")] for f in os.listdir(STRUCTURES_DIR) if f.endswith(".schem"))
+
+    parser = argparse.ArgumentParser(description="Benchmark de /workflow run contra un servidor simulado")
+    parser.add_argument("--structures", nargs="+", default=structures, choices=structures)
+    parser.add_argument("--strategies", nargs="+", default=list(STRATEGIES), choices=STRATEGIES)
+    parser.add_argument("--range", type=int, default=20, help="radio de exploración")
+    parser.add_argument("--latency", type=float, default=0.0, help="latencia simulada por respuesta (s)")
+    parser.add_argument("--world-size", type=int, default=128)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=500.0, help="comandos por segundo del WorldScheduler")
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--builders", type=int, default=1, help="BuilderBots que construyen en paralelo")
+    parser.add_argument("--builder-mode", default="tiles", choices=("tiles", "layers"))
+    parser.add_argument("--timeout", type=float, default=360.0, help="tiempo máximo por ejecución (s)")
+    parser.add_argument("--output", help="fichero JSON de salida (por defecto, stdout)")
+    args = parser.parse_args()
+
+    runs = []
+    for structure in args.structures:
+        for strategy in args.strategies:
+            print(f"[BENCH] {structure} / {strategy}...", file=sys.stderr)
+            result = asyncio.run(run_workflow(structure, strategy, args))
+            print(f"[BENCH]   {result['wall_time_s']} s, {result['world_commands']} comandos, "
+                  f"completado={result['completed']}", file=sys.stderr)
+            runs.append(result)
+
+    report = {
+        "revision": git_revision(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("structures", "strategies", "output")},
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ class AgentFactory:
     """
     _instance = None
     _agent_registry = {} 
+    _connection_pool = None
+    _world_scheduler = None
 
     def __new__(cls):
         """
@@ -27,10 +29,28 @@ class AgentFactory:
         
         cls._agent_registry[agent_name] = agent_class
 
+    @classmethod
+    def use_connection_pool(cls, pool):
+        """
+        Configura el pool de conexiones. Con un pool, cada agente recibe su propia
+        sesión en lugar de la conexión global 'mc'.
+        """
+        cls._connection_pool = pool
+
+    @classmethod
+    def use_world_scheduler(cls, scheduler):
+        """
+        Configura el planificador de comandos. Con un planificador, los comandos de
+        cada agente pasan por sus colas de prioridad y su limitador de tasa.
+        """
+        cls._world_scheduler = scheduler
+
     def create_agent(self, agent_type: str, mc, message_bus, agent_id: str = None):
         """
         Crea una instancia de agente basada en el tipo solicitado.
         Si no se especifica agent_id, se usa el agent_type (cuidado con duplicados).
+        Si hay un pool de conexiones configurado, se inyecta la sesión del agente,
+        y si hay un planificador, sus comandos pasan por él.
         """
         agent_class = self._agent_registry.get(agent_type)
         
@@ -39,6 +59,11 @@ class AgentFactory:
         
         # Usar el ID de la instancia o el tipo de agente por defecto
         final_id = agent_id if agent_id else agent_type
+
+        if self._connection_pool is not None:
+            mc = self._connection_pool.session(final_id)
+        if self._world_scheduler is not None:
+            mc = self._world_scheduler.session(final_id, mc)
         
         return agent_class(final_id, mc, message_bus)
 
@@ -70,7 +70,7 @@ class AgentManager:
             
             success_msg = f"Agente creado: {agent_id} ({agent_type})"
             self.logger.info(success_msg)
-            self.mc.postToChat(success_msg)
+            await self.mc.postToChat(success_msg)
             return new_agent
         except Exception as e:
             self.logger.error(f"Failed to create agent {agent_id}: {e}")
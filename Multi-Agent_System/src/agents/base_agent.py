@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from agents.state_model import State
 from utils.logging import Logger
 from utils.checkpoints import Checkpoints
+from messages.mailbox import BLOCK
 
 class BaseAgent(ABC):
     """
@@ -13,8 +14,15 @@ class BaseAgent(ABC):
     - Manejo de comandos (pause/resume/stop/update)
     - Logging estructurado
     - Checkpointing para recuperación
-    - Ejecución asíncrona
+    - Ejecución asíncrona dirigida por eventos: el agente duerme hasta que le llega
+      un mensaje o se le despierta con wake()
     """
+    # Acciones de decide() que no hacen nada hasta que llegue un mensaje o termine una tarea en segundo plano
+    WAITING_ACTIONS = frozenset({'idle'})
+    # Límite del buzón del agente y política al llenarse (ver messages.mailbox)
+    MAILBOX_SIZE = 1024
+    MAILBOX_OVERFLOW = BLOCK
+
     def __init__(self, agent_id: str, mc, message_bus):
         self.mc = mc
         self.id = agent_id
@@ -23,6 +31,7 @@ class BaseAgent(ABC):
         self.context = {}
         self.logger = Logger(agent_id, log_file_name=self.__class__.__name__)
         self.checkpoint = Checkpoints(agent_id)
+        self._wakeup = asyncio.Event()
 
     # Métodos abstractos PDA
     @abstractmethod
@@ -44,13 +53,12 @@ class BaseAgent(ABC):
         Configura las suscripciones a eventos del bus.
         Las subclases deben llamar a super().setup_subscriptions().
         """
-        self.bus.register_agent(self.id)
-        
-        # Comandos comunes a todos los agentes
-        common_commands = ["pause", "resume", "stop", "status", "help"]
+        self.bus.register_agent(self.id, on_message=self.wake,
+                                max_size=self.MAILBOX_SIZE, overflow=self.MAILBOX_OVERFLOW)
         
-        for cmd in common_commands:
-            self.bus.subscribe(self.id, f"command.{cmd}.v1")
+        # Todos los comandos (command.pause.v1, command.plan.v1...). Los que no son para
+        # este agente se filtran en handle_incoming_message y handle_command
+        self.bus.subscribe(self.id, "command.*.v1")
     async def handle_incoming_message(self, msg):
         msg_type = msg.get("type", "")
         payload = msg.get("payload", {})
@@ -74,6 +82,17 @@ class BaseAgent(ABC):
             else:
                  self.logger.warning(f"Formato de mensaje desconocido: {msg_type}")
 
+    def wake(self):
+        """Despierta el bucle principal: llegada de un mensaje, cambio de estado o fin de una tarea en segundo plano."""
+        self._wakeup.set()
+
+    async def wait_for_work(self):
+        """Duerme sin consumir CPU hasta que haya mensajes en la cola o alguien llame a wake()."""
+        if self.bus.pending(self.id):
+            return
+        await self._wakeup.wait()
+        self._wakeup.clear()
+
     # Bucle principal
     async def run(self):
         """Bucle principal del agente."""
@@ -86,24 +105,21 @@ class BaseAgent(ABC):
             # Perceive incluye recibir mensajes en todos los estados
             await self.perceive()
             
-            if self.state == State.STOPPED:
-                await asyncio.sleep(0.5)
-                continue
-                
-            if self.state == State.PAUSED:
-                await asyncio.sleep(0.2)
-                continue
-            if self.state == State.IDLE:
-                await asyncio.sleep(0.1)
-                continue
             if self.state == State.RUNNING:
                 try:
                     await self.decide()
+                    waiting = self.context.get('next_action') in self.WAITING_ACTIONS
                     await self.act()
                 except Exception as e:
                     self.logger.error(f"Error en ciclo PDA: {e}")
                     await self.set_state(State.ERROR, reason=str(e))
-            await asyncio.sleep(0) 
+                    continue
+                if not waiting:
+                    await asyncio.sleep(0)
+                    continue
+
+            # IDLE, PAUSED, STOPPED, ERROR o esperando: dormir hasta que haya trabajo
+            await self.wait_for_work()
 
     # Máquina de estados
     async def set_state(self, new_state: State, reason=""):
@@ -111,6 +127,7 @@ class BaseAgent(ABC):
         prev_state = self.state
         self.state = new_state
         self.logger.log_agent_transition(prev_state, new_state, reason)
+        self.wake()
         
         # si es PAUSED o ERROR, save checkpoint
         if new_state in (State.ERROR, State.PAUSED):
@@ -123,19 +140,19 @@ class BaseAgent(ABC):
         """Maneja comandos comunes. Las subclases deben overridear y llamar a super()."""
         if command == "pause":
             await self.set_state(State.PAUSED, "paused by command")
-            self.mc.postToChat(f"[{self.id}] Pausado")
+            await self.mc.postToChat(f"[{self.id}] Pausado")
         elif command == "resume":
             self.context = self.checkpoint.load()
             await self.set_state(State.RUNNING, "resumed")
-            self.mc.postToChat(f"[{self.id}] Reanudado")
+            await self.mc.postToChat(f"[{self.id}] Reanudado")
         elif command == "stop":
             await self.set_state(State.STOPPED, "stopped by command")
-            self.mc.postToChat(f"[{self.id}] Detenido")
+            await self.mc.postToChat(f"[{self.id}] Detenido")
         elif command == "update":
             if payload:
                 self.context.update(payload)
             await self.set_state(State.RUNNING, "updated configuration")
-            self.mc.postToChat(f"[{self.id}] Config actualizado")
+            await self.mc.postToChat(f"[{self.id}] Config actualizado")
             
         elif command == "status":
             import json
@@ -153,6 +170,6 @@ class BaseAgent(ABC):
             cmds = ["pause", "resume", "stop", "status", "help"]
             msg = f"Comandos globales: {' | '.join(cmds)}"
             self.logger.info(msg)
-            self.mc.postToChat(msg)
+            await self.mc.postToChat(msg)
         else:
             self.logger.error("unknown_command", context={"command": command})
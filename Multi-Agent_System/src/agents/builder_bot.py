@@ -1,11 +1,13 @@
 import asyncio
 import time
-import datetime
 import os
 from agents.base_agent import BaseAgent
 from agents.state_model import State
-from utils.reflection import get_all_structures
-from utils.block_translator import get_block_id
+from utils.structure_registry import get_structure_registry
+from utils.write_planner import WritePlanner
+from utils.build_ledger import BuildLedger, CrewHalted
+from messages.envelope import Envelope
+from messages.mailbox import COALESCE, DROP_NEWEST
 
 # Ruta dinámica a builder_structures
 STRUCTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),'builder_structures')
@@ -15,6 +17,12 @@ class BuilderBot(BaseAgent):
     # Mantiene registro de las instancias para evitar respuestas duplicadas en broadcasts informativos
     instances = []
 
+    # Construyendo en segundo plano o esperando el inventario del MinerBot
+    WAITING_ACTIONS = BaseAgent.WAITING_ACTIONS | {'wait_for_build', 'wait_materials'}
+
+    # Segundos sin progreso de ninguna parte antes de abandonar una construcción repartida
+    CREW_TIMEOUT = 60.0
+
     def __init__(self, agent_id, mc, bus):
         super().__init__(agent_id, mc, bus)     
         self.context.update({
@@ -25,14 +33,19 @@ class BuilderBot(BaseAgent):
             'requirements': None, #Requisitos de materiales para construir
             'inventory': {}, # Almacena inventario del builderBot, aquí se van guardando los bloques que va mandando el minero
             'build_index': 0, # Indice de construcción donde se va poner el primer bloque
+            'build_total': 0, # Bloques del plan actual
+            'build_crew': [], # BuilderBots ayudantes con los que se reparte la construcción
+            'build_mode': 'tiles', # Reparto entre builders: 'tiles' (franjas xz) o 'layers' (bandas de capas)
+            'build_job': None, # Parte asignada de una construcción repartida
             'last_missing_msg_time': 0 # Tiempo del último mensaje de materiales faltantes
         })
         BuilderBot.instances.append(agent_id)
+        self.ledger = None # Progreso compartido de la construcción repartida en curso
         
         # Plan por defecto: Penúltima estructura (small_ovni) cargamos una por defecto
         try:
-             structures = get_all_structures(STRUCTURES_DIR)
-             names = sorted(list(structures.keys()))
+             structures = get_structure_registry(STRUCTURES_DIR)
+             names = sorted(structures)
              if len(names) >= 2:
                  self.context['current_plan'] = names[-2]
              elif names:
@@ -46,16 +59,18 @@ class BuilderBot(BaseAgent):
 
     def setup_subscriptions(self):
         """Suscripciones específicas del BuilderBot."""
+        # Los comandos específicos (plan, build, bom) llegan por la suscripción común a command.*.v1
         super().setup_subscriptions()
-        
-        # Suscribirse a los comandos específicos
-        specific_commands = ["plan", "build", "bom"]
-        for cmd in specific_commands:
-            self.bus.subscribe(self.id, f"command.{cmd}.v1")
             
         # Suscribirse a datos necesarios
-        self.bus.subscribe(self.id, "map.v1") # Recibir mapas del Explorer
-        self.bus.subscribe(self.id, "inventory.v1")
+        # Recibir mapas del Explorer. Un escaneo grande no puede llenar el buzón: se guardan
+        # los primeros candidatos (el Explorer publica primero las zonas más grandes)
+        self.bus.subscribe(self.id, "map.v1", max_pending=8, overflow=DROP_NEWEST)
+        # Inventario y progreso son instantáneas: solo importa la última de cada emisor
+        self.bus.subscribe(self.id, "inventory.v1", overflow=COALESCE)
+        # Construcción repartida entre varios builders
+        self.bus.subscribe(self.id, "build.assignment.v1")
+        self.bus.subscribe(self.id, "build.progress.v1", overflow=COALESCE)
 
     async def perceive(self):
         """
@@ -63,7 +78,7 @@ class BuilderBot(BaseAgent):
         """
         try:
             # Comprovar mensajes
-            msg = await asyncio.wait_for(self.bus.receive(self.id), timeout=0.01)
+            msg = self.bus.receive_nowait(self.id)
             if msg:
                 # Si estamos en un Workflow, ignoramos mensajes de agentes fuera del grupo
                 sender = msg.get("source")
@@ -85,7 +100,7 @@ class BuilderBot(BaseAgent):
                     current_phase = self.context.get('task_phase')
                     if current_phase in ['IDLE', 'ANALYZING_MAP'] and self.context.get('current_plan'):
                          self.logger.info(f"{self.id} Received map candidate.")
-                         self.context['latest_map'] = payload
+                         self.context['latest_map'] = dict(payload)
                          self.context['task_phase'] = 'ANALYZING_MAP'
                          
                          # Despertar el bucle del agente
@@ -95,12 +110,20 @@ class BuilderBot(BaseAgent):
                 
                 elif msg_type == "inventory.v1":
                     self.logger.info(f"{self.id} Received inventory data.")
-                    self.context['inventory'] = payload
+                    self.context['inventory'] = dict(payload)
                     if self.context['task_phase'] == 'WAITING_MATERIALS':
                         await self.set_state(State.RUNNING, "Inventory Received")
 
-        except asyncio.TimeoutError:
-            pass
+                elif msg_type == "build.assignment.v1":
+                    await self._accept_assignment(dict(payload))
+
+                elif msg_type == "build.progress.v1":
+                    if self.ledger and payload.get("job_id") == self.ledger.job_id:
+                        if msg.get("status") == "FAILURE":
+                            self.ledger.halt(payload["part"], payload.get("reason", "failed"))
+                        else:
+                            self.ledger.record(payload["part"], payload.get("layer"))
+
         except Exception as e:
             self.logger.error(f"Error en perceive (mensajes): {e}")
 
@@ -124,9 +147,9 @@ class BuilderBot(BaseAgent):
                     self.context['task_phase'] = 'IDLE'
                     return
     
-                structures = get_all_structures(STRUCTURES_DIR)
+                structures = get_structure_registry(STRUCTURES_DIR)
                 if plan_name not in structures:
-                    self.mc.postToChat(f"[{self.id}] Plan {plan_name} no encontrado.")
+                    await self.mc.postToChat(f"[{self.id}] Plan {plan_name} no encontrado.")
                     self.context['task_phase'] = 'IDLE'
                     return
     
@@ -160,9 +183,8 @@ class BuilderBot(BaseAgent):
                 self.context['target_height'] = zone_info.get('average_height', 0)
                 
                 # Resetear progreso construcción
-                raw_blocks = structure.get_blocks()
-                # Ordenar por capa por capa
-                self.context['blocks_to_build'] = sorted(raw_blocks, key=lambda k: (k['y'], k['x'], k['z']))
+                # El plan se genera capa a capa al construir; solo se guarda el cursor
+                self.context['build_total'] = len(structure.get_build_plan())
                 self.context['build_index'] = 0
                 
                 self.context['next_action'] = 'request_materials'
@@ -190,7 +212,7 @@ class BuilderBot(BaseAgent):
                 t_y = self.context.get('target_height', 65)
                 coords_str = f"({int(t_pos[0])}, {int(t_y)}, {int(t_pos[1])})" if t_pos else "(?, ?, ?)"
                 
-                self.mc.postToChat(f"[{self.id}] Materiales recibidos. Listo para construir en {coords_str}")
+                await self.mc.postToChat(f"[{self.id}] Materiales recibidos. Listo para construir en {coords_str}")
                 self.logger.info(f"{self.id} Materiales OK. Iniciando construcción.")
                 self.context['next_action'] = 'start_building'
             else: 
@@ -217,42 +239,120 @@ class BuilderBot(BaseAgent):
             plan_name = self.context.get('current_plan')
             bom = self.context.get('requirements')
             
-            msg = {
-                
-                "type": "materials.requirements.v1",
-                "source": self.id,
-                "target": "BROADCAST",
-                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z'),
-                "status": "SUCCESS",
-                    "payload":{
+            msg = Envelope(
+                type="materials.requirements.v1",
+                source=self.id,
+                payload={
                     "structure": plan_name,
                     "requirements": bom,
                     "builder_id": self.id,
                     "build_position": self.context.get('target_position')}
-                }
+                )
             
             # Publicar Petición
             await self.bus.publish("materials.requirements.v1", msg)
             self.logger.info(f"Peticion material enviada: {bom}")
             
-            self.mc.postToChat(f"[{self.id}] Mapa valido para construir {plan_name}. Enviando BOM al MinerBot.")
+            await self.mc.postToChat(f"[{self.id}] Mapa valido para construir {plan_name}. Enviando BOM al MinerBot.")
             self.context['task_phase'] = 'WAITING_MATERIALS'
             
         elif action == 'start_building' or action == 'resume_building':
              self.logger.info("Iniciando/Retomando construcción...")
+             if action == 'start_building' and self.context.get('build_crew'):
+                 await self._assign_parts()
              self.context['task_phase'] = 'BUILDING'
              self.context['building_in_progress'] = True
-             asyncio.create_task(self._build_structure_task())
+             task = asyncio.create_task(self._build_structure_task())
+             task.add_done_callback(lambda _: self.wake())
              self.context['next_action'] = 'wait_for_build'
         
         elif action == 'idle':
             pass
 
+    async def _publish(self, msg_type, payload, target="BROADCAST", status="RUNNING"):
+        await self.bus.publish(self.id, Envelope(type=msg_type, source=self.id, target=target,
+                                                 payload=payload, status=status))
+
+    async def _assign_parts(self):
+        """Reparte la construcción entre este builder (parte 0) y su equipo de ayudantes."""
+        crew = self.context['build_crew']
+        job = {
+            "job_id": f"{self.id}-{int(time.time() * 1000)}",
+            "structure": self.context.get('current_plan'),
+            "mode": self.context.get('build_mode', 'tiles'),
+            "parts": len(crew) + 1,
+            "lead": self.id,
+            "target_position": self.context.get('target_position'),
+            "target_height": self.context.get('target_height'),
+        }
+        self.context['build_job'] = {**job, "part": 0}
+        self.context['build_index'] = 0
+        self.ledger = BuildLedger(job["job_id"], job["parts"])
+        for part, helper_id in enumerate(crew, start=1):
+            await self._publish("build.assignment.v1", {**job, "part": part}, target=helper_id)
+        self.logger.info(f"Construccion repartida en {job['parts']} partes ({job['mode']}) con {crew}")
+
+    async def _accept_assignment(self, job):
+        """Ayudante: construye la parte que le asigna el builder principal."""
+        if self.context.get('task_phase') not in ('IDLE', None) or self.context.get('building_in_progress'):
+            self.logger.error(f"{self.id} ocupado, no puede aceptar la parte {job.get('part')} de {job.get('job_id')}")
+            # Avisar al principal para que no espere a esta parte hasta el timeout
+            await self._publish("build.progress.v1",
+                                {"job_id": job.get('job_id'), "part": job.get('part'), "reason": "rejected"},
+                                target=job.get('lead', "BROADCAST"), status="FAILURE")
+            return
+        self.context.update({
+            'current_plan': job['structure'],
+            'target_position': job['target_position'],
+            'target_height': job['target_height'],
+            'build_job': job,
+            'build_index': 0,
+            'task_phase': 'BUILDING',
+            'building_in_progress': False,
+        })
+        self.ledger = BuildLedger(job['job_id'], job['parts'])
+        await self.set_state(State.RUNNING, "Build Part Assigned")
+
+    async def _report_progress(self, job, layer):
+        """Anota en el ledger y publica que esta parte ha terminado lo que hay bajo 'layer' (None = todo)."""
+        # Las capas anteriores tienen que haber salido del WorldWriteBuffer antes de
+        # que otra parte, con su propia conexión, coloque encima
+        await self.mc.flush()
+        self.ledger.record(job['part'], layer)
+        await self._publish("build.progress.v1",
+                            {"job_id": job['job_id'], "part": job['part'], "layer": layer},
+                            status="RUNNING" if layer is not None else "SUCCESS")
+
+    async def _report_halt(self, job, reason):
+        """Avisa al resto del equipo de que esta parte ha dejado de construir."""
+        self.ledger.halt(job['part'], reason)
+        await self._publish("build.progress.v1",
+                            {"job_id": job['job_id'], "part": job['part'], "reason": reason},
+                            status="FAILURE")
+
+    async def _stop_building(self, job):
+        """Pausa o stop durante la construcción: se conserva el progreso y se avisa al equipo."""
+        reason = "paused" if self.context.get('paused') else "stopped"
+        self.logger.info(f"Construccion {'PAUSADA' if reason == 'paused' else 'DETENIDA'}.")
+        self.context['building_in_progress'] = False
+        if job:
+            await self._report_halt(job, reason)
+
     async def _build_structure_task(self):
         """Tarea de construcción en background. Checkpoint-aware."""
         try:
-            blocks = self.context.get('blocks_to_build', [])
-            idx = self.context.get('build_index', 0)
+            plan_name = self.context.get('current_plan')
+            structures = get_structure_registry(STRUCTURES_DIR)
+            if plan_name not in structures:
+                raise ValueError(f"Plan {plan_name} no encontrado")
+            plan = structures[plan_name].get_build_plan()
+
+            # En una construcción repartida solo se construye la parte asignada
+            job = self.context.get('build_job')
+            if job:
+                plan = plan.partition(job['parts'], job['mode'])[job['part']]
+                if self.ledger is None or self.ledger.job_id != job['job_id']:
+                    self.ledger = BuildLedger(job['job_id'], job['parts'])
             
             center = self.context.get('target_position') 
             if not center: return
@@ -261,48 +361,47 @@ class BuilderBot(BaseAgent):
             base_y = self.context.get('target_height')
             if base_y is None: base_y = 65
 
-            while idx < len(blocks):
-                if self.context.get('paused'):
-                    self.logger.info("Construccion PAUSADA.")
-                    self.context['build_index'] = idx
-                    self.context['building_in_progress'] = False
-                    return 
-
-                # Comprobar Stop
-                if self.context.get('interrupt'):
-                    self.logger.info("Construccion DETENIDA.")
-                    self.context['build_index'] = idx
-                    self.context['building_in_progress'] = False
+            # Construccion por lotes dentro de una misma capa, agrupados en cuboides
+            layer = None
+            for cursor, batch in plan.batches(self.context.get('build_index', 0), batch_size=256):
+                # Comprobar pausa y stop
+                if self.context.get('paused') or self.context.get('interrupt'):
+                    await self._stop_building(job)
                     return
 
-                # Construccion por lotes
-                batch_size = 5
-                for _ in range(batch_size):
-                    if idx >= len(blocks): break
-                    
-                    b = blocks[idx]
-                    abs_x = int(start_x + b['x'])
-                    abs_y = int(base_y + b['y'])
-                    abs_z = int(start_z + b['z'])
-                    
-                    raw_name = b['block']
-                    block_id = get_block_id(raw_name)
-                                        
-                    self.mc.setBlock(abs_x, abs_y, abs_z, block_id)
-                    idx += 1
+                # Capa nueva: esperar a que el resto de partes haya colocado el soporte
+                if job and batch[0, 1] != layer:
+                    layer = int(batch[0, 1])
+                    await self._report_progress(job, layer)
+                    await self.ledger.wait_ready(layer, self.CREW_TIMEOUT)
+
+                planner = WritePlanner()
+                for x, y, z, block_id, data in batch.tolist():
+                    planner.add(start_x + x, base_y + y, start_z + z, block_id, data)
+                await planner.apply(self.mc)
                 
                 # Actualizar progreso
-                self.context['build_index'] = idx
+                self.context['build_index'] = cursor
                 
-                await asyncio.sleep(0.2)
-
+                # Ceder el turno; el ritmo de escritura lo marca el WorldScheduler
+                await asyncio.sleep(0)
+
+            if job:
+                await self._report_progress(job, None)
+                if job['part'] != 0:
+                    # Ayudante: su parte está hecha, el principal anuncia el final
+                    self.logger.info(f"Parte {job['part']} de {job['job_id']} completada.")
+                    self.context.update({'task_phase': 'IDLE', 'building_in_progress': False,
+                                         'build_index': 0, 'build_job': None})
+                    return
+                await self.ledger.wait_done(self.CREW_TIMEOUT)
+                self.context['build_job'] = None
 
             # Construccion finalizada
-            self.mc.postToChat(f"[{self.id}] Construccion completada en ({start_x}, {base_y}, {start_z})")
+            await self.mc.postToChat(f"[{self.id}] Construccion completada en ({start_x}, {base_y}, {start_z})")
             self.context['task_phase'] = 'IDLE'
             self.context['building_in_progress'] = False
             self.context['build_index'] = 0
-            self.context['blocks_to_build'] = []
 
             # Limpieza de memoria
             self.context['task_phase'] = 'IDLE'
@@ -311,13 +410,42 @@ class BuilderBot(BaseAgent):
             self.context['inventory'] = {}    # Olvidar materiales
             self.context['latest_map'] = None   # Resetear mapa para obligar a explorar de nuevo
             
+        except (CrewHalted, asyncio.TimeoutError) as e:
+            if self.context.get('paused') or self.context.get('interrupt'):
+                # Esta parte se ha pausado o detenido mientras esperaba al resto
+                await self._stop_building(self.context.get('build_job'))
+                return
+            # Otra parte se ha parado o no responde: se abandona la construcción repartida
+            # en vez de volver a 'resume_building' y esperar otra vez sin fin
+            msg = f"Construccion repartida abandonada: {e}"
+            self.logger.error(msg)
+            await self.mc.postToChat(f"{self.id}: {msg}")
+            job = self.context.get('build_job')
+            if job:
+                await self._report_halt(job, "abandoned" if isinstance(e, CrewHalted) else "timeout")
+            self.context.update({'task_phase': 'IDLE', 'building_in_progress': False,
+                                 'build_index': 0, 'build_job': None})
+            self.checkpoint.save(self.context)
+
         except Exception as e:
             msg = f"Error en construcción: {e}"
             self.logger.error(msg)
-            self.mc.postToChat(f"{self.id}: {msg}")
+            await self.mc.postToChat(f"{self.id}: {msg}")
             self.context['building_in_progress'] = False
             self.checkpoint.save(self.context)
 
+    async def _halt_crew(self, command, args):
+        """Pausa o stop en una construcción repartida: el principal lo pasa a sus ayudantes."""
+        job = self.context.get('build_job')
+        if not job:
+            return
+        if job['part'] == 0:
+            for helper_id in self.context.get('build_crew') or []:
+                await self._publish(f"command.{command}.v1", {"id": helper_id, "args": args}, target=helper_id)
+        # Despierta la espera del ledger para que la tarea propia vea la pausa o el stop
+        if self.ledger and self.ledger.job_id == job['job_id']:
+            self.ledger.halt(job['part'], "paused" if command == "pause" else "stopped")
+
     async def handle_command(self, command: str, payload=None):
         self.logger.info(f"Builder Command: {command}")
         """Manejo de comandos específicos (plan, bom, build) + base."""
@@ -327,9 +455,10 @@ class BuilderBot(BaseAgent):
         if command == "stop":
             msg = f"[{self.id}] Detenido"
             self.logger.info(msg)
-            self.mc.postToChat(msg)
+            await self.mc.postToChat(msg)
             
             self.context['interrupt'] = True
+            await self._halt_crew(command, args)
             
             waited = 0
             while self.context.get("building_in_progress", False) and waited < 50:
@@ -343,10 +472,12 @@ class BuilderBot(BaseAgent):
             val = args[0] if args else "1"
             should_pause = (val in ["1", "true", "on", "yes"])
             self.context["paused"] = should_pause
+            if should_pause:
+                await self._halt_crew(command, args)
             
             msg = f"[{self.id}] Pausado"
             self.logger.info(msg)
-            self.mc.postToChat(msg)
+            await self.mc.postToChat(msg)
             
             waited = 0
             while self.context.get("building_in_progress", False) and waited < 20:
@@ -366,7 +497,7 @@ class BuilderBot(BaseAgent):
             self.context["interrupt"] = False
             self.context["building_in_progress"] = False
             
-            self.mc.postToChat(f"[{self.id}] Reanudado")
+            await self.mc.postToChat(f"[{self.id}] Reanudado")
             await self.set_state(State.RUNNING, "resume command")
             return
 
@@ -381,20 +512,20 @@ class BuilderBot(BaseAgent):
                 is_leader = len(BuilderBot.instances) > 0 and self.id == BuilderBot.instances[0]
 
                 if is_direct or is_leader:
-                    structures = get_all_structures(STRUCTURES_DIR)
-                    names = sorted(list(structures.keys()))
+                    structures = get_structure_registry(STRUCTURES_DIR)
+                    names = sorted(structures)
                     msg = f"Planes disponibles: {', '.join(names)}"
                     self.logger.info(msg)
-                    self.mc.postToChat(msg)
+                    await self.mc.postToChat(msg)
                 return
 
             elif subcmd == "set":
                 # Comprobar Ocupado
                 if self.context.get('task_phase') not in ('IDLE', None):
-                     self.mc.postToChat(f"[{self.id}] Ocupado ({self.context.get('task_phase')}). Usa stop primero.")
+                     await self.mc.postToChat(f"[{self.id}] Ocupado ({self.context.get('task_phase')}). Usa stop primero.")
                      return
 
-                structures = get_all_structures(STRUCTURES_DIR)
+                structures = get_structure_registry(STRUCTURES_DIR)
                 
                 # Buscar si algún argumento coincide con un template
                 template_name = None
@@ -408,33 +539,33 @@ class BuilderBot(BaseAgent):
                     msg = f"[{self.id}] Plan establecido a {template_name}"
                     self.logger.info(msg)
                     if not payload.get("silent"):
-                        self.mc.postToChat(msg)
+                        await self.mc.postToChat(msg)
                     
                     # Si ya tenemos un mapa reciente, cambiamos a fase de analisis
                     if self.context.get('latest_map'):
                          self.context['task_phase'] = 'ANALYZING_MAP'
                          await self.set_state(State.RUNNING, "Plan Set with Map Ready")
                 else:
-                    self.mc.postToChat(f"[{self.id}] Plantilla no encontrada en argumentos.")
+                    await self.mc.postToChat(f"[{self.id}] Plantilla no encontrada en argumentos.")
                 return
 
         elif command == "bom":
             # ./builder bom <id>
             plan_name = self.context.get('current_plan')
             if not plan_name:
-                self.mc.postToChat(f"[{self.id}] No hay plan establecido.")
+                await self.mc.postToChat(f"[{self.id}] No hay plan establecido.")
                 return
 
-            structures = get_all_structures(STRUCTURES_DIR)
+            structures = get_structure_registry(STRUCTURES_DIR)
             if plan_name in structures:
                 try:
                     structure = structures[plan_name]
                     if hasattr(structure, 'get_bom'):
                         bom = structure.get_bom()
                         msg = f"{self.id} BOM para {plan_name}: {bom}"
-                        self.mc.postToChat(msg)
+                        await self.mc.postToChat(msg)
                     else:
-                        self.mc.postToChat(f"Estructura {plan_name} no tiene BOM.")
+                        await self.mc.postToChat(f"Estructura {plan_name} no tiene BOM.")
                 except Exception as e:
                     self.logger.error(f"Error obteniendo BOM: {e}")
             return
@@ -443,26 +574,26 @@ class BuilderBot(BaseAgent):
             # ./builder build <id>
             plan_name = self.context.get('current_plan')
             if not plan_name:
-                 self.mc.postToChat(f"[{self.id}] No hay plan. Usa 'plan set' primero.")
+                 await self.mc.postToChat(f"[{self.id}] No hay plan. Usa 'plan set' primero.")
                  return
             
             # Comprobar mapa
             if not self.context.get('latest_map'):
-                self.mc.postToChat(f"[{self.id}] Esperando el mapa del terreno")
+                await self.mc.postToChat(f"[{self.id}] Esperando el mapa del terreno")
             else:
-                self.mc.postToChat(f"[{self.id}] Mapa presente. Analizando...")
+                await self.mc.postToChat(f"[{self.id}] Mapa presente. Analizando...")
                 self.context['task_phase'] = 'ANALYZING_MAP'
             return
 
         if command == "status":
              target = f"({self.context.get('target_position')})" if self.context.get('target_position') else "None"
              msg = f"[{self.id}] Estado: {self.state.name} | Plan: {self.context.get('current_plan')} | Fase: {self.context.get('task_phase')} | Pos: {target}"
-             self.mc.postToChat(msg)
+             await self.mc.postToChat(msg)
              return
 
         elif command == "help":
              msg = f"[{self.id}] Comandos específicos: build [id=<AgentID>] | plan list [id=<AgentID>] | plan set <Template> [id=<AgentID>] | bom [id=<AgentID>]"
-             self.mc.postToChat(msg)
+             await self.mc.postToChat(msg)
              pass
              
         # Delegar al padre si no es uno de los nuestros
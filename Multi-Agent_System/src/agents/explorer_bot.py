@@ -1,8 +1,10 @@
 import asyncio
 import asyncio
-import datetime
 from agents.base_agent import BaseAgent
 from agents.state_model import State
+from utils.write_planner import WritePlanner
+from utils.heightmap import HeightmapProvider
+from messages.envelope import Envelope
 
 class ExplorerBot(BaseAgent):
     """
@@ -12,20 +14,22 @@ class ExplorerBot(BaseAgent):
     - Informa al BuilderBot y MinerBot mediante el MessageBus
     - Sigue el ciclo PDA (Perception → Decision → Action)
     """
+    # El escaneo corre en segundo plano y despierta al agente al terminar
+    WAITING_ACTIONS = BaseAgent.WAITING_ACTIONS | {'wait_for_scan'}
+
     def __init__(self, agent_id, mc, bus):
         super().__init__(agent_id, mc, bus)
         self.posX = 0
         self.posZ = 0     
         self.range = 15 # rango por defecto
+        self.heightmap = HeightmapProvider(mc)
 
     async def perceive(self):
         try:
             # Comprovar mensajes
-            msg = await asyncio.wait_for(self.bus.receive(self.id), timeout=0.01)
+            msg = self.bus.receive_nowait(self.id)
             if msg:
                 await self.handle_incoming_message(msg)
-        except asyncio.TimeoutError:
-            pass
         except Exception as e:
             self.logger.error(f"Error en perceive (mensajes): {e}")
             
@@ -75,7 +79,8 @@ class ExplorerBot(BaseAgent):
         if action == "scan_environment":
             self.logger.info("Lanzando escaneo en background...")
             self.context["scanning_in_progress"] = True
-            asyncio.create_task(self._scan_task_wrapper())
+            task = asyncio.create_task(self._scan_task_wrapper())
+            task.add_done_callback(lambda _: self.wake())
             
         elif action == "report_zones":
             self.logger.info("Marcando reporte como completado...")
@@ -175,14 +180,7 @@ class ExplorerBot(BaseAgent):
                 "blocks": rect['blocks']
             }
             
-            msg = {
-                "type": "map.v1",
-                "source": self.id,
-                "target": "BROADCAST", 
-                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z'),
-                "status": "SUCCESS",
-                "payload": zone_data
-            }
+            msg = Envelope(type="map.v1", source=self.id, payload=zone_data)
             await self.bus.publish("map.v1", msg)
             self.logger.info(f"Zona enviada: {width}x{length} (H={h})")
             
@@ -192,10 +190,12 @@ class ExplorerBot(BaseAgent):
             block_data = color_idx + 1
             
             coord_list = rect['blocks']
+            planner = WritePlanner()
             for (gx, gz) in coord_list:
                 if (gx, gz) not in gold_set:
                     gold_set.add((gx, gz))
-                    self.mc.setBlock(gx, vis_y, gz, 35, block_data)
+                    planner.add(gx, vis_y, gz, 35, block_data)
+            await planner.apply(self.mc)
             
             asyncio.create_task(cleanup_fn(coord_list, vis_y))
 
@@ -289,6 +289,10 @@ class ExplorerBot(BaseAgent):
 
         visual_active_blocks = set() 
         color_idx_ref = [0]
+
+        # Mapa de alturas cargado por franjas de columnas con getBlocks
+        heights = {}
+        loaded_until_x = current_start_x - 1
         
         # Funciones de soporte
         def find(i):
@@ -329,16 +333,20 @@ class ExplorerBot(BaseAgent):
         
         async def cleanup_batch_diamonds(batch):
             await asyncio.sleep(2)
+            planner = WritePlanner()
             for (bx, by, bz) in batch:
                 if (bx, bz) not in visual_active_blocks:
-                    self.mc.setBlock(bx, by, bz, 0)
+                    planner.add(bx, by, bz, 0)
+            await planner.apply(self.mc)
         
         async def cleanup_zone_visuals(coords, y):
             await asyncio.sleep(5)
+            planner = WritePlanner()
             for (gx, gz) in coords:
-                self.mc.setBlock(gx, y, gz, 0) 
+                planner.add(gx, y, gz, 0)
                 if (gx, gz) in visual_active_blocks:
                     visual_active_blocks.remove((gx, gz))
+            await planner.apply(self.mc)
 
         self.logger.info(f"Escaneo R={radius}. Inicio X={current_start_x}, Z={current_start_z}")
         
@@ -359,6 +367,12 @@ class ExplorerBot(BaseAgent):
                 
                 col_diamonds = []
 
+                # Cargar la siguiente franja del mapa de alturas (unas pocas peticiones por franja)
+                if x > loaded_until_x:
+                    strip_end = min(x + self.heightmap.tile_size - 1, g_max_x)
+                    heights = await self.heightmap.get_heights(x, g_min_z, strip_end, g_max_z)
+                    loaded_until_x = strip_end
+
                 for z in range(z_start, g_max_z + 1):
                     await asyncio.sleep(0)
 
@@ -387,10 +401,10 @@ class ExplorerBot(BaseAgent):
                     if (x - center_x)**2 + (z - center_z)**2 > radius**2:
                         continue
                     
-                    h = self.mc.getHeight(x, z)
+                    h = heights[(x, z)]
                     vis_y = h 
                     
-                    self.mc.setBlock(x, vis_y, z, 57)
+                    await self.mc.setBlock(x, vis_y, z, 57)
                     col_diamonds.append((x, vis_y, z))
                     
                     current_id = new_component(x, z, h)
@@ -458,11 +472,8 @@ class ExplorerBot(BaseAgent):
     def setup_subscriptions(self):
         """Suscripciones específicas del ExplorerBot."""
         
+        # Los comandos específicos (start, set) llegan por la suscripción común a command.*.v1
         super().setup_subscriptions()
-        
-        # Comandos específicos: start, set, pause
-        for cmd in ["start", "set", "pause"]:
-            self.bus.subscribe(self.id, f"command.{cmd}.v1")
     async def handle_command(self, command: str, payload=None):
         """Manejo de comandos específicos (start, set) + base."""
         payload = payload or {}
@@ -470,7 +481,7 @@ class ExplorerBot(BaseAgent):
         if command == "stop":
             msg = f"[{self.id}] Detenido"
             self.logger.info(msg)
-            self.mc.postToChat(msg)
+            await self.mc.postToChat(msg)
             
             self.context['interrupt'] = True
             
@@ -486,7 +497,7 @@ class ExplorerBot(BaseAgent):
 
         elif command == "start":
             if self.state == State.RUNNING:
-                 self.mc.postToChat(f"[{self.id}] Ya estoy en ejecucion.")
+                 await self.mc.postToChat(f"[{self.id}] Ya estoy en ejecucion.")
                  return
 
             # Resetear flags
@@ -498,7 +509,7 @@ class ExplorerBot(BaseAgent):
                 x, z = payload["x"], payload["z"]
             else:
                 try:
-                    pos = self.mc.player.getTilePos()
+                    pos = await self.mc.player.getTilePos()
                     self.posX, self.posZ = pos.x, pos.z
                     x, z = int(pos.x), int(pos.z)
                 except:
@@ -509,7 +520,7 @@ class ExplorerBot(BaseAgent):
 
             msg = f"[{self.id}] Iniciando exploracion en ({x}, {z}) con Rango={self.range}"
             self.logger.info(msg)
-            self.mc.postToChat(msg)
+            await self.mc.postToChat(msg)
             
             self.context.update({
                 'target_x': x, 'target_z': z, 'range': self.range,
@@ -531,7 +542,7 @@ class ExplorerBot(BaseAgent):
             
             # transición a estado PAUSED (guarda checkpoint)
             await self.set_state(State.PAUSED, "pause command")
-            self.mc.postToChat(f"[{self.id}] Pausado")
+            await self.mc.postToChat(f"[{self.id}] Pausado")
             return
 
         elif command == "resume":
@@ -545,7 +556,7 @@ class ExplorerBot(BaseAgent):
             self.context["interrupt"] = False
             self.context["scanning_in_progress"] = False
             
-            self.mc.postToChat(f"[{self.id}] Reanudado")
+            await self.mc.postToChat(f"[{self.id}] Reanudado")
             await self.set_state(State.RUNNING, "resume command")
             return
             
@@ -554,10 +565,10 @@ class ExplorerBot(BaseAgent):
                 self.range = payload["range"]
                 msg = f"[{self.id}] Rango actualizado a {self.range}"
                 self.logger.info(msg)
-                self.mc.postToChat(msg)
+                await self.mc.postToChat(msg)
                 self.context['range'] = self.range
             else:
-                self.mc.postToChat(f"[{self.id}] El comando set requiere 'range'.")
+                await self.mc.postToChat(f"[{self.id}] El comando set requiere 'range'.")
             return
             
         if command == "status":
@@ -566,12 +577,12 @@ class ExplorerBot(BaseAgent):
                 stats_count = len(self.context["scan_state"]["stats"])
              
              msg = f"[{self.id}] Status: {self.state.name} | Range: {self.range} | Target: ({self.context.get('target_x')}, {self.context.get('target_z')})"
-             self.mc.postToChat(msg)
+             await self.mc.postToChat(msg)
              return
 
         elif command == "help":
              msg = f"[{self.id}] Comandos específicos: start [x=<int>] [z=<int>] [range=<int>] [id=<AgentID>] | set range <int> [id=<AgentID>]"
-             self.mc.postToChat(msg)
+             await self.mc.postToChat(msg)
              pass 
 
         await super().handle_command(command, payload)
@@ -2,10 +2,11 @@ import asyncio
 import os
 import random
 import time
-from datetime import datetime, timezone
 from agents.base_agent import BaseAgent
 from agents.state_model import State
 from utils.block_translator import get_block_id, get_block_name
+from utils.world_cache import WorldCache
+from messages.envelope import Envelope
 
 # Materiales que sí vamos a minar físicamente
 EASY_TO_MINE = {
@@ -55,16 +56,17 @@ class MinerBot(BaseAgent):
         })
 
         # Cargar estrategia por defecto
-        self.load_strategy_dynamically("GridStrategy")
+        # Las estrategias leen el mundo a través de la caché de chunks
+        self.world = WorldCache(mc)
+        default_cls = self._find_strategy_class("GridStrategy")
+        self.strategy = default_cls(self.world, self.logger, self.id) if default_cls else None
 
     def setup_subscriptions(self):
+        # Los comandos específicos (start, set, fulfill) llegan por la suscripción común a command.*.v1
         super().setup_subscriptions()
-        for cmd in ["start", "set", "fulfill", "stop", "pause", "resume"]:
-            self.bus.subscribe(self.id, f"command.{cmd}.v1")
-            self.bus.subscribe(self.id, f"materials.requirements.v1")
-            self.bus.subscribe(self.id, "region.lock.v1")
-            self.bus.subscribe(self.id, "region.unlock.v1")
-            self.bus.subscribe(self.id, "build.v1")
+        self.bus.subscribe(self.id, "materials.requirements.v1")
+        self.bus.subscribe(self.id, "region.*.v1") # region.lock.v1 y region.unlock.v1
+        self.bus.subscribe(self.id, "build.v1")
 
     async def run(self):
         self.logger.info("MinerBot iniciado")
@@ -72,7 +74,7 @@ class MinerBot(BaseAgent):
 
     async def perceive(self):
         try:
-            msg = await asyncio.wait_for(self.bus.receive(self.id), timeout=0.01)
+            msg = self.bus.receive_nowait(self.id)
             if msg:
                 target = msg.get('target')
                 if target and target != "BROADCAST" and target != self.id:
@@ -92,7 +94,7 @@ class MinerBot(BaseAgent):
                 payload = msg.get("payload", {})
                 
                 if msg_type == "materials.requirements.v1":
-                    self._process_bom(payload)
+                    await self._process_bom(payload)
 
                 elif msg_type in ["region.lock.v1", "build.v1"]:
                     source = msg.get("source")
@@ -105,12 +107,10 @@ class MinerBot(BaseAgent):
                     if zone in self.context['forbidden_zones']:
                         self.context['forbidden_zones'].remove(zone)
 
-        except asyncio.TimeoutError:
-            pass
         except Exception as e:
             self.logger.error(f"Error en perceive: {e}")
 
-    def _process_bom(self, payload):
+    async def _process_bom(self, payload):
         reqs = payload.get("requirements", {})
         sender = payload.get("sender") or payload.get("source") or payload.get("builder_id")
         build_pos = payload.get("build_position") 
@@ -130,7 +130,7 @@ class MinerBot(BaseAgent):
 
         # Guardar posicion donde se contruye la estructura
         try:
-            pos = self.mc.player.getTilePos()
+            pos = await self.mc.player.getTilePos()
             self.context['home_x'] = pos.x
             self.context['home_y'] = pos.y
             self.context['home_z'] = pos.z
@@ -208,7 +208,7 @@ class MinerBot(BaseAgent):
         if physical_pending:
             target_pos = (self.context.get('target_x', 0), self.context.get('target_z', 0))
             if self._is_zone_forbidden(target_pos):
-                self.mc.postToChat(f"[{self.id}] Zona ocupada. Esperando...")
+                await self.mc.postToChat(f"[{self.id}] Zona ocupada. Esperando...")
                 self.context['next_action'] = 'wait_zone'
             else:
                 if not self.context.get('has_lock'):
@@ -256,14 +256,14 @@ class MinerBot(BaseAgent):
                  
                  found_y = 0
                  try:
-                     found_y = self.mc.getHeight(mx, mz)
+                     found_y = await self.mc.getHeight(mx, mz)
                  except: pass
                  
                  if found_y <= 0: found_y = 70
                  self.context['target_y'] = found_y
                  
                  strat_name = self.strategy.__class__.__name__ if self.strategy else "None"
-                 self.mc.postToChat(f"[{self.id}] Iniciando mineria en ({mx}, {found_y}, {mz}) con estrategia {strat_name}")
+                 await self.mc.postToChat(f"[{self.id}] Iniciando mineria en ({mx}, {found_y}, {mz}) con estrategia {strat_name}")
             
              self.context['arrived_at_mine'] = True
              self.context['next_action'] = 'idle' 
@@ -280,7 +280,7 @@ class MinerBot(BaseAgent):
                     start_time = self.context.get('mining_start_time', 0)
                     elapsed = time.time() - start_time
                     if elapsed > 300: # 5 minutos
-                        self.mc.postToChat(f"[{self.id}] Se han pasado los 5 minutos de minado. El resto se sacara del creativo.")
+                        await self.mc.postToChat(f"[{self.id}] Se han pasado los 5 minutos de minado. El resto se sacara del creativo.")
                         # Rellenar
                         reqs = self.context.get('requirements', {})
                         for item, qty in reqs.items():
@@ -296,12 +296,12 @@ class MinerBot(BaseAgent):
                 current_target_y = self.context.get('target_y')
                 if current_target_y is None or current_target_y <= 0:
                      try:
-                        current_target_y = self.mc.getHeight(self.context['target_x'], self.context['target_z'])
+                        current_target_y = await self.mc.getHeight(self.context['target_x'], self.context['target_z'])
                         self.context['target_y'] = current_target_y
                      except: pass
                 
                 if current_target_y <= 0:
-                    self.mc.postToChat(f"[{self.id}] Error terreno. Reseteando posición...")
+                    await self.mc.postToChat(f"[{self.id}] Error terreno. Reseteando posición...")
                     self.context['target_x'] += 5
                     self.context['target_y'] = 80
                     return
@@ -330,7 +330,8 @@ class MinerBot(BaseAgent):
                 if updated:
                     await self._send_inventory_update(status="RUNNING")
                 
-                await asyncio.sleep(0.2) 
+                # Ceder el turno; el ritmo de minado lo marca el WorldScheduler
+                await asyncio.sleep(0)
                 
                 if not active:
                     # estrategia terminada
@@ -338,7 +339,7 @@ class MinerBot(BaseAgent):
                     attempts = self.context['mining_attempts']
                     
                     if attempts >= 5 and "Vertical" in strat_name:
-                        self.mc.postToChat(f"[{self.id}] Se han superado las 5 minadas. Se rellenara todo con el creativo.")
+                        await self.mc.postToChat(f"[{self.id}] Se han superado las 5 minadas. Se rellenara todo con el creativo.")
                         reqs = self.context.get('requirements', {})
                         for item, qty in reqs.items():
                             if item in self.context.get('tasks_physical', {}):
@@ -357,16 +358,16 @@ class MinerBot(BaseAgent):
                         new_z = self.context['target_z']
                         ny = 70
                         try:
-                            ny = self.mc.getHeight(new_x, new_z)
+                            ny = await self.mc.getHeight(new_x, new_z)
                             if ny <= 0: ny = 70
                             self.context['target_y'] = ny
                         except: pass
                         
                         # mensaje cambio de zona
-                        self.mc.postToChat(f"[{self.id}] Ciclo {attempts} finalizado. Cambio de zona de mineria a ({new_x}, {ny}, {new_z}) con estrategia {strat_name}")
+                        await self.mc.postToChat(f"[{self.id}] Ciclo {attempts} finalizado. Cambio de zona de mineria a ({new_x}, {ny}, {new_z}) con estrategia {strat_name}")
                         
                         # reiniciar estrategia
-                        self.load_strategy_dynamically(strat_name, announce=False)
+                        await self.load_strategy_dynamically(strat_name, announce=False)
                     
                     await asyncio.sleep(1.0)
             else:
@@ -383,35 +384,27 @@ class MinerBot(BaseAgent):
         elif action == 'wait_zone':
             await asyncio.sleep(2.0)
         elif action == 'idle':
-            await asyncio.sleep(0.1)
+            pass
 
     async def _publish_lock(self):
         x, z = self.context.get('target_x', 0), self.context.get('target_z', 0)
-        msg = {
-            "type": "region.lock.v1", "source": self.id, "target": "BROADCAST",
-            "payload": {"zone": {"x": x, "z": z, "radius": 5}, "reason": "mining"}
-        }
+        msg = Envelope(type="region.lock.v1", source=self.id, status="RUNNING",
+                       payload={"zone": {"x": x, "z": z, "radius": 5}, "reason": "mining"})
         await self.bus.publish(self.id, msg)
         self.context['has_lock'] = True
         self.context['current_zone'] = msg['payload']['zone']
 
     async def _release_lock(self):
         if not self.context.get('has_lock'): return
-        msg = {
-            "type": "region.unlock.v1", "source": self.id, "target": "BROADCAST",
-            "payload": {"zone": self.context.get('current_zone')}
-        }
+        msg = Envelope(type="region.unlock.v1", source=self.id, payload={"zone": self.context.get('current_zone')})
         await self.bus.publish(self.id, msg)
         self.context['has_lock'] = False
         self.context['current_zone'] = None
 
     async def _send_inventory_update(self, status="RUNNING"):
         target = self.context.get('builder_id_request') or "BROADCAST"
-        msg = {
-            "type": "inventory.v1", "source": self.id, "target": target,
-            "timestamp": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
-            "payload": self.context['inventory'], "status": status
-        }
+        msg = Envelope(type="inventory.v1", source=self.id, target=target,
+                       payload=self.context['inventory'], status=status)
         await self.bus.publish(self.id, msg)
 
     async def handle_command(self, command: str, payload=None):
@@ -424,12 +417,12 @@ class MinerBot(BaseAgent):
              work_pos = f"({self.context.get('target_x')}, {self.context.get('target_y')}, {self.context.get('target_z')})"
              
              msg = f"[{self.id}] Status: {self.state.name} | Strat: {strat_name} | Target: {work_pos}"
-             self.mc.postToChat(msg)
+             await self.mc.postToChat(msg)
              return
             
         elif command == "help":
              msg = f"[{self.id}] Comandos específicos: start [x=<int>] [y=<int>] [z=<int>] [id=<AgentID>] | set strategy <vertical|grid|vein> [id=<AgentID>] | fulfill [id=<AgentID>]"
-             self.mc.postToChat(msg)
+             await self.mc.postToChat(msg)
              pass
 
         await super().handle_command(command, payload)
@@ -438,7 +431,7 @@ class MinerBot(BaseAgent):
             x = payload.get("x"); z = payload.get("z")
             if x is not None and z is not None:
                 self.context.update({'target_x': x, 'target_z': z})
-                self.mc.postToChat(f"[{self.id}] Posicion manual: ({x}, {z})")
+                await self.mc.postToChat(f"[{self.id}] Posicion manual: ({x}, {z})")
                 self.context['arrived_at_mine'] = False
                 self.context['mining_active'] = True
                 await self.set_state(State.RUNNING, "Manual Start with Coords")
@@ -452,34 +445,36 @@ class MinerBot(BaseAgent):
         elif command == "set":
             if "strategy" in payload: 
                 should_announce = not payload.get("silent", False)
-                self.load_strategy_dynamically(payload["strategy"], announce=should_announce)
+                await self.load_strategy_dynamically(payload["strategy"], announce=should_announce)
             return
 
         elif command == "fulfill":
             if self.bom_received:
                 await self.set_state(State.RUNNING, "fulfill")
                 self.context['mining_active'] = True
-                self.mc.postToChat(f"[{self.id}] Iniciando.")
+                await self.mc.postToChat(f"[{self.id}] Iniciando.")
             else:
-                self.mc.postToChat(f"[{self.id}] Sin BOM.")
+                await self.mc.postToChat(f"[{self.id}] Sin BOM.")
             return
         
-    def load_strategy_dynamically(self, strat_name, announce=False):
+    def _find_strategy_class(self, strat_name):
         from utils.reflection import get_all_strategies
         import os
         base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         strategies_dir = os.path.join(base_path, "strategies")
         available = get_all_strategies(strategies_dir)
-        selected_cls = None
         for name, cls in available.items():
             if strat_name.lower() in name.lower():
-                selected_cls = cls
-                break
+                return cls
+        return None
+
+    async def load_strategy_dynamically(self, strat_name, announce=False):
+        selected_cls = self._find_strategy_class(strat_name)
         if selected_cls:
-            self.strategy = selected_cls(self.mc, self.logger, self.id)
+            self.strategy = selected_cls(self.world, self.logger, self.id)
             if announce:
                 msg = f"[{self.id}] Estrategia cambiada a: {selected_cls.__name__}"
                 self.logger.info(msg)
-                self.mc.postToChat(msg)
+                await self.mc.postToChat(msg)
         else:
-            self.mc.postToChat(f"[{self.id}] Estrategia '{strat_name}' no encontrada.")
\ No newline at end of file
+            await self.mc.postToChat(f"[{self.id}] Estrategia '{strat_name}' no encontrada.")
\ No newline at end of file
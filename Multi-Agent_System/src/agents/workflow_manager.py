@@ -12,12 +12,13 @@ class WorkflowManager:
         """
         Analiza y ejecuta un comando de workflow.
         Formato del comando: /workflow run x=100 z=200 range=50 template=house miner.strategy=grid
+        Opcional: builders=N reparte la construcción entre N BuilderBots (builder.mode=tiles|layers).
         """
         self.active_workflows += 1
         workflow_id = f"WF{self.active_workflows}" # ID único para esta ejecución
         
         self.logger.info(f"Processing workflow {workflow_id}: {command_str}")
-        self.agent_manager.mc.postToChat(f"[{workflow_id}] Inicializando workflow")
+        await self.agent_manager.mc.postToChat(f"[{workflow_id}] Inicializando workflow")
         
         args = self._parse_args(command_str)
         
@@ -30,10 +31,29 @@ class WorkflowManager:
         builder = await self._ensure_agent("BuilderBot", builder_id, workflow_id)
         miner = await self._ensure_agent("MinerBot", miner_id, workflow_id)
 
+        # Ayudantes del builder: construyen en paralelo partes de la misma estructura
+        try:
+            builders = max(1, int(args.get('builders', 1)))
+        except ValueError:
+            builders = 1
+        crew = {}
+        for i in range(2, builders + 1):
+            helper_id = f"{builder_id}_{i}"
+            helper = await self._ensure_agent("BuilderBot", helper_id, workflow_id)
+            if helper:
+                crew[f"builder_{i}"] = helper
+
         # Conectarlos lógicamente vía Contexto (ID de Grupo) diciéndoles quiénes son sus compañeros.
+        crew_ids = {key: helper.id for key, helper in crew.items()}
         explorer.context['partners'] = {'builder': builder_id, 'miner': miner_id}
-        builder.context['partners'] = {'explorer': explorer_id, 'miner': miner_id}
+        builder.context['partners'] = {'explorer': explorer_id, 'miner': miner_id, **crew_ids}
         miner.context['partners'] = {'explorer': explorer_id, 'builder': builder_id}
+        for helper in crew.values():
+            helper.context['partners'] = {'builder': builder_id, **crew_ids}
+
+        builder.context['build_crew'] = list(crew_ids.values())
+        if 'builder.mode' in args:
+            builder.context['build_mode'] = args['builder.mode']
 
         # Configurar minero
         if 'miner.strategy' in args:
@@ -68,7 +88,7 @@ class WorkflowManager:
 
         except ValueError as e:
             self.logger.error(f"Error analizando coordenadas del workflow: {e}")
-            self.agent_manager.mc.postToChat(f"[{workflow_id}] Error: Coordenadas invalidas.")
+            await self.agent_manager.mc.postToChat(f"[{workflow_id}] Error: Coordenadas invalidas.")
 
     async def _ensure_agent(self, agent_type, agent_id, group_id):
         """
@@ -4,7 +4,7 @@ import importlib
 import sys
 import os
 
-from mcpi.minecraft import Minecraft
+from mcpi.minecraft import AsyncMinecraft
 from messages.message_bus import MessageBus
 from messages.message_parser import MessageParser
 from agents.base_agent import BaseAgent
@@ -12,21 +12,44 @@ from agents.agent_factory import AgentFactory
 from messages.chat_listener import ChatListener
 from utils.reflection import get_all_agents, get_all_strategies, get_all_structures
 from agents.agent_manager import AgentManager
+from utils.connection_pool import ConnectionPool
+from utils.world_scheduler import WorldScheduler
+from utils.structure_registry import get_structure_registry
 from utils.logging import clear_prev_logs
 from utils.checkpoints import clear_prev_checkpoints
 
 # ---------------------------------------------------------------------
 # Lanza el mundo de Minecraft
 # ---------------------------------------------------------------------
-def init_mc():
+async def init_mc():
     try:
-        mc = Minecraft.create("localhost", 4711)
+        mc = await AsyncMinecraft.create("localhost", 4711)
         print("[INFO] Conectado a Minecraft.")
         return mc
     except Exception as e:
         print("[ERROR] No se ha podido conectar a Minecraft:", e)
         sys.exit(1)
 
+# Directorio de las estructuras del BuilderBot
+STRUCTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "builder_structures")
+
+# Conexiones independientes para los agentes
+POOL_SIZE = 4
+# Comandos por segundo que los agentes pueden enviar al servidor (y ráfaga máxima)
+WORLD_COMMAND_RATE = 500
+WORLD_COMMAND_BURST = 100
+
+async def init_pool():
+    pool = ConnectionPool("localhost", 4711, size=POOL_SIZE)
+    try:
+        await pool.open()
+        pool.start_health_checks()
+        print(f"[INFO] Pool de {POOL_SIZE} conexiones abierto para los agentes.")
+        return pool
+    except Exception as e:
+        print("[ERROR] No se ha podido abrir el pool de conexiones, los agentes compartirán la conexión:", e)
+        return None
+
 
 # ---------------------------------------------------------------------
 # REGISTRO DE AGENTES
@@ -49,152 +72,152 @@ async def chat_messages(mc, parser):
     tiempo = 0.5
     
     async def global_sequence():
-        mc.postToChat("===============================")
-        mc.postToChat("---TEST DE MENSAJES GLOBALES---")
-        mc.postToChat("===============================")
+        await mc.postToChat("===============================")
+        await mc.postToChat("---TEST DE MENSAJES GLOBALES---")
+        await mc.postToChat("===============================")
 
-        mc.postToChat("[TEST] > ./explorer create paco")
+        await mc.postToChat("[TEST] > ./explorer create paco")
         await parser.process_chat_message("./explorer create paco")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./explorer create juan")
+        await mc.postToChat("[TEST] > ./explorer create juan")
         await parser.process_chat_message("./explorer create juan")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner create eustaquio")
+        await mc.postToChat("[TEST] > ./miner create eustaquio")
         await parser.process_chat_message("./miner create eustaquio")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner create hermenigildo")
+        await mc.postToChat("[TEST] > ./miner create hermenigildo")
         await parser.process_chat_message("./miner create hermenigildo")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./explorer status")
+        await mc.postToChat("[TEST] > ./explorer status")
         await parser.process_chat_message("./explorer status")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner status hermenigildo")
+        await mc.postToChat("[TEST] > ./miner status hermenigildo")
         await parser.process_chat_message("./miner status hermenigildo")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner pause eustaquio")
+        await mc.postToChat("[TEST] > ./miner pause eustaquio")
         await parser.process_chat_message("./miner pause eustaquio")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./explorer stop")
+        await mc.postToChat("[TEST] > ./explorer stop")
         await parser.process_chat_message("./explorer stop")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./explorer status")
+        await mc.postToChat("[TEST] > ./explorer status")
         await parser.process_chat_message("./explorer status")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner status")
+        await mc.postToChat("[TEST] > ./miner status")
         await parser.process_chat_message("./miner status")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./explorer help")
+        await mc.postToChat("[TEST] > ./explorer help")
         await parser.process_chat_message("./explorer help")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner help eustaquio")
+        await mc.postToChat("[TEST] > ./miner help eustaquio")
         await parser.process_chat_message("./miner help eustaquio")
         await asyncio.sleep(tiempo)
 
     async def explorer_sequence():
 
-        mc.postToChat("=============================")
-        mc.postToChat("-----TEST DE EXPLORERBOT-----")
-        mc.postToChat("=============================")
+        await mc.postToChat("=============================")
+        await mc.postToChat("-----TEST DE EXPLORERBOT-----")
+        await mc.postToChat("=============================")
 
-        mc.postToChat("[TEST] > ./explorer create 1")
+        await mc.postToChat("[TEST] > ./explorer create 1")
         await parser.process_chat_message("./explorer create 1")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./explorer create 2")
+        await mc.postToChat("[TEST] > ./explorer create 2")
         await parser.process_chat_message("./explorer create 2")
         await asyncio.sleep(tiempo)
         
-        mc.postToChat("[TEST] > ./explorer set range 500")
+        await mc.postToChat("[TEST] > ./explorer set range 500")
         await parser.process_chat_message("./explorer set range 500")
         await asyncio.sleep(tiempo)
         
-        mc.postToChat("[TEST] > ./explorer set range 1 10")
+        await mc.postToChat("[TEST] > ./explorer set range 1 10")
         await parser.process_chat_message("./explorer set range 1 10")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./explorer start 1 x=0 z=0 range=10")
+        await mc.postToChat("[TEST] > ./explorer start 1 x=0 z=0 range=10")
         await parser.process_chat_message("./explorer start 1 x=0 z=0 range=10")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./explorer start 2 (ejecutar el usuario)")
+        await mc.postToChat("[TEST] > ./explorer start 2 (ejecutar el usuario)")
         await asyncio.sleep(tiempo)
 
 
     async def miner_sequence():
 
-        mc.postToChat("============================")
-        mc.postToChat("------TEST DE MINERBOT------")
-        mc.postToChat("============================")
+        await mc.postToChat("============================")
+        await mc.postToChat("------TEST DE MINERBOT------")
+        await mc.postToChat("============================")
 
-        mc.postToChat("[TEST] > ./miner create 1")
+        await mc.postToChat("[TEST] > ./miner create 1")
         await parser.process_chat_message("./miner create 1")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner create 2")
+        await mc.postToChat("[TEST] > ./miner create 2")
         await parser.process_chat_message("./miner create 2")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner set strategy grid")
+        await mc.postToChat("[TEST] > ./miner set strategy grid")
         await parser.process_chat_message("./miner set strategy grid")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner set strategy 1 vein")
+        await mc.postToChat("[TEST] > ./miner set strategy 1 vein")
         await parser.process_chat_message("./miner set strategy 1 vein")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner start 1 x=10 z=-20 y=50")
+        await mc.postToChat("[TEST] > ./miner start 1 x=10 z=-20 y=50")
         await parser.process_chat_message("./miner start 1 x=10 z=-20 y=50")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner start 2 (ejecutar el usuario)")
+        await mc.postToChat("[TEST] > ./miner start 2 (ejecutar el usuario)")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./miner fulfill 1")
+        await mc.postToChat("[TEST] > ./miner fulfill 1")
         await parser.process_chat_message("./miner fulfill 1")
         await asyncio.sleep(tiempo)
 
     async def builder_sequence():
 
-        mc.postToChat("============================")
-        mc.postToChat("-----TEST DE BUILDERBOT-----")
-        mc.postToChat("============================")
+        await mc.postToChat("============================")
+        await mc.postToChat("-----TEST DE BUILDERBOT-----")
+        await mc.postToChat("============================")
 
-        mc.postToChat("[TEST] > ./builder create 1")
+        await mc.postToChat("[TEST] > ./builder create 1")
         await parser.process_chat_message("./builder create 1")
         await asyncio.sleep(tiempo)
 
-        #mc.postToChat("[TEST] > ./builder create 2")
+        #await mc.postToChat("[TEST] > ./builder create 2")
         #await parser.process_chat_message("./builder create 2")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./builder plan list")
+        await mc.postToChat("[TEST] > ./builder plan list")
         await parser.process_chat_message("./builder plan list")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./builder plan set 1 small_air_balloon")
+        await mc.postToChat("[TEST] > ./builder plan set 1 small_air_balloon")
         await parser.process_chat_message("./builder plan set 1 small_air_balloon")
         await asyncio.sleep(tiempo)
 
-        #mc.postToChat("[TEST] > ./builder plan set villagehouse1")
+        #await mc.postToChat("[TEST] > ./builder plan set villagehouse1")
         #await parser.process_chat_message("./builder plan set villagehouse1")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./builder bom 1")
+        await mc.postToChat("[TEST] > ./builder bom 1")
         await parser.process_chat_message("./builder bom 1")
         await asyncio.sleep(tiempo)
 
-        mc.postToChat("[TEST] > ./builder build 1")
+        await mc.postToChat("[TEST] > ./builder build 1")
         await parser.process_chat_message("./builder build 1")
         await asyncio.sleep(tiempo)
 
@@ -219,7 +242,7 @@ async def main():
     clear_prev_checkpoints()
     
     # Crear el sistema
-    mc = init_mc()
+    mc = await init_mc()
 
     message_bus = MessageBus()
     parser = MessageParser(message_bus)
@@ -229,9 +252,16 @@ async def main():
 
     # Obtener la instancia Singleton del Factory
     factory = AgentFactory()
+    pool = await init_pool()
+    if pool:
+        factory.use_connection_pool(pool)
+    factory.use_world_scheduler(WorldScheduler(rate=WORLD_COMMAND_RATE, burst=WORLD_COMMAND_BURST))
 
     register_agents(factory, os.path.join(os.path.dirname(os.path.abspath(__file__)), "agents"))
 
+    # Detectar estructuras nuevas o modificadas mientras el sistema está en marcha
+    get_structure_registry(STRUCTURES_DIR).start_watching()
+
     # Iniciar el AgentManager para gestionar la creación de agentes
     manager = AgentManager(mc, message_bus)
     asyncio.create_task(manager.run())
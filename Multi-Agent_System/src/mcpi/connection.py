@@ -1,3 +1,5 @@
+import asyncio
+import collections
 import socket
 import select
 import sys
@@ -11,22 +13,35 @@ class RequestError(Exception):
 class Connection:
     """Connection to a Minecraft Pi game"""
     RequestFailed = "Fail"
+    BufferSize = 65536
 
     def __init__(self, address, port):
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.socket.connect((address, port))
         self.lastSent = ""
+        # Persistent receive buffer: bytes in [_start, _end) are unread.
+        self._buffer = bytearray(Connection.BufferSize)
+        self._start = 0
+        self._end = 0
 
     def drain(self):
-        """Drains the socket of incoming data"""
+        """Drains the socket (and the receive buffer) of incoming data"""
+        if self._end > self._start:
+            self._report_drained(bytes(self._buffer[self._start:self._end]))
+            self._start = self._end = 0
         while True:
             readable, _, _ = select.select([self.socket], [], [], 0.0)
             if not readable:
                 break
             data = self.socket.recv(1500)
-            e =  "Drained Data: <%s>\n"%data.strip()
-            e += "Last Message: <%s>\n"%self.lastSent.strip()
-            sys.stderr.write(e)
+            if not data:
+                break
+            self._report_drained(data)
+
+    def _report_drained(self, data):
+        e =  "Drained Data: <%s>\n"%data.strip()
+        e += "Last Message: <%s>\n"%self.lastSent.strip()
+        sys.stderr.write(e)
 
     def send(self, f, *data):
         """
@@ -45,19 +60,285 @@ class Connection:
         The actual socket interaction from self.send, extracted for easier mocking
         and testing
         """
-        self.drain()
         self.lastSent = s
 
         self.socket.sendall(s)
 
+    def _readline(self):
+        """
+        Returns the next reply line from the persistent buffer, without the
+        trailing newline, reading from the socket with recv_into only when no
+        complete line is buffered. Lines are sliced out through a memoryview and
+        decoded from CP437 once.
+        """
+        while True:
+            newline = self._buffer.find(b"\n", self._start, self._end)
+            if newline >= 0:
+                with memoryview(self._buffer) as view:
+                    line = str(view[self._start:newline], "cp437")
+                self._start = newline + 1
+                if self._start == self._end:
+                    self._start = self._end = 0
+                return line
+
+            # Make room: move the partial line to the front, grow if it fills the buffer
+            if self._start > 0:
+                pending = self._end - self._start
+                self._buffer[:pending] = self._buffer[self._start:self._end]
+                self._start, self._end = 0, pending
+            if self._end == len(self._buffer):
+                self._buffer.extend(bytes(len(self._buffer)))
+
+            with memoryview(self._buffer) as view:
+                n = self.socket.recv_into(view[self._end:])
+            if n == 0:
+                raise ConnectionError("Connection closed by the server")
+            self._end += n
+
     def receive(self):
         """Receives data. Note that the trailing newline '\n' is trimmed"""
-        s = self.socket.makefile("r").readline().rstrip("\n")
+        s = self._readline()
         if s == Connection.RequestFailed:
             raise RequestError("%s failed"%self.lastSent.strip())
         return s
 
     def sendReceive(self, *data):
         """Sends and receive data"""
+        # The pipeline is idle before a request: anything still incoming is
+        # stray (e.g. an error for an earlier fire-and-forget command).
+        self.drain()
         self.send(*data)
         return self.receive()
+
+
+class WorldWriteBuffer:
+    """
+    Write-combining buffer for fire-and-forget world commands.
+
+    world.setBlock, world.setBlocks and chat.post get no reply, so there is no
+    need to hand each one to the socket on its own. They are collected here and
+    joined into a single bytes payload that is written when the buffer reaches
+    max_bytes, when max_delay seconds have passed since the first buffered
+    command, or on an explicit flush(). AsyncConnection also takes whatever is
+    buffered and writes it in front of every other request, so a read always
+    observes the writes issued before it.
+    """
+    COMMANDS = (b"world.setBlock", b"world.setBlocks", b"chat.post")
+
+    def __init__(self, writer, max_bytes=8192, max_delay=0.005):
+        self.writer = writer
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self._chunks = []
+        self._size = 0
+        self._timer = None
+
+    def __len__(self):
+        return self._size
+
+    def add(self, s):
+        """Buffers one encoded command. Returns True when the size limit is reached"""
+        self._chunks.append(s)
+        self._size += len(s)
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush_on_timer)
+        return self._size >= self.max_bytes
+
+    def take(self):
+        """Empties the buffer and returns its content as one bytes payload"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self._size = 0
+        return data
+
+    def _flush_on_timer(self):
+        self._timer = None
+        data = self.take()
+        if data:
+            self.writer.write(data)
+
+    async def flush(self):
+        """Writes everything buffered and waits for the transport to drain"""
+        data = self.take()
+        if data:
+            self.writer.write(data)
+            await self.writer.drain()
+
+class AsyncConnection:
+    """
+    Connection to a Minecraft Pi game built on asyncio streams.
+
+    Same protocol and API as Connection, but send/sendReceive are coroutines
+    so a slow reply never blocks the event loop shared by the agents.
+
+    Requests are pipelined: queries are written back-to-back without waiting
+    for the previous reply, and a single reader task resolves a FIFO of pending
+    futures as the newline-terminated replies arrive. This works because the
+    RaspberryJuice protocol answers queries strictly in order. Fire-and-forget
+    commands (setBlock, chat.post...) normally get no reply, but the server
+    answers "Fail" when one of them throws or is unsupported. So the first query
+    written after such commands is preceded by SyncRequest, a query that never
+    fails: any "Fail" read before its reply is stray and is dropped, and the
+    pipeline stays paired.
+    """
+    RequestFailed = Connection.RequestFailed
+    SyncRequest = b"world.getBlock(0,0,0)\n"
+
+    def __init__(self, reader, writer, buffered=True):
+        self.reader = reader
+        self.writer = writer
+        self.lastSent = b""
+        self.write_buffer = WorldWriteBuffer(writer) if buffered else None
+        # (future, request) for every query written and not answered yet;
+        # (None, n) marks a SyncRequest covering n fire-and-forget commands
+        self._pending = collections.deque()
+        self._unsynced = 0
+        self._reader_task = None
+        # Reply lines read so far; with backlog(), lets a caller tell a busy
+        # connection from a dead one
+        self.replies = 0
+
+    @staticmethod
+    async def open(address, port, buffered=True):
+        """Opens the TCP stream and returns a ready AsyncConnection"""
+        reader, writer = await asyncio.open_connection(address, port)
+        return AsyncConnection(reader, writer, buffered=buffered)
+
+    @staticmethod
+    def _build(f, *data):
+        return b"".join([f, b"(", flatten_parameters_to_bytestring(data), b")", b"\n"])
+
+    async def send(self, f, *data):
+        """
+        Sends data. Note that a trailing newline '\n' is added here.
+        Waits only for the transport buffer to drain, never for the server.
+        setBlock/setBlocks/chat.post may be held in the write buffer instead.
+        """
+        s = self._build(f, *data)
+        self._unsynced += 1
+        if self.write_buffer is not None and f in WorldWriteBuffer.COMMANDS:
+            self.lastSent = s
+            if self.write_buffer.add(s):
+                await self.flush()
+            return
+        await self._send(s)
+
+    async def _send(self, s):
+        """
+        The actual stream interaction from self.send, extracted for easier mocking
+        and testing. Buffered writes go out first, in the same write call.
+        """
+        self.lastSent = s
+        if self.write_buffer is not None and len(self.write_buffer):
+            s = self.write_buffer.take() + s
+        self.writer.write(s)
+        await self.writer.drain()
+
+    async def flush(self):
+        """Writes any buffered fire-and-forget commands now"""
+        if self.write_buffer is not None:
+            await self.write_buffer.flush()
+
+    def _expect_reply(self, request):
+        """Registers a future for the next unclaimed reply. Must be called right
+        before the request is written, with no await in between."""
+        self._ensure_reader()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((future, request))
+        return future
+
+    def _expect_sync(self):
+        """Returns the SyncRequest to write before the next query (registering
+        its marker), or b"" if no fire-and-forget command went out since the last one.
+        Same rule as _expect_reply: no await before the write."""
+        if not self._unsynced:
+            return b""
+        self._ensure_reader()
+        self._pending.append((None, self._unsynced))
+        self._unsynced = 0
+        return AsyncConnection.SyncRequest
+
+    def _ensure_reader(self):
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = asyncio.get_running_loop().create_task(self._read_replies())
+
+    async def _read_replies(self):
+        """Resolves pending futures in FIFO order as replies arrive"""
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    raise ConnectionError("Connection closed by the Minecraft server")
+                self.replies += 1
+                s = line.decode("cp437").rstrip("\n")
+                if not self._pending:
+                    sys.stderr.write("Unexpected Data: <%s>\n"%s.strip())
+                    continue
+                future, request = self._pending.popleft()
+                if future is None:
+                    # SyncRequest marker: up to 'request' stray fails come first
+                    if s == AsyncConnection.RequestFailed and request > 0:
+                        self._pending.appendleft((None, request - 1))
+                    continue
+                if future.done():
+                    # The caller gave up (cancelled): drop this reply
+                    continue
+                if s == AsyncConnection.RequestFailed:
+                    future.set_exception(RequestError("%s failed"%request.strip()))
+                else:
+                    future.set_result(s)
+        except asyncio.CancelledError:
+            self._fail_pending(ConnectionError("Connection closed"))
+            raise
+        except Exception as e:
+            self._fail_pending(e)
+
+    def backlog(self):
+        """Bytes written by the caller that have not reached the socket yet"""
+        size = len(self.write_buffer) if self.write_buffer is not None else 0
+        transport = getattr(self.writer, "transport", None)
+        if transport is not None:
+            size += transport.get_write_buffer_size()
+        return size
+
+    def _fail_pending(self, error):
+        while self._pending:
+            future, _ = self._pending.popleft()
+            if future is not None and not future.done():
+                future.set_exception(error)
+
+    async def sendReceive(self, *data):
+        """Sends and receive data"""
+        s = self._build(*data)
+        sync = self._expect_sync()
+        future = self._expect_reply(s)
+        await self._send(sync + s)
+        return await future
+
+    async def send_many(self, requests):
+        """
+        Pipelines several queries: writes them all in one go and returns the
+        replies in the same order. requests is an iterable of (f, *data) tuples.
+        """
+        lines = [self._build(*r) for r in requests]
+        if not lines:
+            return []
+        sync = self._expect_sync()
+        futures = [self._expect_reply(s) for s in lines]
+        await self._send(sync + b"".join(lines))
+        replies = await asyncio.gather(*futures, return_exceptions=True)
+        for r in replies:
+            if isinstance(r, BaseException):
+                raise r
+        return replies
+
+    async def close(self):
+        """Flushes pending writes and closes the underlying stream"""
+        await self.flush()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self.writer.close()
+        await self.writer.wait_closed()
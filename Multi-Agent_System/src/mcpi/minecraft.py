@@ -1,8 +1,9 @@
-from .connection import Connection
+from .connection import Connection, AsyncConnection
 from .vec3 import Vec3
 from .event import BlockEvent, ChatEvent
 from .block import Block
 import math
+import numpy as np
 from .util import flatten
 
 """ Minecraft PI low level api v0.1_1
@@ -19,6 +20,7 @@ from .util import flatten
 
 """ Updated to include functionality provided by RaspberryJuice:
 - getBlocks()
+- getBlocksArray()
 - getDirection()
 - getPitch()
 - getRotation()
@@ -28,6 +30,19 @@ from .util import flatten
 def intFloor(*args):
     return [int(math.floor(x)) for x in flatten(args)]
 
+def blocksArray(s, coords):
+    """Decode a world.getBlocks reply for cuboid coords (x0,y0,z0,x1,y1,z1)
+    into a uint16 array indexed [y, z, x] relative to the minimum corner.
+
+    The server walks the cuboid y, then x, then z (z fastest), so the flat
+    reply is reshaped to (dy, dx, dz) and the last two axes are swapped."""
+    x0, y0, z0, x1, y1, z1 = coords
+    dx, dy, dz = abs(x1 - x0) + 1, abs(y1 - y0) + 1, abs(z1 - z0) + 1
+    ids = np.fromstring(s, dtype=np.uint16, sep=",")
+    if ids.size != dx * dy * dz:
+        raise ValueError("world.getBlocks returned %d ids for a %dx%dx%d cuboid" % (ids.size, dx, dy, dz))
+    return ids.reshape(dy, dx, dz).transpose(0, 2, 1)
+
 class CmdPositioner:
     """Methods for setting and getting positions"""
     def __init__(self, connection, packagePrefix):
@@ -163,6 +178,12 @@ class Minecraft:
         s = self.conn.sendReceive(b"world.getBlocks", intFloor(args))
         return map(int, s.split(","))
 
+    def getBlocksArray(self, *args):
+        """Get a cuboid of blocks (x0,y0,z0,x1,y1,z1) => numpy.ndarray[uint16] of shape (dy,dz,dx)"""
+        coords = intFloor(args)
+        s = self.conn.sendReceive(b"world.getBlocks", coords)
+        return blocksArray(s, coords)
+
     def setBlock(self, *args):
         """Set block (x,y,z,id,[data])"""
         self.conn.send(b"world.setBlock", intFloor(args))
@@ -205,6 +226,206 @@ class Minecraft:
         return Minecraft(Connection(address, port))
 
 
+
+""" asyncio variant of the API above, for use from inside the agents' event loop.
+    Same commands and return values, but every call is a coroutine. """
+
+class AsyncCmdPositioner:
+    """Methods for setting and getting positions (awaitable)"""
+    def __init__(self, connection, packagePrefix):
+        self.conn = connection
+        self.pkg = packagePrefix
+
+    async def getPos(self, id):
+        """Get entity position (entityId:int) => Vec3"""
+        s = await self.conn.sendReceive(self.pkg + b".getPos", id)
+        return Vec3(*list(map(float, s.split(","))))
+
+    async def setPos(self, id, *args):
+        """Set entity position (entityId:int, x,y,z)"""
+        await self.conn.send(self.pkg + b".setPos", id, args)
+
+    async def getTilePos(self, id):
+        """Get entity tile position (entityId:int) => Vec3"""
+        s = await self.conn.sendReceive(self.pkg + b".getTile", id)
+        return Vec3(*list(map(int, s.split(","))))
+
+    async def setTilePos(self, id, *args):
+        """Set entity tile position (entityId:int) => Vec3"""
+        await self.conn.send(self.pkg + b".setTile", id, intFloor(*args))
+
+    async def getDirection(self, id):
+        """Get entity direction (entityId:int) => Vec3"""
+        s = await self.conn.sendReceive(self.pkg + b".getDirection", id)
+        return Vec3(*map(float, s.split(",")))
+
+    async def getRotation(self, id):
+        """get entity rotation (entityId:int) => float"""
+        return float(await self.conn.sendReceive(self.pkg + b".getRotation", id))
+
+    async def getPitch(self, id):
+        """get entity pitch (entityId:int) => float"""
+        return float(await self.conn.sendReceive(self.pkg + b".getPitch", id))
+
+    async def setting(self, setting, status):
+        """Set a player setting (setting, status). keys: autojump"""
+        await self.conn.send(self.pkg + b".setting", setting, 1 if bool(status) else 0)
+
+
+class AsyncCmdEntity(AsyncCmdPositioner):
+    """Methods for entities (awaitable)"""
+    def __init__(self, connection):
+        AsyncCmdPositioner.__init__(self, connection, b"entity")
+
+
+class AsyncCmdPlayer(AsyncCmdPositioner):
+    """Methods for the host (Raspberry Pi) player (awaitable)"""
+    def __init__(self, connection):
+        AsyncCmdPositioner.__init__(self, connection, b"player")
+        self.conn = connection
+
+    async def getPos(self):
+        return await AsyncCmdPositioner.getPos(self, [])
+    async def setPos(self, *args):
+        return await AsyncCmdPositioner.setPos(self, [], args)
+    async def getTilePos(self):
+        return await AsyncCmdPositioner.getTilePos(self, [])
+    async def setTilePos(self, *args):
+        return await AsyncCmdPositioner.setTilePos(self, [], args)
+    async def getDirection(self):
+        return await AsyncCmdPositioner.getDirection(self, [])
+    async def getRotation(self):
+        return await AsyncCmdPositioner.getRotation(self, [])
+    async def getPitch(self):
+        return await AsyncCmdPositioner.getPitch(self, [])
+
+class AsyncCmdCamera:
+    def __init__(self, connection):
+        self.conn = connection
+
+    async def setNormal(self, *args):
+        """Set camera mode to normal Minecraft view ([entityId])"""
+        await self.conn.send(b"camera.mode.setNormal", args)
+
+    async def setFixed(self):
+        """Set camera mode to fixed view"""
+        await self.conn.send(b"camera.mode.setFixed")
+
+    async def setFollow(self, *args):
+        """Set camera mode to follow an entity ([entityId])"""
+        await self.conn.send(b"camera.mode.setFollow", args)
+
+    async def setPos(self, *args):
+        """Set camera entity position (x,y,z)"""
+        await self.conn.send(b"camera.setPos", args)
+
+
+class AsyncCmdEvents:
+    """Events (awaitable)"""
+    def __init__(self, connection):
+        self.conn = connection
+
+    async def clearAll(self):
+        """Clear all old events"""
+        await self.conn.send(b"events.clear")
+
+    async def pollBlockHits(self):
+        """Only triggered by sword => [BlockEvent]"""
+        s = await self.conn.sendReceive(b"events.block.hits")
+        events = [e for e in s.split("|") if e]
+        return [BlockEvent.Hit(*list(map(int, e.split(",")))) for e in events]
+
+    async def pollChatPosts(self):
+        """Triggered by posts to chat => [ChatEvent]"""
+        s = await self.conn.sendReceive(b"events.chat.posts")
+        events = [e for e in s.split("|") if e]
+        return [ChatEvent.Post(int(e[:e.find(",")]), e[e.find(",") + 1:]) for e in events]
+
+class AsyncMinecraft:
+    """Awaitable twin of Minecraft, backed by an AsyncConnection."""
+    def __init__(self, connection):
+        self.conn = connection
+
+        self.camera = AsyncCmdCamera(connection)
+        self.entity = AsyncCmdEntity(connection)
+        self.player = AsyncCmdPlayer(connection)
+        self.events = AsyncCmdEvents(connection)
+
+    async def getBlock(self, *args):
+        """Get block (x,y,z) => id:int"""
+        return int(await self.conn.sendReceive(b"world.getBlock", intFloor(args)))
+
+    async def getBlockWithData(self, *args):
+        """Get block with data (x,y,z) => Block"""
+        ans = await self.conn.sendReceive(b"world.getBlockWithData", intFloor(args))
+        return Block(*list(map(int, ans.split(","))))
+
+    async def getBlocks(self, *args):
+        """Get a cuboid of blocks (x0,y0,z0,x1,y1,z1) => [id:int]"""
+        s = await self.conn.sendReceive(b"world.getBlocks", intFloor(args))
+        return map(int, s.split(","))
+
+    async def getBlocksArray(self, *args):
+        """Get a cuboid of blocks (x0,y0,z0,x1,y1,z1) => numpy.ndarray[uint16] of shape (dy,dz,dx)"""
+        coords = intFloor(args)
+        s = await self.conn.sendReceive(b"world.getBlocks", coords)
+        return blocksArray(s, coords)
+
+    async def setBlock(self, *args):
+        """Set block (x,y,z,id,[data])"""
+        await self.conn.send(b"world.setBlock", intFloor(args))
+
+    async def setBlocks(self, *args):
+        """Set a cuboid of blocks (x0,y0,z0,x1,y1,z1,id,[data])"""
+        await self.conn.send(b"world.setBlocks", intFloor(args))
+
+    async def getHeight(self, *args):
+        """Get the height of the world (x,z) => int"""
+        return int(await self.conn.sendReceive(b"world.getHeight", intFloor(args)))
+
+    async def getHeights(self, points):
+        """Get the height of the world at many (x,z) points in one pipelined batch => [int]"""
+        replies = await self.conn.send_many([(b"world.getHeight", intFloor(p)) for p in points])
+        return [int(r) for r in replies]
+
+    async def getPlayerEntityIds(self):
+        """Get the entity ids of the connected players => [id:int]"""
+        ids = await self.conn.sendReceive(b"world.getPlayerIds")
+        return list(map(int, ids.split("|")))
+
+    async def getPlayerEntityId(self, name):
+        """Get the entity id of the named player => [id:int]"""
+        return int(await self.conn.sendReceive(b"world.getPlayerId", name))
+
+    async def saveCheckpoint(self):
+        """Save a checkpoint that can be used for restoring the world"""
+        await self.conn.send(b"world.checkpoint.save")
+
+    async def restoreCheckpoint(self):
+        """Restore the world state to the checkpoint"""
+        await self.conn.send(b"world.checkpoint.restore")
+
+    async def postToChat(self, msg):
+        """Post a message to the game chat"""
+        await self.conn.send(b"chat.post", msg)
+
+    async def setting(self, setting, status):
+        """Set a world setting (setting, status). keys: world_immutable, nametags_visible"""
+        await self.conn.send(b"world.setting", setting, 1 if bool(status) else 0)
+
+    async def flush(self):
+        """Send any buffered setBlock/setBlocks/chat.post commands now"""
+        await self.conn.flush()
+
+    async def close(self):
+        """Close the connection to the server"""
+        await self.conn.close()
+
+    @staticmethod
+    async def create(address = "localhost", port = 4711, buffered = True):
+        return AsyncMinecraft(await AsyncConnection.open(address, port, buffered=buffered))
+
+
 if __name__ == "__main__":
     mc = Minecraft.create()
     mc.postToChat("Hello, Minecraft!")
@@ -28,7 +28,7 @@ class ChatListener:
         while self.is_running:
             try:
                 # Leer posts de chat desde mcpi
-                chat_posts = self.mc.events.pollChatPosts()               
+                chat_posts = await self.mc.events.pollChatPosts()               
                 for post in chat_posts:
                     chat_message = post.message.strip()
                     self.logger.debug(f"Mensaje sin procesar detectado: {chat_message}")
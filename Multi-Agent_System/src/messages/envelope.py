@@ -0,0 +1,104 @@
+import datetime
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping as MappingType, Optional
+from utils.json_schema import SchemaError, VALID_STATUS, validate_message
+
+# Diferencia entre el reloj de pared y el monótono, para convertir marcas de tiempo en los límites del sistema
+_WALL_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+
+_FIELDS = ("type", "source", "target", "timestamp", "payload", "status")
+
+def now_ns() -> int:
+    """Marca de tiempo de los mensajes: nanosegundos del reloj monótono."""
+    return time.monotonic_ns()
+
+def to_iso(timestamp_ns: int) -> str:
+    """Marca monótona -> ISO 8601 UTC (para chat, red y logs)."""
+    wall = _EPOCH + (timestamp_ns + _WALL_OFFSET_NS) // 1000 * _MICROSECOND
+    return wall.isoformat().replace('+00:00', 'Z')
+
+def from_iso(timestamp: str) -> int:
+    """ISO 8601 -> marca monótona equivalente."""
+    wall = datetime.datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if wall.tzinfo is None:
+        wall = wall.replace(tzinfo=datetime.timezone.utc)
+    return (wall - _EPOCH) // _MICROSECOND * 1000 - _WALL_OFFSET_NS
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Envelope(Mapping):
+    """
+    Mensaje del MessageBus, inmutable y sin __dict__.
+    Se valida una sola vez al construirse (comprobaciones de tipo baratas; la marca de
+    tiempo es un entero del reloj monótono y no hay que parsearla) y el bus lo
+    entrega sin volver a validarlo. Se lee como el diccionario de siempre
+    (msg['type'], msg.get('payload')), así que los receptores no cambian.
+    'payload' y 'context' se copian al construirse y quedan de solo lectura
+    (MappingProxyType): el emisor puede seguir modificando su diccionario sin que
+    cambie el mensaje ya publicado. La copia es de un nivel; los valores anidados
+    (listas de bloques, etc.) se comparten y los receptores no deben modificarlos,
+    y quien quiera guardar el payload para editarlo hace dict(payload).
+    Los diccionarios que llegan de fuera (chat, red) pasan por validate_message
+    completo en from_dict(); to_dict() los devuelve con la hora en ISO 8601.
+    """
+    type: str
+    source: str
+    target: str = "BROADCAST"
+    payload: MappingType[str, Any] = field(default_factory=dict)
+    status: str = "SUCCESS"
+    timestamp: int = field(default_factory=now_ns)
+    context: Optional[MappingType[str, Any]] = None
+
+    def __post_init__(self):
+        if not isinstance(self.type, str) or not self.type:
+            raise SchemaError("El campo 'type' debe ser una cadena.")
+        if not isinstance(self.source, str):
+            raise SchemaError("El campo 'source' debe ser una cadena.")
+        if not isinstance(self.target, str):
+            raise SchemaError("El campo 'target' debe ser una cadena.")
+        if not isinstance(self.payload, Mapping):
+            raise SchemaError("El campo 'payload' debe ser un diccionario.")
+        if self.status not in VALID_STATUS:
+            raise SchemaError(f"Valor de 'status' inválido: {self.status}. Esperado: {VALID_STATUS}")
+        if type(self.timestamp) is not int:
+            raise SchemaError("El campo 'timestamp' debe ser un entero en nanosegundos.")
+        if self.context is not None and not isinstance(self.context, Mapping):
+            raise SchemaError("El campo 'context' debe ser un diccionario si está presente.")
+        # Instantánea de solo lectura (el dataclass es frozen: se asigna con object.__setattr__)
+        object.__setattr__(self, "payload", MappingProxyType(dict(self.payload)))
+        if self.context is not None:
+            object.__setattr__(self, "context", MappingProxyType(dict(self.context)))
+
+    # Interfaz de diccionario de solo lectura
+    def __getitem__(self, key):
+        if key in _FIELDS or (key == "context" and self.context is not None):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from _FIELDS
+        if self.context is not None:
+            yield "context"
+
+    def __len__(self):
+        return len(_FIELDS) + (self.context is not None)
+
+    @classmethod
+    def from_dict(cls, msg: Mapping) -> "Envelope":
+        """Mensaje externo: validación completa del esquema y conversión de la marca de tiempo."""
+        validate_message(msg)
+        return cls(type=msg["type"], source=msg["source"], target=msg["target"], payload=msg["payload"],
+                   status=msg["status"], timestamp=from_iso(msg["timestamp"]), context=msg.get("context"))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Diccionario con el formato de json_schema, para sacar el mensaje del proceso."""
+        msg = {key: self[key] for key in self}
+        msg["timestamp"] = to_iso(self.timestamp)
+        msg["payload"] = dict(self.payload)
+        if self.context is not None:
+            msg["context"] = dict(self.context)
+        return msg
@@ -0,0 +1,210 @@
+import asyncio
+from collections import Counter, deque
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional
+
+# Políticas de desbordamiento de un buzón o de un tipo de mensaje con límite
+BLOCK = "block"             # El publicador espera a que el destinatario haga sitio
+DROP_NEWEST = "drop_newest" # Se descarta el mensaje nuevo
+DROP_OLDEST = "drop_oldest" # Se descarta el mensaje pendiente más antiguo
+COALESCE = "coalesce"       # Solo se guarda el último mensaje de cada clave (p.ej. inventory.v1)
+
+OVERFLOW_POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST, COALESCE)
+_ALIASES = {"drop": DROP_NEWEST}
+
+def _policy(overflow: str, allowed=OVERFLOW_POLICIES) -> str:
+    overflow = _ALIASES.get(overflow, overflow)
+    if overflow not in allowed:
+        raise ValueError(f"Política de desbordamiento desconocida: {overflow}. Esperado: {allowed}")
+    return overflow
+
+def by_source(msg: Mapping[str, Any]):
+    """Clave por defecto de COALESCE: el último mensaje de cada emisor."""
+    return msg.get('source')
+
+class TypeLimit(NamedTuple):
+    max_pending: Optional[int]
+    overflow: str
+    key: Callable[[Mapping[str, Any]], Any]
+
+class Mailbox:
+    """
+    Buzón de entrada FIFO de un agente.
+    Guarda los mensajes tal cual (el MessageBus entrega el mismo objeto inmutable a
+    todos los destinatarios). Se puede limitar el buzón entero ('max_size') y, al
+    suscribirse, cada tipo de mensaje por separado; al llenarse se aplica la
+    política de desbordamiento correspondiente. Con COALESCE un mensaje nuevo
+    sustituye en su sitio al pendiente con la misma clave.
+    Los descartes de mensajes antiguos se marcan y se saltan al leer; cuando las
+    entradas muertas superan a las vivas la cola se compacta de una vez, así que
+    su tamaño queda acotado y el coste amortizado sigue siendo constante.
+    """
+    COMPACT_MIN = 64 # Entradas muertas a partir de las que se puede compactar
+
+    def __init__(self, max_size: Optional[int] = None, overflow: str = BLOCK):
+        self._entries: deque = deque() # [mensaje, tipo, clave]; mensaje None = descartado
+        self._by_type: Dict[str, deque] = {} # tipo -> entradas vivas, en orden
+        self._keyed: Dict[tuple, list] = {} # (tipo, clave) -> entrada pendiente
+        self._limits: Dict[str, TypeLimit] = {}
+        self._size = 0
+        self._dead = 0 # Entradas descartadas que siguen en _entries
+        self._arrived = asyncio.Event()
+        self._freed = asyncio.Event()
+        self.configure(max_size, overflow)
+
+        # Métricas
+        self.max_depth = 0
+        self.delivered = 0
+        self.blocked = 0 # Veces que un publicador ha tenido que esperar
+        self.dropped: Counter = Counter() # tipo -> mensajes descartados
+        self.coalesced: Counter = Counter() # tipo -> mensajes sustituidos por uno más nuevo
+
+    def configure(self, max_size: Optional[int] = None, overflow: str = BLOCK):
+        """Límite del buzón entero (None = sin límite)."""
+        self.overflow = _policy(overflow, (BLOCK, DROP_NEWEST, DROP_OLDEST))
+        self.max_size = None if max_size is None else max(1, int(max_size))
+
+    def limit(self, message_type: str, max_pending: Optional[int] = None, overflow: str = BLOCK,
+              key: Callable[[Mapping[str, Any]], Any] = by_source):
+        """Limita los mensajes pendientes de un tipo. Sin 'max_pending' ni COALESCE, el tipo queda sin límite."""
+        overflow = _policy(overflow)
+        if max_pending is None and overflow != COALESCE:
+            self._limits.pop(message_type, None)
+            return
+        max_pending = None if max_pending is None else max(1, int(max_pending))
+        self._limits[message_type] = TypeLimit(max_pending, overflow, key)
+
+    # ------------------------------------------------------------
+    # Entrada
+    # ------------------------------------------------------------
+
+    def offer(self, msg: Mapping[str, Any]) -> Optional[bool]:
+        """
+        Encola sin esperar. Devuelve True si el mensaje entra (o sustituye a uno
+        pendiente), False si se descarta y None si hay que esperar con put().
+        """
+        msg_type = msg.get('type')
+        rule = self._limits.get(msg_type)
+        key = None
+
+        if rule is not None:
+            if rule.overflow == COALESCE:
+                key = (msg_type, rule.key(msg))
+                entry = self._keyed.get(key)
+                if entry is not None:
+                    entry[0] = msg
+                    self.coalesced[msg_type] += 1
+                    self._arrived.set()
+                    return True
+            pending = self._by_type.get(msg_type)
+            if rule.max_pending is not None and pending and len(pending) >= rule.max_pending:
+                if not self._overflow(rule.overflow, msg_type, pending):
+                    return None if rule.overflow == BLOCK else False
+
+        if self.max_size is not None and self._size >= self.max_size:
+            if not self._overflow(self.overflow, msg_type, None):
+                return None if self.overflow == BLOCK else False
+
+        entry = [msg, msg_type, key]
+        self._entries.append(entry)
+        self._by_type.setdefault(msg_type, deque()).append(entry)
+        if key is not None:
+            self._keyed[key] = entry
+        self._size += 1
+        self.max_depth = max(self.max_depth, self._size)
+        self.delivered += 1
+        self._arrived.set()
+        return True
+
+    def _overflow(self, policy: str, msg_type: str, pending: Optional[deque]) -> bool:
+        """Aplica la política a un buzón/tipo lleno. Devuelve True si ya hay sitio para el mensaje nuevo."""
+        if policy == BLOCK:
+            return False
+        if policy == DROP_NEWEST:
+            self.dropped[msg_type] += 1
+            return False
+        # DROP_OLDEST (o COALESCE con el tipo lleno): descartar el pendiente más antiguo
+        if pending is None:
+            self._skip_dead()
+            oldest = self._entries[0]
+        else:
+            oldest = pending[0]
+        self._discard(oldest)
+        self.dropped[oldest[1]] += 1
+        if self._dead > max(self._size, self.COMPACT_MIN):
+            self._compact()
+        return True
+
+    def _compact(self):
+        """Quita de la cola las entradas descartadas que no están en cabeza."""
+        self._entries = deque(entry for entry in self._entries if entry[0] is not None)
+        self._dead = 0
+
+    async def put(self, msg: Mapping[str, Any]) -> bool:
+        """Encola esperando, si hace falta, a que el destinatario consuma mensajes."""
+        accepted = self.offer(msg)
+        if accepted is None:
+            self.blocked += 1
+        while accepted is None:
+            self._freed.clear()
+            await self._freed.wait()
+            accepted = self.offer(msg)
+        return accepted
+
+    # ------------------------------------------------------------
+    # Salida
+    # ------------------------------------------------------------
+
+    def _discard(self, entry: list):
+        """Saca una entrada viva de los índices; la cola principal la salta al leer."""
+        msg_type = entry[1]
+        pending = self._by_type[msg_type]
+        pending.popleft() # Siempre es la más antigua de su tipo
+        if not pending:
+            del self._by_type[msg_type]
+        if entry[2] is not None:
+            del self._keyed[entry[2]]
+        entry[0] = None
+        self._size -= 1
+        self._dead += 1
+        self._freed.set()
+
+    def _skip_dead(self):
+        while self._entries and self._entries[0][0] is None:
+            self._entries.popleft()
+            self._dead -= 1
+
+    def get_nowait(self) -> Mapping[str, Any]:
+        self._skip_dead()
+        if not self._entries:
+            raise asyncio.QueueEmpty
+        entry = self._entries[0]
+        msg = entry[0]
+        self._discard(entry)
+        self._entries.popleft()
+        self._dead -= 1
+        return msg
+
+    async def get(self) -> Mapping[str, Any]:
+        while not self._size:
+            self._arrived.clear()
+            await self._arrived.wait()
+        return self.get_nowait()
+
+    def qsize(self) -> int:
+        return self._size
+
+    def empty(self) -> bool:
+        return not self._size
+
+    def stats(self) -> Dict[str, Any]:
+        """Profundidad actual y máxima, entregas, esperas y descartes del buzón."""
+        return {
+            "depth": self._size,
+            "max_depth": self.max_depth,
+            "max_size": self.max_size,
+            "pending": {msg_type: len(entries) for msg_type, entries in self._by_type.items()},
+            "delivered": self.delivered,
+            "blocked": self.blocked,
+            "dropped": dict(self.dropped),
+            "coalesced": dict(self.coalesced),
+        }
@@ -1,19 +1,36 @@
 import asyncio
-from typing import Dict, Any, Set
+from typing import Dict, Any, Set, Callable, List, Mapping, Optional
 from utils.logging import Logger
-from utils.json_schema import validate_message 
+from messages.envelope import Envelope
+from messages.mailbox import Mailbox, BLOCK, COALESCE, by_source
+from messages.topics import TopicTrie, is_pattern
 
 class MessageBus:
     """
     Implementa el Patrón Observer (Publish-Subscribe) de forma asíncrona.
     Permite la comunicación punto-a-punto y basada en tipo de mensaje (broadcast selectivo).
+    Los tipos son tópicos jerárquicos ('command.stop.v1') y las suscripciones admiten
+    comodines: '*' para un segmento ('command.*.v1') y '#' para cero o más ('region.#').
+    Los destinatarios de cada tipo se calculan una vez y se guardan hasta que cambian
+    las suscripciones.
+    Los mensajes viajan como Envelope (inmutable, validado al construirse): los agentes
+    del proceso lo publican directamente y el bus no vuelve a validarlo; los diccionarios
+    (chat, red) pasan la validación completa del esquema y se convierten una sola vez.
+    Ese mismo objeto se reparte, sin copias, a todos los destinatarios en una sola
+    pasada síncrona; solo los buzones llenos con política 'block' hacen esperar al publicador.
+    Los receptores no deben modificar los mensajes recibidos.
     """
 
     def __init__(self):
-        # agent_id → asyncio.Queue (Buzón de entrada del agente)
-        self._queues: Dict[str, asyncio.Queue] = {} 
-        # message_type → Set[str] de agent_ids suscritos (Núcleo del Observer)
+        # agent_id → Mailbox (Buzón de entrada del agente)
+        self._queues: Dict[str, Mailbox] = {} 
+        # tópico o patrón → Set[str] de agent_ids suscritos (Núcleo del Observer)
         self._subscriptions: Dict[str, Set[str]] = {} 
+        self._topics = TopicTrie()
+        # message_type → agent_ids que lo reciben (se vacía al cambiar las suscripciones)
+        self._routes: Dict[str, tuple] = {}
+        # agent_id → callback que despierta al agente cuando llega un mensaje a su cola
+        self._listeners: Dict[str, Callable[[], None]] = {}
         self.logger = Logger(self.__class__.__name__)
         
         self.logger.info("MessageBus inicializado.")
@@ -22,92 +39,152 @@ class MessageBus:
     # Observer Registration (Sujeto y Observadores)
     # ------------------------------------------------------------
     
-    def register_agent(self, agent_id: str):
+    def register_agent(self, agent_id: str, on_message: Callable[[], None] = None,
+                       max_size: Optional[int] = None, overflow: str = BLOCK):
         """
         Registra un nuevo agente y crea su cola de entrada asíncrona.
+        'on_message' se llama en cada entrega para despertar al agente sin que tenga que sondear su cola.
+        'max_size' limita el buzón entero; al llenarse, 'overflow' decide si el publicador
+        espera ('block') o se descarta el mensaje nuevo ('drop_newest') o el más antiguo ('drop_oldest').
         """
         if agent_id not in self._queues:
-            self._queues[agent_id] = asyncio.Queue()
+            self._queues[agent_id] = Mailbox(max_size, overflow)
             self.logger.info(f"Agente '{agent_id}' registrado en el bus.")
+        elif max_size is not None:
+            self._queues[agent_id].configure(max_size, overflow)
+        if on_message is not None:
+            self._listeners[agent_id] = on_message
 
-    def subscribe(self, agent_id: str, message_type: str):
+    def subscribe(self, agent_id: str, message_type: str, max_pending: Optional[int] = None, overflow: str = BLOCK,
+                  key: Callable[[Mapping[str, Any]], Any] = by_source):
         """
         Patrón Observer: Registra el interés de un agente por un tipo de mensaje.
         Ej: BuilderBot se suscribe a 'map.v1'.
+        Con 'max_pending' se limitan los mensajes de ese tipo en el buzón del agente;
+        al llenarse, 'overflow' decide si el publicador espera ('block') o se descarta
+        el mensaje nuevo ('drop_newest') o el más antiguo ('drop_oldest').
+        Con 'coalesce' solo queda pendiente el último mensaje de cada clave ('key',
+        por defecto el emisor): útil para instantáneas como inventory.v1.
         """
         if agent_id not in self._queues:
             self.logger.error(f"Error al suscribir: Agente '{agent_id}' no registrado.")
             raise ValueError(f"Agent '{agent_id}' must be registered before subscribing.")
 
-        if message_type not in self._subscriptions:
-            self._subscriptions[message_type] = set()
-            
-        self._subscriptions[message_type].add(agent_id)
+        if max_pending is not None or overflow == COALESCE:
+            if is_pattern(message_type):
+                raise ValueError(f"Los límites por tipo necesitan un tópico exacto, no '{message_type}'.")
+            self._queues[agent_id].limit(message_type, max_pending, overflow, key)
+
+        subscribers = self._subscriptions.setdefault(message_type, set())
+        if agent_id in subscribers:
+            return
+        subscribers.add(agent_id)
+        self._topics.add(message_type, agent_id)
+        self._routes.clear()
         self.logger.info(f"'{agent_id}' suscrito al tipo de mensaje: {message_type}.")
 
+    def unsubscribe(self, agent_id: str, message_type: str):
+        """Anula una suscripción (tópico o patrón exactamente como se registró)."""
+        subscribers = self._subscriptions.get(message_type)
+        if not subscribers or agent_id not in subscribers:
+            return
+        subscribers.discard(agent_id)
+        if not subscribers:
+            del self._subscriptions[message_type]
+        self._topics.remove(message_type, agent_id)
+        self._routes.clear()
+
+    def route(self, message_type: str) -> tuple:
+        """Agentes suscritos (directamente o por comodín) a un tipo de mensaje."""
+        recipients = self._routes.get(message_type)
+        if recipients is None:
+            recipients = self._routes[message_type] = tuple(sorted(self._topics.match(message_type)))
+        return recipients
+
 
     # ------------------------------------------------------------
     # Publishing Messages
     # ------------------------------------------------------------
     
-    async def publish(self, source_id: str, msg: Dict[str, Any]):
+    async def publish(self, source_id: str, msg: Mapping[str, Any]):
         """
         Método central de publicación que distribuye mensajes basados en 'type' 
         (Observer) o 'target' (Punto-a-Punto).
+        Un Envelope ya viene validado; cualquier otro mensaje se valida contra el esquema.
         """
-        # Validación de msg
-        try:
-            validate_message(msg) 
-        except Exception as e:
-            self.logger.error(f"Mensaje inválido publicado por '{source_id}': {e}", context={"message_payload": msg})
-            return
+        # Validación de msg (solo para mensajes externos)
+        if not isinstance(msg, Envelope):
+            try:
+                msg = Envelope.from_dict(msg)
+            except Exception as e:
+                self.logger.error(f"Mensaje inválido publicado por '{source_id}': {e}", context={"message_payload": msg})
+                return
 
-        message_type = msg.get('type', 'generic.v1')
-        target_id = msg.get('target')
-        
-        # Log de envío del mensaje
-        self.logger.log_agent_message(
-            direction="SENT",
-            message_type=message_type,
-            source=source_id,
-            target=target_id or 'BROADCAST',
-            payload=msg
-        )
+        message_type = msg.type
+        target_id = msg.target
 
-        # Distribución (Patrón Observer)
         # Distribución (Patrón Observer vs Point-to-Point)
-        recipients_found = 0
-        
         # CASO 1: UNICAST (Target específico y NO Broadcast)
         if target_id and target_id != "BROADCAST":
              # Entrega exclusiva al target
              if target_id in self._queues:
-                 await self._deliver(target_id, msg)
-                 recipients_found += 1
+                 recipients = [target_id]
              else:
+                 recipients = []
                  self.logger.error(f"Target '{target_id}' no encontrado para mensaje unicast.")
         
         # CASO 2: BROADCAST (Target es None o "BROADCAST")
         else:
-             if message_type in self._subscriptions:
-                 recipients = list(self._subscriptions[message_type])
-                 self.logger.info(f"Broadcasting '{message_type}' to {len(recipients)} recipients: {recipients}")
-                 for recipient_id in recipients:
-                     await self._deliver(recipient_id, msg)
-                     recipients_found += 1
-            
-        if recipients_found == 0 and not target_id:
-             self.logger.debug(f"Mensaje '{message_type}' publicado pero no tenía receptores suscritos ni un target definido.")
-
-
-    async def _deliver(self, target_id: str, msg: Dict[str, Any]):
-        """Función interna para colocar el mensaje en la cola de un agente."""
+             recipients = self.route(message_type)
+
+        # Log de envío del mensaje (un resumen, una vez por publicación)
+        self.logger.log_agent_message(
+            direction="SENT",
+            message_type=message_type,
+            source=source_id,
+            target=target_id or 'BROADCAST',
+            payload=msg.payload,
+            recipients=recipients
+        )
+
+        if not recipients:
+             if not target_id:
+                 self.logger.debug(f"Mensaje '{message_type}' publicado pero no tenía receptores suscritos ni un target definido.")
+             return
+
+        # Reparto sin esperas; los buzones llenos con política 'block' se atienden después
+        blocked = [recipient_id for recipient_id in recipients if self._offer(recipient_id, msg) is None]
+        for recipient_id in blocked:
+            await self._deliver(recipient_id, msg)
+
+    def _offer(self, target_id: str, msg: Mapping[str, Any]) -> Optional[bool]:
+        """Entrega sin esperar. True si entra, False si se descarta, None si hay que esperar."""
+        mailbox = self._queues.get(target_id)
+        if mailbox is None:
+            self.logger.error(f"Intento de entrega fallido: Agente '{target_id}' no está registrado.")
+            return False
+        accepted = mailbox.offer(msg)
+        if accepted:
+            self._notify(target_id)
+        elif accepted is False:
+            self.logger.debug(f"Mensaje '{msg.get('type')}' descartado: buzón de '{target_id}' lleno.")
+        return accepted
+
+    async def _deliver(self, target_id: str, msg: Mapping[str, Any]):
+        """Función interna para colocar el mensaje en la cola de un agente, esperando si está llena."""
         if target_id in self._queues:
-            await self._queues[target_id].put(msg)
+            if await self._queues[target_id].put(msg):
+                self._notify(target_id)
             # El log de RECEPCIÓN se hará cuando el agente lo extraiga de la cola.
         else:
             self.logger.error(f"Intento de entrega fallido: Agente '{target_id}' no está registrado.")
 
+    def _notify(self, target_id: str):
+        # Despertar solo al destinatario
+        listener = self._listeners.get(target_id)
+        if listener is not None:
+            listener()
+
 
     # ------------------------------------------------------------
     # Receiving Messages
@@ -124,8 +201,34 @@ class MessageBus:
 
         # Espera asíncrona por un mensaje
         msg = await self._queues[agent_id].get() 
+        return self._received(agent_id, msg)
 
-        # 4. Log de recepción del mensaje (traza de entrada)
+    def receive_nowait(self, agent_id: str):
+        """
+        Devuelve el próximo mensaje para este agente, o None si su cola está vacía.
+        """
+        if agent_id not in self._queues:
+            self.logger.error(f"Intento de recibir mensaje: Agente '{agent_id}' no está registrado.")
+            raise ValueError(f"Agent '{agent_id}' is not registered.")
+        try:
+            msg = self._queues[agent_id].get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+        return self._received(agent_id, msg)
+
+    def pending(self, agent_id: str) -> int:
+        """Número de mensajes en la cola del agente."""
+        queue = self._queues.get(agent_id)
+        return queue.qsize() if queue is not None else 0
+
+    def mailbox_stats(self, agent_id: Optional[str] = None) -> Dict[str, Any]:
+        """Métricas de profundidad, esperas y descartes de un buzón, o de todos por agent_id."""
+        if agent_id is not None:
+            return self._queues[agent_id].stats()
+        return {aid: mailbox.stats() for aid, mailbox in self._queues.items()}
+
+    def _received(self, agent_id: str, msg: Mapping[str, Any]):
+        # 4. Log de recepción del mensaje (traza de entrada, sin repetir el payload)
         # Extraemos el origen del mensaje del payload para la trazabilidad
         source = msg.get('source', 'SYSTEM') 
         message_type = msg.get('type', 'unknown.v1')
@@ -134,8 +237,7 @@ class MessageBus:
             direction="RECEIVED", 
             message_type=message_type, 
             source=source, 
-            target=agent_id, 
-            payload=msg
+            target=agent_id
         )
 
         return msg
\ No newline at end of file
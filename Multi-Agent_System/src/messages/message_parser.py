@@ -4,7 +4,8 @@ from messages.message_bus import MessageBus
 from utils.logging import Logger
 from typing import Dict, Any, Optional
 import os
-from utils.reflection import get_all_agents, get_all_structures
+from utils.reflection import get_all_agents
+from utils.structure_registry import get_structure_registry
 
 # Regex para analizar comandos como ./<agente> <comando> <parametro>
 COMMAND_PATTERN = re.compile(r"^\./([a-zA-Z]+) ([a-zA-Z]+)(?:\s+(.*))?$")
@@ -27,15 +28,14 @@ class MessageParser:
         self.valid_agents = set(name.lower().replace('bot', '') for name in get_all_agents(agents_dir).keys())
         self.valid_agents.add("workflow") # Añadimos el workflow
         
-        # Cargar dinámicamente con reflexión los nombres de las estructuras disponibles
+        # Registro de estructuras: se consulta en cada mensaje para ver también las que se añadan después
         self.structures_dir = os.path.join(self.root_dir, "builder_structures") # Multi-Agent_System/src/builder_structures
-        self.structures = list(get_all_structures(self.structures_dir).keys())
+        self.structures = get_structure_registry(self.structures_dir)
         
-        # Definir IDs que ignoraremos (verbos, keywords, y nombres de estructuras)
+        # Definir IDs que ignoraremos (verbos y keywords; los nombres de estructuras se comprueban aparte)
         self.ignored_ids = {'list', 'set', 'plan', 'bom', 'build'}
-        self.ignored_ids.update(self.structures)
 
-        self.logger.info(f"MessageParser inicializado. Estructuras cargadas: {self.structures}")
+        self.logger.info(f"MessageParser inicializado. Estructuras cargadas: {list(self.structures)}")
 
     async def process_chat_message(self, command_str: str):
         """
@@ -190,8 +190,8 @@ class MessageParser:
             
             # Si es un ID suelto que ha sobrevivido
             if "id" not in params:
-                 # Solo lo tratamos como ID si NO está en la lista de ignorados
-                 if token not in self.ignored_ids:
+                 # Solo lo tratamos como ID si NO está en la lista de ignorados ni es una estructura
+                 if token not in self.ignored_ids and token not in self.structures:
                      params["id"] = token
                      params["name"] = token
             
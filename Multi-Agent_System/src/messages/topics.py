@@ -0,0 +1,85 @@
+from typing import Dict, FrozenSet, Hashable, List, Set
+
+SEPARATOR = "."
+ONE = "*"  # Exactamente un segmento: command.*.v1
+ANY = "#"  # Cero o más segmentos: region.#
+
+def is_pattern(topic: str) -> bool:
+    """True si el tópico lleva comodines."""
+    return any(segment in (ONE, ANY) for segment in topic.split(SEPARATOR))
+
+class _Node:
+    __slots__ = ("children", "values", "wild")
+
+    def __init__(self, wild: bool = False):
+        self.children: Dict[str, "_Node"] = {}
+        self.values: Set[Hashable] = set()
+        self.wild = wild # Nodo '#': puede absorber cualquier número de segmentos
+
+class TopicTrie:
+    """
+    Trie de segmentos para tópicos jerárquicos separados por puntos.
+    Cada patrón guarda un conjunto de valores (p.ej. ids de agentes). Un tópico
+    concreto se resuelve recorriendo sus segmentos una sola vez: en cada paso solo
+    se siguen el hijo exacto, el comodín '*' y los '#' abiertos, así que el coste
+    depende de la profundidad del tópico y no del número de suscripciones.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+
+    def add(self, pattern: str, value: Hashable):
+        node = self._root
+        for segment in pattern.split(SEPARATOR):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _Node(wild=segment == ANY)
+            node = child
+        node.values.add(value)
+
+    def remove(self, pattern: str, value: Hashable):
+        segments = pattern.split(SEPARATOR)
+        path = [self._root]
+        for segment in segments:
+            node = path[-1].children.get(segment)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].values.discard(value)
+        # Podar las ramas que quedan vacías
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.values or node.children:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+
+    @staticmethod
+    def _expand(nodes) -> List[_Node]:
+        """Sin repetidos y con los '#' que cuelgan de cada nodo (pueden no consumir ningún segmento)."""
+        expanded = list(dict.fromkeys(nodes))
+        for node in expanded: # La lista crece mientras se recorre ('#.#')
+            hash_node = node.children.get(ANY)
+            if hash_node is not None and hash_node not in expanded:
+                expanded.append(hash_node)
+        return expanded
+
+    def match(self, topic: str) -> FrozenSet[Hashable]:
+        """Valores de todos los patrones que casan con el tópico."""
+        nodes = self._expand([self._root])
+        for segment in topic.split(SEPARATOR):
+            following = []
+            for node in nodes:
+                if node.wild:
+                    following.append(node) # '#' consume este segmento y sigue abierto
+                for key in (segment, ONE):
+                    child = node.children.get(key)
+                    if child is not None:
+                        following.append(child)
+            if not following:
+                return frozenset()
+            nodes = self._expand(following)
+
+        matched = set()
+        for node in nodes:
+            matched |= node.values
+        return frozenset(matched)
@@ -1,16 +1,15 @@
 from strategies.mining_strategy import MiningStrategy
 from typing import Dict
-import asyncio
 import mcpi.block as block
 from utils.logging import Logger
-from mcpi.minecraft import Minecraft
+from mcpi.minecraft import AsyncMinecraft
 
 class GridStrategy(MiningStrategy):
     """
     Estrategia Grid. Explores a cubic region following a structured grid pattern for uniform coverage.
     """
     
-    def __init__(self, mc: Minecraft, logger: Logger, agent_id: str):
+    def __init__(self, mc: AsyncMinecraft, logger: Logger, agent_id: str):
         super().__init__(mc, logger, agent_id)
         self.width = 5
         self.length = 5
@@ -35,11 +34,11 @@ class GridStrategy(MiningStrategy):
 
         try:
             # Identificar el bloque antes de picarlo
-            block_id = self.mc.getBlock(target_x, target_y, target_z)
+            block_id = await self.mc.getBlock(target_x, target_y, target_z)
 
             # Si no es aire, lo picamos y lo añadimos al inventario
             if block_id != block.AIR.id:
-                self.mc.setBlock(target_x, target_y, target_z, block.AIR.id)
+                await self.mc.setBlock(target_x, target_y, target_z, block.AIR.id)
                 current_inventory[block_id] = current_inventory.get(block_id, 0) + 1
                 self.logger.info(f"Bloque recolectado: ID {block_id} en ({target_x}, {target_y}, {target_z})")
             else:
@@ -57,5 +56,4 @@ class GridStrategy(MiningStrategy):
                 self.current_z = 0
                 self.current_y += 1
         
-        await asyncio.sleep(0.05)
         return True
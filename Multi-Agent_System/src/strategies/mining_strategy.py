@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import Dict
-from mcpi.minecraft import Minecraft
+from mcpi.minecraft import AsyncMinecraft
 from utils.logging import Logger
 
 class MiningStrategy(ABC):
@@ -9,7 +9,7 @@ class MiningStrategy(ABC):
     Define el contrato para ejecutar la lógica de extracción.
     """
     
-    def __init__(self, mc: Minecraft, logger: Logger, agent_id: str):
+    def __init__(self, mc: AsyncMinecraft, logger: Logger, agent_id: str):
         self.mc = mc
         self.logger = logger
         self.agent_id = agent_id
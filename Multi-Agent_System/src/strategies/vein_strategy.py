@@ -1,8 +1,7 @@
 from strategies.mining_strategy import MiningStrategy
 from typing import Dict, List, Tuple, Set
-import asyncio
 import mcpi.block as block
-from mcpi.minecraft import Minecraft
+from mcpi.minecraft import AsyncMinecraft
 from utils.logging import Logger
 
 class VeinStrategy(MiningStrategy):
@@ -11,7 +10,7 @@ class VeinStrategy(MiningStrategy):
     adjacent blocks to maximize yield.
     """
 
-    def __init__(self, mc: Minecraft, logger: Logger, agent_id: str):
+    def __init__(self, mc: AsyncMinecraft, logger: Logger, agent_id: str):
         super().__init__(mc, logger, agent_id)
         self.queue: List[Tuple[int, int, int]] = []
         self.visited: Set[Tuple[int, int, int]] = set()
@@ -31,7 +30,7 @@ class VeinStrategy(MiningStrategy):
             ignored_blocks = [block.AIR.id, block.BEDROCK.id, block.GRASS.id, block.DIRT.id] 
             
             try:
-                b_id = self.mc.getBlock(sx, sy, sz)
+                b_id = await self.mc.getBlock(sx, sy, sz)
             except Exception as e:
                 self.logger.error(f"Error reading block at start_pos: {e}")
                 return False
@@ -56,7 +55,7 @@ class VeinStrategy(MiningStrategy):
                             
                             chk_x, chk_y, chk_z = sx + dx, sy + dy, sz + dz
                             try:
-                                chk_id = self.mc.getBlock(chk_x, chk_y, chk_z)
+                                chk_id = await self.mc.getBlock(chk_x, chk_y, chk_z)
                             except: continue
 
                             # Logica de aceptacion
@@ -93,11 +92,11 @@ class VeinStrategy(MiningStrategy):
         
         try:
             # Verificar bloque actual
-            b_id = self.mc.getBlock(curr_x, curr_y, curr_z)
+            b_id = await self.mc.getBlock(curr_x, curr_y, curr_z)
             
             if b_id == self.target_id:
                 # Minar
-                self.mc.setBlock(curr_x, curr_y, curr_z, block.AIR.id)
+                await self.mc.setBlock(curr_x, curr_y, curr_z, block.AIR.id)
                 current_inventory[b_id] = current_inventory.get(b_id, 0) + 1
                 
                 # Añadir vecinos (6 direcciones)
@@ -112,5 +111,4 @@ class VeinStrategy(MiningStrategy):
         except Exception as e:
             self.logger.error(f"Error procesando veta en ({curr_x}, {curr_y}, {curr_z}): {e}")
         
-        await asyncio.sleep(0.05)
         return True
@@ -1,8 +1,7 @@
 from strategies.mining_strategy import MiningStrategy
 from typing import Dict
-import asyncio
 import mcpi.block as block
-from mcpi.minecraft import Minecraft
+from mcpi.minecraft import AsyncMinecraft
 from utils.logging import Logger
 
 class VerticalStrategy(MiningStrategy):
@@ -11,7 +10,7 @@ class VerticalStrategy(MiningStrategy):
     depths.
     """
     
-    def __init__(self, mc: Minecraft, logger: Logger, agent_id: str):
+    def __init__(self, mc: AsyncMinecraft, logger: Logger, agent_id: str):
         super().__init__(mc, logger, agent_id)
         self.current_depth = 0
         self.max_depth = 60
@@ -35,7 +34,7 @@ class VerticalStrategy(MiningStrategy):
 
         try:
             # Leer bloque
-            b_id = self.mc.getBlock(target_x, target_y, target_z)
+            b_id = await self.mc.getBlock(target_x, target_y, target_z)
             
             if self.current_depth == 0 or b_id != 0:
                 pass
@@ -49,7 +48,7 @@ class VerticalStrategy(MiningStrategy):
             # Minar (Si no es aire)
             if b_id != block.AIR.id:
                 # Poner AIRE explícitamente
-                self.mc.setBlock(target_x, target_y, target_z, block.AIR.id)
+                await self.mc.setBlock(target_x, target_y, target_z, block.AIR.id)
                 
                 # Añadir al inventario
                 current_inventory[b_id] = current_inventory.get(b_id, 0) + 1
@@ -63,7 +62,4 @@ class VerticalStrategy(MiningStrategy):
         # Avanzar profundidad
         self.current_depth += 1
         
-        # Pausa pequeña
-        await asyncio.sleep(0.5) 
-        
         return True
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 # MAPPING: Standard mapping logic
 BLOCK_MAPPING = {
     "air": 0,
@@ -414,59 +416,119 @@ BLOCK_MAPPING = {
     "chests": 54,
 }
 
+# Keyword fallbacks for names missing from BLOCK_MAPPING, checked in order
+FALLBACK_KEYWORDS = (
+    (("stairs",), 67),          # Cobble stairs generic
+    (("slab",), 44),            # Stone slab generic (safe default)
+    (("planks", "plank"), 5),
+    (("log",), 17),
+    (("leaves", "leaf"), 18),
+    (("glass",), 20),
+    (("fence",), 85),
+    (("gate",), 107),
+    (("wall",), 139),           # Cobble wall generic
+    (("door",), 64),
+    (("bed",), 26),
+)
+
+# User Default Request: Emerald Block for unknown
+DEFAULT_BLOCK_ID = 133
+
+# Legacy data value of the 16 dye colours (light_* first so they win over blue/gray)
+COLOR_DATA = (
+    ("light_blue", 3), ("light_gray", 8), ("white", 0), ("orange", 1), ("magenta", 2),
+    ("yellow", 4), ("lime", 5), ("pink", 6), ("gray", 7), ("cyan", 9), ("purple", 10),
+    ("blue", 11), ("brown", 12), ("green", 13), ("red", 14), ("black", 15),
+)
+# Wool, stained glass, terracotta, glass panes, carpet and concrete take the colour as data
+COLORED_BLOCK_IDS = {35, 95, 159, 160, 171, 251, 252}
+
+class BlockTranslator:
+    """
+    Precompiled name <-> ID translation table.
+    Plain and 'minecraft:' names are interned at construction, the reverse
+    id -> canonical name table (first name listed for each ID) is built once,
+    and any other raw string (block states, unknown names resolved through the
+    keyword fallbacks) is memoised in a bounded LRU.
+    """
+
+    def __init__(self, mapping: dict, cache_size: int = 4096):
+        self._ids = {}
+        for name, bid in mapping.items():
+            self._ids[name] = bid
+            self._ids["minecraft:" + name] = bid
+        self._names = {}
+        for name, bid in mapping.items():
+            self._names.setdefault(bid, name)
+        self._cache = OrderedDict()
+        self.cache_size = cache_size
+
+    def get_id(self, raw_name: str) -> int:
+        bid = self._ids.get(raw_name)
+        if bid is not None:
+            return bid
+        bid = self._cache.get(raw_name)
+        if bid is not None:
+            self._cache.move_to_end(raw_name)
+            return bid
+
+        bid = self._resolve(raw_name)
+        self._cache[raw_name] = bid
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return bid
+
+    def _resolve(self, raw_name: str) -> int:
+        # Sanitize name: remove 'minecraft:' prefix and '[properties]' suffix
+        base_name = raw_name.lower().split("[", 1)[0]
+        if ":" in base_name:
+            base_name = base_name.split(":")[1]
+
+        bid = self._ids.get(base_name)
+        if bid is not None:
+            return bid
+
+        # Partial / keyword analysis fallback for safety
+        for keywords, fallback_id in FALLBACK_KEYWORDS:
+            if any(keyword in base_name for keyword in keywords):
+                return fallback_id
+        return DEFAULT_BLOCK_ID
+
+    def get_state(self, raw_name: str) -> tuple:
+        """(id, data) of a block; data carries the colour of dyed blocks and is 0 otherwise."""
+        bid = self.get_id(raw_name)
+        if bid not in COLORED_BLOCK_IDS:
+            return bid, 0
+        base_name = raw_name.lower().split("[", 1)[0].split(":")[-1]
+        for color, data in COLOR_DATA:
+            if base_name.startswith(color + "_"):
+                return bid, data
+        return bid, 0
+
+    def intern(self, names) -> list:
+        """Translates a whole palette at once, returning the (id, data) states in the same order."""
+        return [self.get_state(name) for name in names]
+
+    def get_name(self, block_id: int) -> str:
+        return self._names.get(block_id, "unknown")
+
+TRANSLATOR = BlockTranslator(BLOCK_MAPPING)
+
 def get_block_id(raw_name: str) -> int:
     """
     Translates a Minecraft block name (e.g. 'minecraft:stone', 'minecraft:oak_stairs[facing=east]')
     to a numeric block ID compatible with MCPI/RaspberryJuice (Legacy IDs).
     """
-    
-    # 1. Sanitize name: remove 'minecraft:' prefix and '[properties]' suffix
-    raw_name = raw_name.lower()
-    
-    if "[" in raw_name:
-        base_name = raw_name.split("[")[0]
-    else:
-        base_name = raw_name
-        
-    if ":" in base_name:
-        base_name = base_name.split(":")[1]
-        
-    # 2. Lookup in Dictionary
-    if base_name in BLOCK_MAPPING:
-        return BLOCK_MAPPING[base_name]
-
-    # Partial / keyword analysis fallback for safety
-    if "stairs" in base_name:
-        return 67 # Cobble stairs generic
-    if "slab" in base_name:
-        return 44 # Stone slab generic (safe default)
-    if "planks" in base_name or "plank" in base_name:
-        return 5
-    if "log" in base_name:
-        return 17
-    if "leaves" in base_name or "leaf" in base_name:
-        return 18
-    if "glass" in base_name:
-        return 20
-    if "fence" in base_name:
-        return 85
-    if "gate" in base_name:
-        return 107
-    if "wall" in base_name:
-        return 139 # Cobble wall generic
-    if "door" in base_name:
-        return 64
-    if "bed" in base_name:
-        return 26
-    
-    # User Default Request: Emerald Block for unknown
-    return 133 
+    return TRANSLATOR.get_id(raw_name)
 
 def get_block_name(block_id: int) -> str:
     """
     Translates a numeric block ID to a canonical string name.
     """
-    for name, bid in BLOCK_MAPPING.items():
-        if bid == block_id:
-            return name
-    return "unknown"
+    return TRANSLATOR.get_name(block_id)
+
+def get_block_state(raw_name: str) -> tuple:
+    """
+    Translates a Minecraft block name to its legacy (id, data) pair.
+    """
+    return TRANSLATOR.get_state(raw_name)
@@ -0,0 +1,74 @@
+import asyncio
+import math
+from typing import Optional
+
+class CrewHalted(Exception):
+    """Una parte de la construcción repartida se ha pausado, detenido o rechazado."""
+    pass
+
+class BuildLedger:
+    """
+    Progreso compartido de una construcción repartida entre varios BuilderBot.
+    Cada parte informa de la primera capa que aún no ha terminado (todas las de
+    debajo ya están colocadas). Una capa solo se empieza cuando todas las partes
+    han terminado las inferiores, así que ningún bloque se coloca antes que el
+    soporte que tiene debajo, aunque ese soporte sea de otra parte.
+    Las esperas admiten 'timeout': segundos sin noticias de ninguna parte antes de
+    dar la construcción por atascada (una parte perdida o reiniciada). Una parte
+    que se pausa, se detiene o rechaza su asignación lo avisa con halt() y las
+    esperas terminan en el acto con CrewHalted, sin agotar el timeout.
+    """
+
+    def __init__(self, job_id: str, parts: int):
+        self.job_id = job_id
+        self.parts = parts
+        self.below = [0] * parts # Por parte: capas inferiores a este valor terminadas
+        self.halted = {} # Por parte: motivo por el que ha dejado de construir
+        self._changed = asyncio.Event()
+
+    def record(self, part: int, layer):
+        """Registra que la parte ha terminado todo lo que tiene por debajo de 'layer' (None = todo)."""
+        # Una parte que vuelve a informar (reanudada) ya no está parada
+        self.halted.pop(part, None)
+        layer = math.inf if layer is None else layer
+        if layer > self.below[part]:
+            self.below[part] = layer
+            self._changed.set()
+
+    def halt(self, part: int, reason: str):
+        """Registra que la parte ha dejado de construir ('paused', 'stopped', 'rejected'...)."""
+        self.halted[part] = reason
+        self._changed.set()
+
+    def ready(self, layer: int) -> bool:
+        return min(self.below) >= layer
+
+    @property
+    def done(self) -> bool:
+        return all(b == math.inf for b in self.below)
+
+    def lagging(self, layer=None) -> list:
+        """Partes que aún no han terminado lo que hay bajo 'layer' (None = todo)."""
+        layer = math.inf if layer is None else layer
+        return [part for part, below in enumerate(self.below) if below < layer]
+
+    async def _wait(self, layer, timeout: Optional[float]):
+        condition = (lambda: self.done) if layer is None else (lambda: self.ready(layer))
+        while not condition():
+            if self.halted:
+                parts = ", ".join(f"{part} ({reason})" for part, reason in sorted(self.halted.items()))
+                raise CrewHalted(f"{self.job_id}: partes detenidas: {parts}")
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError(
+                    f"{self.job_id}: sin progreso en {timeout}s de las partes {self.lagging(layer)}") from None
+
+    async def wait_ready(self, layer: int, timeout: Optional[float] = None):
+        """Espera a que todas las partes hayan terminado las capas inferiores a 'layer'."""
+        await self._wait(layer, timeout)
+
+    async def wait_done(self, timeout: Optional[float] = None):
+        """Espera a que todas las partes hayan terminado."""
+        await self._wait(None, timeout)
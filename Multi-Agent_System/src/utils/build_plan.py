@@ -0,0 +1,83 @@
+import numpy as np
+
+class BuildPlan:
+    """
+    Plan de construcción en streaming sobre los arrays de vóxeles (height, length, width).
+    Recorre la estructura capa a capa (y) y, dentro de cada capa, en orden (x, z),
+    generando solo los bloques no aire de la capa en curso. La posición en el plan es
+    un único entero (bloques ya colocados), así que una construcción se retoma desde
+    un checkpoint sin guardar la lista de bloques.
+    """
+
+    def __init__(self, ids: np.ndarray, data: np.ndarray, offset=(0, 0, 0)):
+        self.ids = ids
+        self.data = data
+        self.offset = tuple(offset) # (x, y, z) de ids[0, 0, 0] dentro de la estructura
+        counts = np.count_nonzero(ids, axis=(1, 2))
+        # layer_starts[y] = bloques de las capas inferiores a y
+        self.layer_starts = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.total = int(self.layer_starts[-1])
+
+    def __len__(self):
+        return self.total
+
+    def layer_of(self, cursor: int) -> int:
+        """Capa a la que pertenece el bloque número 'cursor'."""
+        return int(np.searchsorted(self.layer_starts, cursor, side='right')) - 1
+
+    def layer(self, y: int) -> np.ndarray:
+        """
+        Bloques de la capa y (relativa al plan) como array (n, 5) de filas
+        [x, y, z, id, data] en coordenadas de la estructura, en orden (x, z).
+        """
+        ids, data = self.ids[y].T, self.data[y].T # Índices [x, z]
+        x, z = np.nonzero(ids)
+        ox, oy, oz = self.offset
+        return np.column_stack([x + ox, np.full_like(x, y + oy), z + oz, ids[x, z], data[x, z]])
+
+    def batches(self, cursor: int = 0, batch_size: int = 256):
+        """
+        Genera (cursor tras el lote, filas) desde 'cursor' en orden de colocación.
+        Un lote nunca mezcla capas, de modo que cada capa se apoya en la anterior.
+        """
+        y = max(self.layer_of(cursor), 0)
+        while cursor < self.total and y < len(self.ids):
+            start, end = int(self.layer_starts[y]), int(self.layer_starts[y + 1])
+            if cursor < end:
+                rows = self.layer(y)
+                for offset in range(cursor - start, end - start, batch_size):
+                    batch = rows[offset:offset + batch_size]
+                    cursor = start + offset + len(batch)
+                    yield cursor, batch
+            y += 1
+
+    def partition(self, parts: int, mode: str = "tiles"):
+        """
+        Divide el plan en 'parts' planes disjuntos con un número de bloques parecido.
+        'tiles' corta en franjas a lo largo del eje horizontal más largo (x o z), de
+        modo que todas las partes trabajan en cada capa; 'layers' corta en bandas de
+        capas consecutivas. Las partes son vistas de los mismos arrays, sin copias.
+        """
+        if mode == "layers":
+            axis = 0
+        elif mode == "tiles":
+            axis = 2 if self.ids.shape[2] >= self.ids.shape[1] else 1
+        else:
+            raise ValueError(f"Modo de reparto desconocido: {mode}")
+
+        other_axes = tuple(a for a in range(3) if a != axis)
+        cumulative = np.cumsum(np.count_nonzero(self.ids, axis=other_axes))
+        targets = self.total * np.arange(1, parts) / parts
+        inner = np.minimum(np.searchsorted(cumulative, targets, side='left') + 1, len(cumulative))
+        cuts = [0, *inner.tolist(), self.ids.shape[axis]]
+
+        ox, oy, oz = self.offset
+        plans = []
+        for start, end in zip(cuts[:-1], cuts[1:]):
+            window = [slice(None)] * 3
+            window[axis] = slice(start, end)
+            window = tuple(window)
+            # Ejes de los arrays: 0 = y, 1 = z, 2 = x
+            offset = (ox + (start if axis == 2 else 0), oy + (start if axis == 0 else 0), oz + (start if axis == 1 else 0))
+            plans.append(BuildPlan(self.ids[window], self.data[window], offset))
+        return plans
@@ -0,0 +1,150 @@
+import asyncio
+from typing import Dict, List
+from mcpi.connection import AsyncConnection
+from mcpi.minecraft import AsyncMinecraft
+from utils.logging import Logger
+
+class PooledSession:
+    """
+    Sesión de un agente sobre una conexión del pool.
+    Se comporta como un AsyncMinecraft: los atributos (setBlock, player, events...)
+    se resuelven en cada acceso contra la conexión actual de su ranura, de modo que
+    una reconexión del pool es transparente para el agente.
+    """
+
+    def __init__(self, pool: "ConnectionPool", key: str, slot: int):
+        self.pool = pool
+        self.key = key
+        self.slot = slot
+
+    @property
+    def mc(self) -> AsyncMinecraft:
+        return self.pool.connections[self.slot]
+
+    def __getattr__(self, name):
+        return getattr(self.pool.connections[self.slot], name)
+
+    async def reconnect(self):
+        """Fuerza la reconexión de la ranura de esta sesión."""
+        await self.pool.reconnect(self.slot)
+
+class ConnectionPool:
+    """
+    Pool de conexiones al servidor RaspberryJuice.
+    Abre 'size' sockets independientes y asigna cada clave (id de agente o tipo de
+    carga de trabajo) a una ranura por turnos, así el tráfico masivo de un agente no
+    bloquea al resto. Incluye comprobaciones de salud periódicas y reconexión.
+    """
+
+    def __init__(self, address: str = "localhost", port: int = 4711, size: int = 4,
+                 health_interval: float = 10.0, health_timeout: float = 2.0, connect=None):
+        if size < 1:
+            raise ValueError("El tamaño del pool debe ser al menos 1.")
+        self.address = address
+        self.port = port
+        self.size = size
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.connect = connect or AsyncMinecraft.create
+        self.logger = Logger(self.__class__.__name__)
+
+        self.connections: List[AsyncMinecraft] = []
+        self.sessions: Dict[str, PooledSession] = {}
+        self._health_task = None
+
+    async def open(self):
+        """Abre todas las conexiones del pool."""
+        try:
+            for _ in range(self.size):
+                self.connections.append(await self.connect(self.address, self.port))
+        except Exception:
+            await self.close()
+            raise
+        self.logger.info(f"Pool de conexiones abierto ({self.size} conexiones a {self.address}:{self.port}).")
+
+    def session(self, key: str) -> PooledSession:
+        """Devuelve la sesión asociada a la clave, asignándole una ranura si es nueva."""
+        if not self.connections:
+            raise RuntimeError("El pool de conexiones no está abierto.")
+        if key not in self.sessions:
+            self.sessions[key] = PooledSession(self, key, len(self.sessions) % self.size)
+        return self.sessions[key]
+
+    async def reconnect(self, slot: int):
+        """Sustituye la conexión de una ranura por una nueva."""
+        old = self.connections[slot]
+        try:
+            self.connections[slot] = await self.connect(self.address, self.port)
+            self.logger.info(f"Conexión {slot} del pool restablecida.")
+        except Exception as e:
+            self.logger.error(f"No se pudo reconectar la conexión {slot}: {e}")
+            return
+        try:
+            await old.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _progress(mc):
+        """(respuestas leídas, bytes pendientes de enviar) de la conexión, si es una AsyncConnection."""
+        conn = getattr(mc, "conn", None)
+        if not isinstance(conn, AsyncConnection):
+            return None
+        return conn.replies, conn.backlog()
+
+    async def is_healthy(self, slot: int) -> bool:
+        """
+        Comprueba una conexión con una consulta ligera y un tiempo máximo de respuesta.
+        Cualquier respuesta cuenta como sana, también un "Fail" (RaspberryJuice lo
+        devuelve a world.getPlayerIds si no hay jugadores); solo el tiempo agotado y
+        los errores de socket indican una conexión muerta.
+        La consulta va a la cola del mismo pipeline que el tráfico de los agentes: si
+        la ranura está ocupada, el plazo vuelve a empezar mientras la conexión avance
+        (llegan respuestas o el servidor sigue leyendo lo pendiente de enviar).
+        """
+        mc = self.connections[slot]
+        probe = asyncio.ensure_future(mc.getPlayerEntityIds())
+        mark = self._progress(mc)
+        try:
+            while True:
+                done, _ = await asyncio.wait({probe}, timeout=self.health_timeout)
+                if done:
+                    probe.result()
+                    return True
+                now = self._progress(mc)
+                if mark is None or not (now[0] > mark[0] or now[1] < mark[1]):
+                    raise asyncio.TimeoutError()
+                mark = now
+        except (asyncio.TimeoutError, ConnectionError, OSError):
+            probe.cancel()
+            return False
+        except Exception:
+            return True
+
+    async def check_health(self):
+        """Reconecta las conexiones que no responden."""
+        for slot in range(len(self.connections)):
+            if not await self.is_healthy(slot):
+                self.logger.error(f"Conexión {slot} del pool sin respuesta, reconectando.")
+                await self.reconnect(slot)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await self.check_health()
+
+    def start_health_checks(self):
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for conn in self.connections:
+            try:
+                await conn.close()
+            except Exception:
+                pass
+        self.connections = []
+        self.sessions.clear()
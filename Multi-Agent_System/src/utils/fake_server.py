@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+from collections import Counter
+from typing import List, Optional, Tuple
+import numpy as np
+import mcpi.block as block
+
+class FakeRaspberryJuice:
+    """
+    Servidor RaspberryJuice simulado en asyncio para pruebas y benchmarks sin Minecraft.
+    Habla el mismo protocolo de líneas que mcpi y guarda el mundo en arrays NumPy
+    [y, x, z] (ids y datos) con terreno procedural determinista.
+    Comandos: world.getBlock(WithData), world.getBlocks, world.getHeight,
+    world.setBlock(s), world.getPlayerIds, chat.post, events.chat.posts,
+    events.block.hits, events.clear y player/entity getTile/setTile/getPos/setPos.
+    Cada respuesta se retrasa 'latency' segundos sin bloquear las siguientes, como un
+    enlace de red con ese tiempo de ida. Se cuentan los comandos recibidos por tipo
+    y los bytes de entrada y salida.
+    """
+    PLAYER_ID = 1
+
+    def __init__(self, size: int = 256, height: int = 256, seed: int = 0, latency: float = 0.0,
+                 base_height: int = 64, amplitude: int = 6):
+        self.size = size
+        self.height = height
+        self.origin = size // 2 # x, z del mundo en [-origin, size - origin)
+        self.latency = latency
+
+        self.ids = np.zeros((height, size, size), dtype=np.uint16)
+        self.data = np.zeros((height, size, size), dtype=np.uint8)
+        self._generate_terrain(seed, base_height, amplitude)
+
+        self.player_pos = [0.0, float(self.get_height(0, 0)), 0.0]
+        self.chat_log: List[str] = []
+        self._chat_events: List[Tuple[int, str]] = []
+        self._hit_events: List[Tuple[int, int, int, int, int]] = []
+
+        self.counters = Counter()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._server = None
+
+    # ------------------------------------------------------------------
+    # Mundo
+    # ------------------------------------------------------------------
+    def _generate_terrain(self, seed: int, base_height: int, amplitude: int):
+        """Colinas suaves de hierba sobre tierra y piedra, con vetas de mineral y lecho de roca."""
+        rng = np.random.default_rng(seed)
+        coords = np.arange(self.size) - self.origin
+        x, z = np.meshgrid(coords, coords, indexing="ij")
+        phase = rng.uniform(0, 2 * np.pi, 4)
+        surface = (base_height
+                   + amplitude * 0.6 * np.sin(x / 23.0 + phase[0]) * np.cos(z / 19.0 + phase[1])
+                   + amplitude * 0.4 * np.sin((x + z) / 11.0 + phase[2]) * np.sin(z / 7.0 + phase[3]))
+        surface = np.clip(surface.round().astype(int), 2, self.height - 1) # Y del primer bloque de aire
+
+        y = np.arange(self.height).reshape(-1, 1, 1)
+        top = surface[np.newaxis, :, :]
+        self.ids[y < top - 4] = block.STONE.id
+        self.ids[(y >= top - 4) & (y < top - 1)] = block.DIRT.id
+        self.ids[y == top - 1] = block.GRASS.id
+
+        # Minerales en posiciones aleatorias que caen en piedra
+        flat = self.ids.reshape(-1)
+        stone_count = int(np.count_nonzero(flat == block.STONE.id))
+        for ore, rate in ((block.COAL_ORE, 0.01), (block.IRON_ORE, 0.006),
+                          (block.GOLD_ORE, 0.002), (block.DIAMOND_ORE, 0.001)):
+            picks = rng.integers(0, flat.size, int(stone_count * rate))
+            picks = picks[flat[picks] == block.STONE.id]
+            flat[picks] = ore.id
+        self.ids[0] = block.BEDROCK.id
+
+    def _index(self, x: int, z: int) -> Tuple[int, int]:
+        return x + self.origin, z + self.origin
+
+    def _inside(self, x: int, y: int, z: int) -> bool:
+        ix, iz = self._index(x, z)
+        return 0 <= y < self.height and 0 <= ix < self.size and 0 <= iz < self.size
+
+    def get_block(self, x: int, y: int, z: int) -> Tuple[int, int]:
+        if not self._inside(x, y, z):
+            return block.AIR.id, 0
+        ix, iz = self._index(x, z)
+        return int(self.ids[y, ix, iz]), int(self.data[y, ix, iz])
+
+    def get_height(self, x: int, z: int) -> int:
+        """Como RaspberryJuice: Y del primer bloque de aire sobre el bloque no-aire más alto."""
+        if not self._inside(x, 0, z):
+            return 0
+        ix, iz = self._index(x, z)
+        solid = np.flatnonzero(self.ids[:, ix, iz])
+        return int(solid[-1]) + 1 if solid.size else 0
+
+    def _clip(self, x0, y0, z0, x1, y1, z1):
+        """Ordena el cuboide y lo recorta al mundo; devuelve (cuboide, slices) o None si queda fuera."""
+        x0, x1 = sorted((x0, x1))
+        y0, y1 = sorted((y0, y1))
+        z0, z1 = sorted((z0, z1))
+        lo = (max(y0, 0), max(x0 + self.origin, 0), max(z0 + self.origin, 0))
+        hi = (min(y1, self.height - 1), min(x1 + self.origin, self.size - 1), min(z1 + self.origin, self.size - 1))
+        cuboid = (x0, y0, z0, x1, y1, z1)
+        if any(l > h for l, h in zip(lo, hi)):
+            return cuboid, None
+        return cuboid, tuple(slice(l, h + 1) for l, h in zip(lo, hi))
+
+    def get_blocks(self, x0, y0, z0, x1, y1, z1) -> np.ndarray:
+        """Cuboide en orden de respuesta de RaspberryJuice: array [y, x, z]."""
+        (x0, y0, z0, x1, y1, z1), slices = self._clip(x0, y0, z0, x1, y1, z1)
+        out = np.zeros((y1 - y0 + 1, x1 - x0 + 1, z1 - z0 + 1), dtype=np.uint16)
+        if slices is not None:
+            sy, sx, sz = slices
+            out[sy.start - y0:sy.stop - y0,
+                sx.start - self.origin - x0:sx.stop - self.origin - x0,
+                sz.start - self.origin - z0:sz.stop - self.origin - z0] = self.ids[slices]
+        return out
+
+    def set_blocks(self, x0, y0, z0, x1, y1, z1, block_id, data=0):
+        _, slices = self._clip(x0, y0, z0, x1, y1, z1)
+        if slices is not None:
+            self.ids[slices] = block_id
+            self.data[slices] = data
+
+    def inject_chat(self, message: str, entity_id: int = PLAYER_ID):
+        """Simula un mensaje de chat escrito por un jugador."""
+        self._chat_events.append((entity_id, message))
+
+    def inject_block_hit(self, x: int, y: int, z: int, face: int = 1, entity_id: int = PLAYER_ID):
+        """Simula un golpe de espada sobre un bloque."""
+        self._hit_events.append((x, y, z, face, entity_id))
+
+    # ------------------------------------------------------------------
+    # Protocolo
+    # ------------------------------------------------------------------
+    def handle_command(self, line: str) -> Optional[str]:
+        """Ejecuta una línea del protocolo y devuelve la respuesta (None si no tiene)."""
+        open_paren = line.find("(")
+        if open_paren < 0 or not line.endswith(")"):
+            self.counters["invalid"] += 1
+            return "Fail"
+        cmd = line[:open_paren]
+        raw = line[open_paren + 1:-1]
+        self.counters[cmd] += 1
+
+        try:
+            if cmd == "chat.post":
+                self.chat_log.append(raw)
+                return None
+
+            args = raw.split(",") if raw else []
+            if cmd == "world.getBlock":
+                return str(self.get_block(*map(int, args))[0])
+            if cmd == "world.getBlockWithData":
+                return "%d,%d" % self.get_block(*map(int, args))
+            if cmd == "world.getBlocks":
+                return ",".join(map(str, self.get_blocks(*map(int, args)).ravel().tolist()))
+            if cmd == "world.getHeight":
+                return str(self.get_height(*map(int, args)))
+            if cmd == "world.setBlock":
+                x, y, z, block_id, *data = map(int, args)
+                self.set_blocks(x, y, z, x, y, z, block_id, *data[:1])
+                return None
+            if cmd == "world.setBlocks":
+                coords_and_block = list(map(int, args))
+                self.set_blocks(*coords_and_block[:7], *coords_and_block[7:8])
+                return None
+            if cmd == "world.getPlayerIds":
+                return str(self.PLAYER_ID)
+            if cmd == "events.chat.posts":
+                events, self._chat_events = self._chat_events, []
+                return "|".join(f"{eid},{msg}" for eid, msg in events)
+            if cmd == "events.block.hits":
+                events, self._hit_events = self._hit_events, []
+                return "|".join(",".join(map(str, e)) for e in events)
+            if cmd == "events.clear":
+                self._chat_events.clear()
+                self._hit_events.clear()
+                return None
+
+            # player.* no lleva id; entity.* lleva el id como primer argumento
+            namespace, _, method = cmd.partition(".")
+            if namespace == "entity":
+                args = args[1:]
+            if namespace in ("player", "entity"):
+                if method == "getTile":
+                    return ",".join(str(int(np.floor(c))) for c in self.player_pos)
+                if method == "getPos":
+                    return ",".join(str(c) for c in self.player_pos)
+                if method in ("setTile", "setPos"):
+                    self.player_pos = [float(a) for a in args]
+                    return None
+        except (TypeError, ValueError):
+            return "Fail"
+
+        self.counters["unsupported"] += 1
+        return "Fail"
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.bytes_in += len(line)
+                reply = self.handle_command(line.decode("cp437").rstrip("\r\n"))
+                if reply is None:
+                    continue
+                data = (reply + "\n").encode("cp437")
+                self.bytes_out += len(data)
+                if self.latency > 0:
+                    loop.call_later(self.latency, self._write, writer, data)
+                else:
+                    writer.write(data)
+                    if writer.transport.get_write_buffer_size() > 1 << 20:
+                        await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _write(writer: asyncio.StreamWriter, data: bytes):
+        if not writer.is_closing():
+            writer.write(data)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Arranca el servidor y devuelve el puerto en el que escucha."""
+        self._server = await asyncio.start_server(self._handle_client, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+async def _serve(args):
+    server = FakeRaspberryJuice(size=args.size, seed=args.seed, latency=args.latency)
+    port = await server.start(args.host, args.port)
+    print(f"[INFO] Servidor RaspberryJuice simulado escuchando en {args.host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor RaspberryJuice simulado")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4711)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
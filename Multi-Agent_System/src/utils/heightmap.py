@@ -0,0 +1,93 @@
+from typing import Dict, List, Tuple
+import numpy as np
+import mcpi.block as block
+
+class HeightmapProvider:
+    """
+    Proveedor de alturas de terreno basado en world.getBlocks.
+    En lugar de un world.getHeight por celda, divide la región en teselas XZ y lee
+    cada tesela con unos pocos cortes (slabs) de getBlocks alrededor de una altura
+    de referencia. La altura de cada columna se calcula localmente con la misma
+    semántica que world.getHeight: la Y del primer bloque de aire sobre el bloque
+    no-aire más alto.
+    Si la superficie queda fuera del corte, solo las columnas afectadas se vuelven
+    a leer con un corte superior o inferior.
+    """
+
+    def __init__(self, mc, tile_size: int = 32, slab_height: int = 16, min_y: int = 0, max_y: int = 255):
+        self.mc = mc
+        self.tile_size = tile_size
+        self.slab_height = slab_height
+        self.min_y = min_y
+        self.max_y = max_y
+        self.requests = 0 # Peticiones enviadas (para métricas)
+
+    async def get_heights(self, min_x: int, min_z: int, max_x: int, max_z: int) -> Dict[Tuple[int, int], int]:
+        """Devuelve {(x, z): altura} para todo el rectángulo [min_x..max_x] x [min_z..max_z]."""
+        tiles = []
+        for tx in range(min_x, max_x + 1, self.tile_size):
+            for tz in range(min_z, max_z + 1, self.tile_size):
+                tiles.append((tx, tz, min(tx + self.tile_size - 1, max_x), min(tz + self.tile_size - 1, max_z)))
+
+        # Alturas de referencia de todas las teselas en un único lote
+        centers = [((x0 + x1) // 2, (z0 + z1) // 2) for (x0, z0, x1, z1) in tiles]
+        seeds = await self.mc.getHeights(centers) if centers else []
+        self.requests += len(centers)
+
+        heights = {}
+        for (x0, z0, x1, z1), seed in zip(tiles, seeds):
+            cells = [(x, z) for x in range(x0, x1 + 1) for z in range(z0, z1 + 1)]
+            lo = max(self.min_y, min(seed, self.max_y) - self.slab_height // 2)
+            hi = min(self.max_y, lo + self.slab_height - 1)
+            heights.update(await self._resolve(cells, lo, hi))
+        return heights
+
+    async def _resolve(self, cells: List[Tuple[int, int]], lo: int, hi: int) -> Dict[Tuple[int, int], int]:
+        """
+        Resuelve la altura de las columnas dadas leyendo cortes [lo..hi].
+        Cada trabajo recuerda lo que ya se sabe de fuera del corte:
+        - solid_below: la celda lo-1 no es aire (venimos de un corte inferior)
+        - air_above: la celda hi+1 es aire (venimos de un corte superior)
+        """
+        heights = {}
+        jobs = [(lo, hi, cells, False, False)]
+
+        while jobs:
+            lo, hi, cells, solid_below, air_above = jobs.pop()
+            bx0 = min(x for x, _ in cells)
+            bx1 = max(x for x, _ in cells)
+            bz0 = min(z for _, z in cells)
+            bz1 = max(z for _, z in cells)
+
+            # Corte como array [y, z, x]; se calcula el bloque sólido más alto de cada columna
+            solid = (await self.mc.getBlocksArray(bx0, lo, bz0, bx1, hi, bz1)) != block.AIR.id
+            self.requests += 1
+            has_solid = solid.any(axis=0)
+            top = (hi - lo) - np.argmax(solid[::-1], axis=0) + lo
+
+            up, down = [], []
+            for (x, z) in cells:
+                col = (z - bz0, x - bx0)
+
+                if solid[-1][col]:
+                    # Superficie en el techo del corte o por encima
+                    if air_above or hi >= self.max_y:
+                        heights[(x, z)] = hi + 1
+                    else:
+                        up.append((x, z))
+                elif has_solid[col]:
+                    heights[(x, z)] = int(top[col]) + 1
+                elif solid_below:
+                    # Todo el corte es aire sobre un bloque sólido
+                    heights[(x, z)] = lo
+                elif lo <= self.min_y:
+                    heights[(x, z)] = self.min_y
+                else:
+                    down.append((x, z))
+
+            if up:
+                jobs.append((hi + 1, min(self.max_y, hi + self.slab_height), up, True, False))
+            if down:
+                jobs.append((max(self.min_y, lo - self.slab_height), lo - 1, down, False, True))
+
+        return heights
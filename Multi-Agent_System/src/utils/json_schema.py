@@ -1,4 +1,7 @@
 import datetime
+from collections.abc import Mapping
+
+VALID_STATUS = frozenset({"SUCCESS", "ERROR", "FAILURE", "RUNNING", "PROCESSING", "WAITING", "INITIATED"})
 
 class SchemaError(Exception):
     """Se lanza cuando un mensaje no tiene el formato requerido"""
@@ -26,7 +29,7 @@ def validate_message(msg: dict):
     - context: optional dict
     """
 
-    if not isinstance(msg, dict):
+    if not isinstance(msg, Mapping):
         raise SchemaError("El mensaje debe ser un diccionario.")
 
     required = ["type", "source", "target", "timestamp", "payload", "status"]
@@ -56,14 +59,12 @@ def validate_message(msg: dict):
         raise SchemaError("El campo 'payload' debe ser un diccionario.")
 
     # status
-    valid_status = {"SUCCESS", "ERROR", "RUNNING", "PROCESSING", "WAITING", "INITIATED"}
-
     if not isinstance(msg["status"], str):
         raise SchemaError("El campo 'status' debe ser una cadena.")
 
-    if msg["status"] not in valid_status:
+    if msg["status"] not in VALID_STATUS:
         raise SchemaError(
-            f"Valor de 'status' inválido: {msg['status']}. Esperado: {valid_status}")
+            f"Valor de 'status' inválido: {msg['status']}. Esperado: {VALID_STATUS}")
 
     # context (opcional)
     if "context" in msg and not isinstance(msg["context"], dict):
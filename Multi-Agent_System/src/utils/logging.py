@@ -2,7 +2,8 @@ import logging
 import json
 import datetime
 import os
-from typing import Any, Dict, Optional
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional
 from agents.state_model import State
 
 from pathlib import Path
@@ -22,6 +23,23 @@ def clear_prev_logs():
                 except Exception:
                     pass # Ignorar archivos bloqueados
 
+def summarize_payload(payload) -> Dict[str, Any]:
+    """
+    Resumen de un payload para los logs: los valores simples se copian y las
+    colecciones se sustituyen por su tipo y tamaño (un map.v1 lleva miles de coordenadas).
+    """
+    if not isinstance(payload, Mapping):
+        return {"type": type(payload).__name__}
+    summary = {}
+    for key, value in payload.items():
+        if value is None or isinstance(value, (str, int, float, bool)):
+            summary[key] = value
+        elif hasattr(value, "__len__"):
+            summary[key] = f"<{type(value).__name__} len={len(value)}>"
+        else:
+            summary[key] = f"<{type(value).__name__}>"
+    return summary
+
 class Json_log_formatter(logging.Formatter):
     """
     Formateador personalizado para transformar los registros de log en JSON.
@@ -117,7 +135,8 @@ class Logger:
         }
         self.info(f"State changed from {prev_state.name} to {next_state.name}", context=context)
 
-    def log_agent_message(self, direction: str, message_type: str, source: str, target: str, payload: Dict):
+    def log_agent_message(self, direction: str, message_type: str, source: str, target: str,
+                          payload: Optional[Dict] = None, recipients: Optional[List[str]] = None):
         """
         Función para loguear mensajes enviados o recibidos 
         """
@@ -128,6 +147,9 @@ class Logger:
             "message_type": message_type,
             "source": source,
             "target": target,
-            "payload_summary": payload
         }
+        if payload is not None:
+            context["payload_summary"] = summarize_payload(payload)
+        if recipients is not None:
+            context["recipients"] = recipients
         self.info(f"Message {direction}: {message_type} from {source} to {target}", context=context)
\ No newline at end of file
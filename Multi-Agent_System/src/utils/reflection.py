@@ -4,7 +4,7 @@ import inspect
 from agents.base_agent import BaseAgent
 from strategies.mining_strategy import MiningStrategy
 from utils.logging import Logger
-from utils.schematic_parser import SchematicParser
+from utils.structure_cache import load_structure
 
 # Inicializar logger compartido
 logger = Logger("Reflection")
@@ -82,8 +82,9 @@ def get_all_strategies(strategies_dir):
 def get_all_structures(structures_dir):
     """
     Escanea el directorio dado (ej: 'builder_structures/') para encontrar archivos .schem.
-    Utiliza SchematicTranslator para cargarlos.
-    Devuelve un diccionario {nombre_estructura: objeto_translator}.
+    Los carga con utils.structure_cache, que reutiliza la versión compilada en disco
+    mientras el fichero no cambie.
+    Devuelve un diccionario {nombre_estructura: SchematicParser}.
     """
     found_structures = {}
     if not os.path.exists(structures_dir):
@@ -97,7 +98,7 @@ def get_all_structures(structures_dir):
             path = os.path.join(structures_dir, filename)
             
             try:
-                parser = SchematicParser(path)
+                parser = load_structure(path)
                 found_structures[name] = parser
             except Exception as e:
                 logger.error(f"Error cargando estructura {filename}: {e}")
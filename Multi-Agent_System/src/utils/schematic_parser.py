@@ -1,5 +1,8 @@
 import gzip
 import struct
+import numpy as np
+from utils.block_translator import TRANSLATOR
+from utils.build_plan import BuildPlan
 
 class SimpleNBT:
     # Constantes de Etiquetas
@@ -102,11 +105,90 @@ class SimpleNBT:
         length = struct.unpack('>H', stream.read(2))[0]
         return stream.read(length).decode('utf-8')
 
+class FastNBT:
+    """
+    Lector NBT sobre el fichero ya descomprimido en memoria.
+    Recorre un memoryview con desplazamientos en lugar de leer campo a campo de un
+    stream gzip, y decodifica en bloque las listas numéricas (struct.unpack_from con
+    repetición) y los TAG_Int_Array/TAG_Long_Array (numpy.frombuffer).
+    """
+    _SCALARS = {
+        SimpleNBT.TAG_Byte: struct.Struct('>b'),
+        SimpleNBT.TAG_Short: struct.Struct('>h'),
+        SimpleNBT.TAG_Int: struct.Struct('>i'),
+        SimpleNBT.TAG_Long: struct.Struct('>q'),
+        SimpleNBT.TAG_Float: struct.Struct('>f'),
+        SimpleNBT.TAG_Double: struct.Struct('>d'),
+    }
+    _ARRAYS = {
+        SimpleNBT.TAG_Int_Array: np.dtype('>i4'),
+        SimpleNBT.TAG_Long_Array: np.dtype('>i8'),
+    }
+    _INT = struct.Struct('>i')
+    _USHORT = struct.Struct('>H')
+
+    @staticmethod
+    def parse(data):
+        view = memoryview(data)
+        if not view or view[0] == SimpleNBT.TAG_End:
+            return None
+        _, offset = FastNBT.read_string(view, 1) # Nombre de la raíz
+        payload, _ = FastNBT.read_payload(view, offset, view[0])
+        return payload
+
+    @staticmethod
+    def read_string(view, offset):
+        (length,) = FastNBT._USHORT.unpack_from(view, offset)
+        offset += 2
+        return str(view[offset:offset + length], 'utf-8'), offset + length
+
+    @staticmethod
+    def read_payload(view, offset, tag_type):
+        """Devuelve (valor, desplazamiento siguiente)."""
+        scalar = FastNBT._SCALARS.get(tag_type)
+        if scalar is not None:
+            return scalar.unpack_from(view, offset)[0], offset + scalar.size
+
+        if tag_type == SimpleNBT.TAG_Compound:
+            compound = {}
+            while True:
+                child_type = view[offset]
+                if child_type == SimpleNBT.TAG_End:
+                    return compound, offset + 1
+                child_name, offset = FastNBT.read_string(view, offset + 1)
+                compound[child_name], offset = FastNBT.read_payload(view, offset, child_type)
+        if tag_type == SimpleNBT.TAG_String:
+            return FastNBT.read_string(view, offset)
+        if tag_type == SimpleNBT.TAG_Byte_Array:
+            (length,) = FastNBT._INT.unpack_from(view, offset)
+            offset += 4
+            return view[offset:offset + length].tobytes(), offset + length
+        if tag_type in FastNBT._ARRAYS:
+            dtype = FastNBT._ARRAYS[tag_type]
+            (length,) = FastNBT._INT.unpack_from(view, offset)
+            offset += 4
+            values = np.frombuffer(view, dtype=dtype, count=length, offset=offset)
+            return values.astype(dtype.newbyteorder('=')), offset + length * dtype.itemsize
+        if tag_type == SimpleNBT.TAG_List:
+            elem_type = view[offset]
+            (length,) = FastNBT._INT.unpack_from(view, offset + 1)
+            offset += 5
+            scalar = FastNBT._SCALARS.get(elem_type)
+            if scalar is not None:
+                values = struct.unpack_from(f">{length}{scalar.format[-1]}", view, offset)
+                return list(values), offset + length * scalar.size
+            items = []
+            for _ in range(length):
+                item, offset = FastNBT.read_payload(view, offset, elem_type)
+                items.append(item)
+            return items, offset
+        raise ValueError(f"Unknown tag type: {tag_type}")
+
 class SchematicParser:
     def __init__(self, filepath):
         self.filepath = filepath
         self.data = self._load()
-        self.blocks_cache = None
+        self._init_caches()
         
         # Dimensiones
         self.width = 0
@@ -114,10 +196,38 @@ class SchematicParser:
         self.length = 0
         self._parse_dimensions()
 
+    @classmethod
+    def from_compiled(cls, filepath, dimensions, palette, bom, bbox, load_indices):
+        """
+        Parser creado desde una estructura ya compilada (ver utils.structure_cache):
+        dimensiones, paleta traducida, BOM y caja están disponibles sin leer el
+        esquemático, y los índices se cargan con load_indices() en el primer uso.
+        """
+        parser = cls.__new__(cls)
+        parser.filepath = filepath
+        parser.data = {}
+        parser._init_caches()
+        parser.width, parser.height, parser.length = dimensions
+        parser.palette_cache = palette
+        parser.bom_cache = bom
+        parser.bbox_cache = bbox
+        parser._load_indices = load_indices
+        return parser
+
+    def _init_caches(self):
+        self.blocks_cache = None
+        self.palette_cache = None
+        self.indices_cache = None
+        self.voxels_cache = None
+        self.bom_cache = None
+        self.bbox_cache = None
+        self._load_indices = None
+
     def _load(self):
         try:
-            with gzip.open(self.filepath, 'rb') as f:
-                return SimpleNBT.parse(f)
+            # Descomprimir de una vez y recorrer el buffer en memoria
+            with open(self.filepath, 'rb') as f:
+                return FastNBT.parse(gzip.decompress(f.read()))
         except Exception as e:
             print(f"Error loading {self.filepath}: {e}")
             return {}
@@ -132,82 +242,140 @@ class SchematicParser:
         self.length = root.get('Length', 0)
 
     def decode_block_data(self, byte_array):
-        data = []
-        i = 0
-        length = len(byte_array)
-        while i < length:
-            val = 0
-            shift = 0
-            while True:
-                if i >= length: break
-                byte = byte_array[i]
-                i += 1
-                val |= (byte & 0x7F) << shift
-                if not (byte & 0x80):
-                    break
-                shift += 7
-            data.append(val)
-        return data
+        """
+        Decodifica los VarInt de BlockData a un array de índices de paleta.
+        Si ningún byte tiene el bit de continuación (paletas de hasta 128 entradas),
+        los bytes ya son los índices. Si no, cada byte se asigna a su VarInt contando
+        los bytes finales anteriores (suma acumulada de la máscara de fin) y los
+        grupos de 7 bits se desplazan y suman por VarInt.
+        """
+        raw = np.frombuffer(byte_array, dtype=np.uint8)
+        more = raw >= 0x80
+        if not more.any():
+            return raw.astype(np.int64)
 
-    def get_blocks(self):
-        if self.blocks_cache is not None:
-            return self.blocks_cache
+        last = ~more
+        group = np.cumsum(last) - last # VarInt al que pertenece cada byte
+        starts = np.flatnonzero(np.r_[True, last[:-1]])
+        position = np.arange(raw.size) - starts[group]
+        values = (raw & 0x7F).astype(np.int64) << (7 * position)
+        return np.add.reduceat(values, starts)
 
+    def _block_source(self):
+        """Paleta {nombre: índice} y BlockData codificado del esquemático."""
         root = self.data
         # Desenvolver Esquema si está presente
         if 'Schematic' in root:
             root = root['Schematic']
 
-        # Usar dimensiones almacenadas
-        width = self.width
-        height = self.height
-        length = self.length
-
-        # Manejar diferentes estructuras
-        palette = {}
-        block_data_bytes = b''
-
         # Caso 1: Compuesto anidado de Bloques (ej. WorldEdit/Sponge v3?)
         if 'Blocks' in root and isinstance(root['Blocks'], dict):
             blocks_compound = root['Blocks']
-            palette = blocks_compound.get('Palette', {})
-            block_data_bytes = blocks_compound.get('Data', b'')
+            return blocks_compound.get('Palette', {}), blocks_compound.get('Data', b'')
         # Caso 2: Aplanado (Sponge v1/v2)
-        else:
-            palette = root.get('Palette', {})
-            block_data_bytes = root.get('BlockData', b'')
+        return root.get('Palette', {}), root.get('BlockData', b'')
 
-        
-        id_to_name = {v: k for k, v in palette.items()}
-        block_indices = self.decode_block_data(block_data_bytes)
-        
-        blocks = []
+    def get_palette(self):
+        """
+        Traduce la paleta una sola vez (unas decenas de entradas).
+        Devuelve (nombres, tabla): el nombre y el par (id, data) de cada índice de
+        paleta. La última fila es aire y sirve para índices fuera de la paleta.
+        """
+        if self.palette_cache is None:
+            palette, _ = self._block_source()
+            size = max(palette.values(), default=-1) + 1
+            names = ["minecraft:air"] * (size + 1)
+            table = np.zeros((size + 1, 2), dtype=np.uint16)
+            for name, index in palette.items():
+                names[index] = name
+            if palette:
+                table[list(palette.values())] = TRANSLATOR.intern(palette.keys())
+            self.palette_cache = (names, table)
+        return self.palette_cache
+
+    def get_indices(self):
+        """Índices de paleta como array (height, length, width); lo que falte se rellena con aire."""
+        if self.indices_cache is None:
+            if self._load_indices is not None:
+                indices = self._load_indices()
+            else:
+                _, block_data_bytes = self._block_source()
+                names, _ = self.get_palette()
+                air = len(names) - 1
+                total = self.height * self.length * self.width
+                indices = self.decode_block_data(block_data_bytes)[:total]
+                if indices.size < total:
+                    indices = np.concatenate([indices, np.full(total - indices.size, air, dtype=np.int64)])
+                indices[(indices < 0) | (indices > air)] = air
+                indices = indices.reshape(self.height, self.length, self.width)
+            # Los arrays son de solo lectura: se comparten entre todos los agentes
+            indices.flags.writeable = False
+            self.indices_cache = indices
+        return self.indices_cache
+
+    def get_voxels(self):
+        """Arrays (height, length, width) con el id (uint16) y el dato (uint8) de cada bloque."""
+        if self.voxels_cache is None:
+            _, table = self.get_palette()
+            indices = self.get_indices()
+            ids, data = table[indices, 0], table[indices, 1].astype(np.uint8)
+            ids.flags.writeable = data.flags.writeable = False
+            self.voxels_cache = (ids, data)
+        return self.voxels_cache
+
+    def memory_bytes(self):
+        """Memoria de los arrays decodificados hasta ahora."""
+        arrays = [self.indices_cache, *(self.voxels_cache or ())]
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def get_build_plan(self):
+        """Plan de construcción capa a capa sobre los vóxeles (ver utils.build_plan)."""
+        return BuildPlan(*self.get_voxels())
+
+    def get_build_list(self):
+        """
+        Bloques a colocar como filas [x, y, z, id, data] sin aire, ordenadas por capa
+        (y, x, z). Son listas de enteros, serializables en los checkpoints.
+        """
+        ids, data = self.get_voxels()
+        y, z, x = np.nonzero(ids)
+        order = np.lexsort((z, x, y))
+        rows = np.stack([x, y, z, ids[y, z, x], data[y, z, x]], axis=1)[order]
+        return rows.tolist()
+
+    def get_blocks(self):
+        if self.blocks_cache is not None:
+            return self.blocks_cache
+
+        names, _ = self.get_palette()
+        indices = self.get_indices()
+        ids, _ = self.get_voxels()
         # Orden de esquemáticos Sponge: (y * length + z) * width + x
-        idx = 0
-        for y in range(height):
-            for z in range(length):
-                for x in range(width):
-                    if idx < len(block_indices):
-                        block_id = block_indices[idx]
-                        block_name = id_to_name.get(block_id, "minecraft:air")
-                        if block_name != "minecraft:air":
-                            blocks.append({
-                                'x': x,
-                                'y': y,
-                                'z': z,
-                                'block': block_name
-                            })
-                        idx += 1
+        y, z, x = np.nonzero(ids)
+        blocks = [{'x': bx, 'y': by, 'z': bz, 'block': names[index]}
+                  for bx, by, bz, index in zip(x.tolist(), y.tolist(), z.tolist(), indices[y, z, x].tolist())]
         self.blocks_cache = blocks
         return blocks
 
     def get_bom(self):
-        blocks = self.get_blocks()
-        bom = {}
-        for b in blocks:
-            # Limpiar nombre del bloque (eliminar prefijo minecraft: y propiedades como [facing=...])
-            full_name = b['block']
-            name = full_name.split('[')[0].replace('minecraft:', '')
-            
-            bom[name] = bom.get(name, 0) + 1
-        return bom
+        if self.bom_cache is None:
+            names, table = self.get_palette()
+            counts = np.bincount(self.get_indices().ravel(), minlength=len(names))
+            bom = {}
+            for index in np.flatnonzero(counts).tolist():
+                if table[index, 0] == 0:
+                    continue
+                # Limpiar nombre del bloque (eliminar prefijo minecraft: y propiedades como [facing=...])
+                name = names[index].split('[')[0].replace('minecraft:', '')
+                bom[name] = bom.get(name, 0) + int(counts[index])
+            self.bom_cache = bom
+        return dict(self.bom_cache)
+
+    def get_bbox(self):
+        """Caja (min_x, min_y, min_z, max_x, max_y, max_z) de los bloques no aire; None si no hay."""
+        if self.bbox_cache is None:
+            ids, _ = self.get_voxels()
+            y, z, x = np.nonzero(ids)
+            self.bbox_cache = ((int(x.min()), int(y.min()), int(z.min()), int(x.max()), int(y.max()), int(z.max()))
+                               if x.size else ())
+        return self.bbox_cache or None
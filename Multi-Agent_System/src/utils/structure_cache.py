@@ -0,0 +1,90 @@
+import os
+import numpy as np
+from utils.logging import Logger
+from utils.schematic_parser import SchematicParser
+
+# Subdirectorio (junto a los .schem) donde se guardan las estructuras compiladas
+CACHE_DIRNAME = ".cache"
+# Se incrementa al cambiar el formato para descartar las cachés antiguas
+CACHE_VERSION = 1
+
+logger = Logger("StructureCache")
+
+def sidecar_path(path: str, cache_dir: str = None) -> str:
+    """Ruta del fichero compilado (.npz) de un esquemático."""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME)
+    return os.path.join(cache_dir, os.path.basename(path) + ".npz")
+
+def _cache_key(path: str):
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_mtime_ns, stat.st_size
+
+def load_structure(path: str, cache_dir: str = None) -> SchematicParser:
+    """
+    Carga un esquemático usando su versión compilada en disco si sigue siendo válida
+    (misma ruta, fecha de modificación y tamaño). Si no, lo parsea y guarda la
+    versión compilada para las siguientes cargas.
+    """
+    key = _cache_key(path)
+    sidecar = sidecar_path(path, cache_dir)
+
+    parser = read_sidecar(sidecar, key)
+    if parser is None:
+        parser = SchematicParser(path)
+        if parser.data:
+            write_sidecar(sidecar, key, parser)
+    return parser
+
+def write_sidecar(sidecar: str, key, parser: SchematicParser):
+    """Guarda índices de paleta, paleta traducida, BOM y caja de la estructura en un .npz."""
+    names, table = parser.get_palette()
+    indices = parser.get_indices()
+    bom = parser.get_bom()
+    index_dtype = np.uint8 if len(names) <= 0x100 else np.uint16 if len(names) <= 0x10000 else np.uint32
+
+    path, mtime_ns, size = key
+    tmp = sidecar + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        with open(tmp, "wb") as f:
+            np.savez(f,
+                     path=np.array(path),
+                     meta=np.array([CACHE_VERSION, mtime_ns, size, parser.width, parser.height, parser.length], dtype=np.int64),
+                     names=np.array(names),
+                     table=table,
+                     indices=indices.astype(index_dtype),
+                     bom_names=np.array(list(bom), dtype=str),
+                     bom_counts=np.array(list(bom.values()), dtype=np.int64),
+                     bbox=np.array(parser.get_bbox() or (), dtype=np.int64))
+        os.replace(tmp, sidecar) # Escritura atómica: nunca queda un .npz a medias
+    except OSError as e:
+        logger.error(f"No se ha podido guardar la caché {sidecar}: {e}")
+
+def read_sidecar(sidecar: str, key):
+    """Parser compilado desde el .npz, o None si no existe, está corrupto o ha caducado."""
+    if not os.path.exists(sidecar):
+        return None
+    try:
+        with np.load(sidecar, allow_pickle=False) as npz:
+            meta = npz["meta"].tolist()
+            if str(npz["path"]) != key[0] or meta[:3] != [CACHE_VERSION, key[1], key[2]]:
+                return None
+            palette = (npz["names"].tolist(), npz["table"])
+            bom = dict(zip(npz["bom_names"].tolist(), npz["bom_counts"].tolist()))
+            bbox = tuple(npz["bbox"].tolist())
+    except Exception as e:
+        logger.error(f"Caché de estructura inválida {sidecar}: {e}")
+        return None
+
+    path = key[0]
+    def load_indices():
+        # Los bloques solo se leen cuando se necesitan
+        try:
+            with np.load(sidecar, allow_pickle=False) as npz:
+                return npz["indices"].astype(np.int64)
+        except Exception as e:
+            logger.error(f"Caché de estructura inválida {sidecar}, se vuelve a parsear: {e}")
+            return SchematicParser(path).get_indices()
+
+    return SchematicParser.from_compiled(path, tuple(meta[3:6]), palette, bom, bbox, load_indices)
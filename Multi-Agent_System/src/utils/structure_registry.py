@@ -0,0 +1,155 @@
+import asyncio
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, List, Tuple
+from utils.logging import Logger
+from utils.structure_cache import load_structure
+
+# Memoria máxima de bloques decodificados que se mantiene cargada
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+class StructureRegistry(Mapping):
+    """
+    Registro compartido de las estructuras de un directorio.
+    Los nombres salen de un escaneo del directorio sin parsear ningún fichero; cada
+    esquemático se carga (vía utils.structure_cache) la primera vez que se pide y
+    el mismo SchematicParser, con arrays de solo lectura, se entrega a todos los
+    agentes. Si la memoria de los bloques decodificados supera 'memory_budget' se
+    descartan las estructuras usadas hace más tiempo. Los ficheros nuevos, cambiados
+    o borrados se detectan al acceder y, opcionalmente, con una tarea de vigilancia.
+    Se usa como un diccionario de solo lectura {nombre: SchematicParser}.
+    """
+
+    def __init__(self, structures_dir: str, memory_budget: int = DEFAULT_MEMORY_BUDGET, loader=load_structure):
+        self.structures_dir = structures_dir
+        self.memory_budget = memory_budget
+        self.loader = loader
+        self.logger = Logger(self.__class__.__name__)
+
+        self._files: Dict[str, Tuple[int, int]] = {} # nombre -> (mtime_ns, tamaño)
+        self._dir_mtime = None
+        self._loaded: "OrderedDict[str, tuple]" = OrderedDict() # nombre -> (mtime_ns, tamaño, parser), por uso
+        self._watch_task = None
+        self.loads = 0
+        self.evictions = 0
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.structures_dir, name + ".schem")
+
+    def _dir_stamp(self):
+        try:
+            return os.stat(self.structures_dir).st_mtime_ns
+        except OSError:
+            return None
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        try:
+            with os.scandir(self.structures_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".schem") and entry.is_file():
+                        stat = entry.stat()
+                        files[entry.name[:-len(".schem")]] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return files
+
+    def refresh(self) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Vuelve a escanear el directorio y descarta las estructuras cambiadas o borradas.
+        Devuelve (añadidas, cambiadas, borradas).
+        """
+        files = self._scan()
+        added = sorted(files.keys() - self._files.keys())
+        removed = sorted(self._files.keys() - files.keys())
+        changed = sorted(n for n in files.keys() & self._files.keys() if files[n] != self._files[n])
+        for name in removed + changed:
+            self._loaded.pop(name, None)
+        self._files = files
+        self._dir_mtime = self._dir_stamp()
+        return added, changed, removed
+
+    def _listing(self) -> Dict[str, Tuple[int, int]]:
+        # Añadir o borrar ficheros cambia la fecha del directorio
+        if self._dir_mtime is None or self._dir_stamp() != self._dir_mtime:
+            self.refresh()
+        return self._files
+
+    def names(self) -> List[str]:
+        """Nombres de las estructuras disponibles, sin cargarlas."""
+        return sorted(self._listing())
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self):
+        return len(self._listing())
+
+    def __contains__(self, name):
+        return name in self._listing()
+
+    def __getitem__(self, name):
+        if name not in self._listing():
+            raise KeyError(name)
+        try:
+            stat = os.stat(self._path(name))
+        except OSError:
+            self.refresh()
+            raise KeyError(name)
+
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        entry = self._loaded.get(name)
+        if entry is not None and entry[:2] == stamp:
+            self._loaded.move_to_end(name)
+            return entry[2]
+
+        parser = self.loader(self._path(name))
+        self._files[name] = stamp
+        self._loaded[name] = (*stamp, parser)
+        self.loads += 1
+        self._enforce_budget(keep=name)
+        return parser
+
+    def memory_bytes(self) -> int:
+        return sum(entry[2].memory_bytes() for entry in self._loaded.values())
+
+    def _enforce_budget(self, keep: str):
+        """Descarta las estructuras con bloques decodificados usadas hace más tiempo."""
+        total = self.memory_bytes()
+        for name in list(self._loaded):
+            if total <= self.memory_budget:
+                break
+            size = self._loaded[name][2].memory_bytes()
+            if name == keep or size == 0:
+                continue
+            del self._loaded[name]
+            total -= size
+            self.evictions += 1
+            self.logger.debug(f"Estructura {name} descargada ({size} bytes)")
+
+    def start_watching(self, interval: float = 2.0):
+        """Vigila el directorio en segundo plano para detectar estructuras nuevas o cambiadas."""
+        if self._watch_task is None:
+            self._watch_task = asyncio.create_task(self._watch_loop(interval))
+
+    async def _watch_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            added, changed, removed = self.refresh()
+            if added or changed or removed:
+                self.logger.info(f"Estructuras actualizadas. Nuevas: {added}, cambiadas: {changed}, borradas: {removed}")
+
+    async def close(self):
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            self._watch_task = None
+
+_registries: Dict[str, StructureRegistry] = {}
+
+def get_structure_registry(structures_dir: str) -> StructureRegistry:
+    """Registro compartido (uno por directorio) para todo el proceso."""
+    key = os.path.abspath(structures_dir)
+    if key not in _registries:
+        _registries[key] = StructureRegistry(key)
+    return _registries[key]
@@ -0,0 +1,128 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+import numpy as np
+from mcpi.minecraft import intFloor
+
+ChunkKey = Tuple[int, int, int]
+
+class WorldCache:
+    """
+    Caché de mundo en el lado del cliente por chunks de 16x16x16.
+    Envuelve un AsyncMinecraft: getBlock se sirve desde arrays [y, z, x] cargados con
+    un único world.getBlocks por chunk, y setBlock/setBlocks escriben en Minecraft y
+    actualizan los chunks en caché (write-through).
+    Los chunks caducan por TTL y se expulsan por LRU cuando sus arrays superan
+    max_bytes (por defecto 4 MiB: 512 chunks de uint16).
+    Las coordenadas se redondean hacia abajo (intFloor), como en mcpi: -0.5 está
+    en el bloque -1 y en el chunk -1.
+    Los golpes de espada (events.pollBlockHits) invalidan el chunk afectado, ya que
+    indican que un jugador está modificando esa zona.
+    El resto de atributos (player, events, postToChat, ...) se delegan en Minecraft.
+    """
+    CHUNK = 16
+
+    def __init__(self, mc, ttl: float = 5.0, max_bytes: int = 4 * 1024 * 1024, poll_interval: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.mc = mc
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self._chunks: "OrderedDict[ChunkKey, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._bytes = 0
+        self._last_poll = None
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name):
+        return getattr(self.mc, name)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._bytes
+
+    def _key(self, x: int, y: int, z: int) -> ChunkKey:
+        """Chunk de un bloque; las coordenadas ya tienen que estar redondeadas con intFloor."""
+        return (x // self.CHUNK, y // self.CHUNK, z // self.CHUNK)
+
+    def _drop(self, key: ChunkKey):
+        entry = self._chunks.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[0].nbytes
+
+    def _cached(self, key: ChunkKey):
+        """Devuelve el array del chunk si sigue vigente (y lo marca como usado)."""
+        entry = self._chunks.get(key)
+        if entry is None:
+            return None
+        arr, loaded_at = entry
+        if self.clock() - loaded_at > self.ttl:
+            self._drop(key)
+            return None
+        self._chunks.move_to_end(key)
+        return arr
+
+    async def _load(self, key: ChunkKey) -> np.ndarray:
+        x0, y0, z0 = (k * self.CHUNK for k in key)
+        n = self.CHUNK - 1
+        arr = np.ascontiguousarray(await self.mc.getBlocksArray(x0, y0, z0, x0 + n, y0 + n, z0 + n))
+        self._drop(key)
+        self._chunks[key] = (arr, self.clock())
+        self._bytes += arr.nbytes
+        # Expulsar los menos usados hasta caber en el presupuesto (el recién cargado se queda)
+        while self._bytes > self.max_bytes and len(self._chunks) > 1:
+            self._drop(next(iter(self._chunks)))
+        return arr
+
+    async def poll_invalidations(self):
+        """Consume los golpes de bloque pendientes e invalida sus chunks."""
+        self._last_poll = self.clock()
+        for hit in await self.mc.events.pollBlockHits():
+            self.invalidate(hit.pos.x, hit.pos.y, hit.pos.z)
+
+    def invalidate(self, x: int, y: int, z: int):
+        """Descarta el chunk que contiene (x, y, z)."""
+        self._drop(self._key(*intFloor(x, y, z)))
+
+    def clear(self):
+        self._chunks.clear()
+        self._bytes = 0
+
+    async def getBlock(self, x: int, y: int, z: int) -> int:
+        if self._last_poll is None or self.clock() - self._last_poll >= self.poll_interval:
+            await self.poll_invalidations()
+
+        x, y, z = intFloor(x, y, z)
+        key = self._key(x, y, z)
+        arr = self._cached(key)
+        if arr is None:
+            self.misses += 1
+            arr = await self._load(key)
+        else:
+            self.hits += 1
+        return int(arr[y % self.CHUNK, z % self.CHUNK, x % self.CHUNK])
+
+    async def setBlock(self, x: int, y: int, z: int, block_id: int, *data):
+        await self.mc.setBlock(x, y, z, block_id, *data)
+        x, y, z = intFloor(x, y, z)
+        arr = self._cached(self._key(x, y, z))
+        if arr is not None:
+            arr[y % self.CHUNK, z % self.CHUNK, x % self.CHUNK] = block_id
+
+    async def setBlocks(self, x0: int, y0: int, z0: int, x1: int, y1: int, z1: int, block_id: int, *data):
+        await self.mc.setBlocks(x0, y0, z0, x1, y1, z1, block_id, *data)
+        x0, y0, z0, x1, y1, z1 = intFloor(x0, y0, z0, x1, y1, z1)
+        lo = [min(a, b) for a, b in ((x0, x1), (y0, y1), (z0, z1))]
+        hi = [max(a, b) for a, b in ((x0, x1), (y0, y1), (z0, z1))]
+
+        # Actualizar la intersección del cuboide con cada chunk en caché
+        for key in list(self._chunks):
+            origin = [k * self.CHUNK for k in key]
+            a = [max(lo[i], origin[i]) - origin[i] for i in range(3)]
+            b = [min(hi[i], origin[i] + self.CHUNK - 1) - origin[i] for i in range(3)]
+            if any(a[i] > b[i] for i in range(3)):
+                continue
+            arr = self._cached(key)
+            if arr is not None:
+                arr[a[1]:b[1] + 1, a[2]:b[2] + 1, a[0]:b[0] + 1] = block_id
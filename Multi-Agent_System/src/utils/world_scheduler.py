@@ -0,0 +1,154 @@
+import asyncio
+import inspect
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict
+
+# Clases de prioridad (menor valor = más prioritario)
+INTERACTIVE = 0 # chat, estado y control
+PERCEPTION = 1  # lecturas del mundo
+BULK = 2        # escrituras masivas de construcción y minería
+
+# Sub-objetos de Minecraft cuyas llamadas también se planifican
+_NAMESPACES = ("player", "entity", "camera", "events")
+
+def classify(path: str) -> int:
+    """Clase de prioridad de un comando según su ruta ('postToChat', 'player.getTilePos', ...)."""
+    namespace, _, method = path.rpartition(".")
+    if path == "postToChat" or namespace in ("events", "camera"):
+        return INTERACTIVE
+    if method.startswith("get"):
+        return PERCEPTION
+    if namespace in ("player", "entity"):
+        return INTERACTIVE
+    return BULK
+
+class TokenBucket:
+    """Limitador de tasa: 'rate' comandos por segundo con ráfagas de hasta 'burst'."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Segundos hasta que haya un token disponible (0 si ya lo hay)."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self._refill()
+        self.tokens -= 1
+
+class WorldScheduler:
+    """
+    Planificador de comandos al mundo compartido por todos los agentes.
+    Cada comando pide turno con su clase de prioridad; un despachador concede los
+    turnos primero a la clase más prioritaria y, dentro de una clase, por turnos
+    entre agentes (fair queuing), consumiendo un token del limitador por comando.
+    Mientras haya tokens y no haya cola, los turnos se conceden sin esperar.
+    """
+
+    def __init__(self, rate: float = 500.0, burst: int = 100, clock: Callable[[], float] = time.monotonic):
+        self.bucket = TokenBucket(rate, burst, clock)
+        self._queues: Dict[int, "OrderedDict[str, deque]"] = {p: OrderedDict() for p in (INTERACTIVE, PERCEPTION, BULK)}
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._dispatcher = None
+        self.granted = {INTERACTIVE: 0, PERCEPTION: 0, BULK: 0}
+
+    def session(self, agent_id: str, mc) -> "ScheduledSession":
+        """Envuelve la conexión de un agente para que sus comandos pasen por el planificador."""
+        return ScheduledSession(mc, self, agent_id)
+
+    async def acquire(self, agent_id: str, priority: int):
+        """Espera el turno para enviar un comando."""
+        if self._pending == 0 and self.bucket.delay() == 0:
+            self.bucket.take()
+            self.granted[priority] += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(agent_id, deque()).append(future)
+        self._pending += 1
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def submit(self, agent_id: str, priority: int, func, *args, **kwargs):
+        """Ejecuta func(*args) cuando el planificador conceda el turno."""
+        await self.acquire(agent_id, priority)
+        return await func(*args, **kwargs)
+
+    def _next(self):
+        """Siguiente petición: clase más prioritaria, agentes por turnos."""
+        for priority, agents in self._queues.items():
+            while agents:
+                agent_id, queue = next(iter(agents.items()))
+                future = queue.popleft()
+                self._pending -= 1
+                if queue:
+                    agents.move_to_end(agent_id)
+                else:
+                    del agents[agent_id]
+                if not future.done(): # Las peticiones canceladas se descartan
+                    return priority, future
+        return None
+
+    async def _dispatch(self):
+        while True:
+            if self._pending == 0:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            wait = self.bucket.delay()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            entry = self._next()
+            if entry is None:
+                continue
+            priority, future = entry
+            self.bucket.take()
+            self.granted[priority] += 1
+            future.set_result(None)
+
+    async def close(self):
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+
+class ScheduledSession:
+    """
+    Vista de la conexión de un agente a través del WorldScheduler.
+    Las llamadas asíncronas (setBlock, getHeight, player.getTilePos, ...) esperan su
+    turno antes de llegar a Minecraft; el resto de atributos se devuelven tal cual.
+    """
+
+    def __init__(self, mc, scheduler: WorldScheduler, agent_id: str, path: str = ""):
+        self.mc = mc
+        self.scheduler = scheduler
+        self.agent_id = agent_id
+        self.path = path
+
+    def __getattr__(self, name):
+        attr = getattr(self.mc, name)
+        if not self.path and name in _NAMESPACES:
+            return ScheduledSession(attr, self.scheduler, self.agent_id, f"{name}.")
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        priority = classify(self.path + name)
+        async def scheduled(*args, **kwargs):
+            return await self.scheduler.submit(self.agent_id, priority, attr, *args, **kwargs)
+        return scheduled
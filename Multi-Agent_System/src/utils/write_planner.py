@@ -0,0 +1,93 @@
+from typing import Dict, Iterable, List, Tuple
+
+# Cuboide listo para world.setBlocks: (x0, y0, z0, x1, y1, z1, id, data)
+Cuboid = Tuple[int, int, int, int, int, int, int, int]
+
+class WritePlanner:
+    """
+    Planificador de escrituras de bloques.
+    Recibe escrituras (x, y, z, id, data) y las agrupa de forma voraz en cuboides
+    maximales alineados con los ejes, de modo que cada cuboide se envía como un
+    único world.setBlocks en lugar de un setBlock por celda.
+    Si una celda se escribe varias veces, prevalece la última escritura.
+    """
+
+    def __init__(self):
+        self._cells: Dict[Tuple[int, int, int], Tuple[int, int]] = {}
+
+    def __len__(self):
+        return len(self._cells)
+
+    def add(self, x: int, y: int, z: int, block_id: int, data: int = 0):
+        """Añade la escritura de un bloque."""
+        self._cells[(int(x), int(y), int(z))] = (int(block_id), int(data))
+
+    def add_many(self, writes: Iterable[Tuple]):
+        """Añade varias escrituras (x, y, z, id[, data])."""
+        for w in writes:
+            self.add(*w)
+
+    def plan(self) -> List[Cuboid]:
+        """
+        Calcula los cuboides. Recorre las celdas en orden (y, z, x) y desde cada celda
+        libre crece primero en x, luego en z y por último en y mientras todas las celdas
+        nuevas tengan el mismo bloque. Los cuboides salen ordenados por su capa inferior.
+        """
+        cells = self._cells
+        used = set()
+        cuboids = []
+
+        def free_match(pos, value):
+            return pos not in used and cells.get(pos) == value
+
+        for (x0, y0, z0) in sorted(cells, key=lambda p: (p[1], p[2], p[0])):
+            if (x0, y0, z0) in used:
+                continue
+            value = cells[(x0, y0, z0)]
+
+            # Crecer en x
+            x1 = x0
+            while free_match((x1 + 1, y0, z0), value):
+                x1 += 1
+
+            # Crecer en z (fila completa)
+            z1 = z0
+            while all(free_match((x, y0, z1 + 1), value) for x in range(x0, x1 + 1)):
+                z1 += 1
+
+            # Crecer en y (rectángulo completo)
+            y1 = y0
+            while all(free_match((x, y1 + 1, z), value)
+                      for x in range(x0, x1 + 1) for z in range(z0, z1 + 1)):
+                y1 += 1
+
+            for y in range(y0, y1 + 1):
+                for z in range(z0, z1 + 1):
+                    for x in range(x0, x1 + 1):
+                        used.add((x, y, z))
+
+            cuboids.append((x0, y0, z0, x1, y1, z1, value[0], value[1]))
+
+        return cuboids
+
+    async def apply(self, mc) -> int:
+        """
+        Envía el plan a Minecraft y vacía el planificador.
+        Los cuboides de una sola celda se envían como setBlock.
+        Devuelve el número de comandos enviados.
+        """
+        cuboids = self.plan()
+        for (x0, y0, z0, x1, y1, z1, block_id, data) in cuboids:
+            extra = (data,) if data else ()
+            if (x0, y0, z0) == (x1, y1, z1):
+                await mc.setBlock(x0, y0, z0, block_id, *extra)
+            else:
+                await mc.setBlocks(x0, y0, z0, x1, y1, z1, block_id, *extra)
+        self._cells.clear()
+        return len(cuboids)
+
+def plan_cuboids(writes: Iterable[Tuple]) -> List[Cuboid]:
+    """Atajo: agrupa una colección de escrituras (x, y, z, id[, data]) en cuboides."""
+    planner = WritePlanner()
+    planner.add_many(writes)
+    return planner.plan()
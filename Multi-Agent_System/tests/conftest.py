@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import numpy as np
 from unittest.mock import MagicMock, AsyncMock
 import sys
 import os
@@ -11,18 +12,41 @@ from messages.message_bus import MessageBus
 from agents.agent_manager import AgentManager
 from agents.state_model import State
 
+def make_flat_terrain(mock, height):
+    """Configura el mock como un mundo plano: piedra por debajo de 'height' y aire encima."""
+    mock.getHeight.return_value = height
+    mock.getHeights.side_effect = lambda points: [height] * len(points)
+
+    def get_blocks(x0, y0, z0, x1, y1, z1):
+        # Orden y, x, z como RaspberryJuice
+        columns = (abs(x1 - x0) + 1) * (abs(z1 - z0) + 1)
+        return [1 if y < height else 0
+                for y in range(min(y0, y1), max(y0, y1) + 1) for _ in range(columns)]
+    mock.getBlocks.side_effect = get_blocks
+
+    def get_blocks_array(x0, y0, z0, x1, y1, z1):
+        shape = (abs(y1 - y0) + 1, abs(z1 - z0) + 1, abs(x1 - x0) + 1)
+        ys = np.arange(min(y0, y1), max(y0, y1) + 1).reshape(-1, 1, 1)
+        return np.broadcast_to(ys < height, shape).astype(np.uint16)
+    mock.getBlocksArray.side_effect = get_blocks_array
+
 @pytest.fixture
 def mock_mc():
     """Simula la conexión a Minecraft para no necesitar el juego real."""
-    mock = MagicMock()
+    mock = AsyncMock()
     # Mockear player.getTilePos
     mock.player.getTilePos.return_value.x = 100
     mock.player.getTilePos.return_value.y = 64
     mock.player.getTilePos.return_value.z = 100
-    # Mockear getHeight
-    mock.getHeight.return_value = 63
+    # Mockear getHeight/getBlocks con terreno plano
+    make_flat_terrain(mock, 63)
     return mock
 
+@pytest.fixture
+def flat_terrain():
+    """Permite cambiar la altura del terreno plano del mock en cada prueba."""
+    return make_flat_terrain
+
 @pytest.fixture
 def message_bus():
     """Bus de mensajes limpio para cada prueba."""
@@ -15,7 +15,9 @@ def factory():
     # o simplemente limpiar el registro
     f = AgentFactory()
     f._agent_registry.clear()
-    return f
+    yield f
+    AgentFactory.use_connection_pool(None)
+    AgentFactory.use_world_scheduler(None)
 
 def test_singleton_behavior():
     f1 = AgentFactory()
@@ -44,6 +46,27 @@ def test_create_agent(factory):
     assert agent.mc == mc_mock
     assert agent.bus == bus_mock
 
+def test_create_agent_uses_pooled_session(factory):
+    factory.register_agent_class("MockAgent", MockAgent)
+    pool = MagicMock()
+    factory.use_connection_pool(pool)
+
+    agent = factory.create_agent("MockAgent", MagicMock(), MagicMock(), agent_id="MyAgent1")
+
+    pool.session.assert_called_once_with("MyAgent1")
+    assert agent.mc is pool.session.return_value
+
+def test_create_agent_uses_world_scheduler(factory):
+    factory.register_agent_class("MockAgent", MockAgent)
+    scheduler = MagicMock()
+    factory.use_world_scheduler(scheduler)
+    mc_mock = MagicMock()
+
+    agent = factory.create_agent("MockAgent", mc_mock, MagicMock(), agent_id="MyAgent1")
+
+    scheduler.session.assert_called_once_with("MyAgent1", mc_mock)
+    assert agent.mc is scheduler.session.return_value
+
 def test_create_unregistered_agent_raises_error(factory):
     with pytest.raises(ValueError, match="Tipo de Agente no registrado"):
         factory.create_agent("GhostAgent", None, None)
@@ -9,7 +9,7 @@ from agents.agent_manager import AgentManager
 
 @pytest.fixture
 def manager():
-    mc = MagicMock()
+    mc = AsyncMock()
     bus = MagicMock()
     bus.register_agent = MagicMock()
     bus.subscribe = MagicMock()
@@ -0,0 +1,211 @@
+import pytest
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from mcpi.connection import AsyncConnection, WorldWriteBuffer, RequestError
+from mcpi.minecraft import AsyncMinecraft
+
+class FakeWriter:
+    """Registra cada llamada a write() para contar las escrituras al socket."""
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(data)
+
+    async def drain(self):
+        pass
+
+@pytest.fixture
+async def server():
+    """Servidor mínimo que responde a getHeight/getBlock y registra lo recibido."""
+    received = []
+
+    async def handle(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            cmd = line.decode("cp437").strip()
+            received.append(cmd)
+            if cmd.startswith("world.getHeight"):
+                # Altura = x + z, para poder comprobar el emparejamiento
+                x, z = map(int, cmd[cmd.index("(") + 1:-1].split(","))
+                writer.write(f"{x + z}\n".encode())
+            elif cmd.startswith("world.getBlock("):
+                await asyncio.sleep(0.05) # respuesta lenta
+                writer.write(b"1\n")
+            elif cmd.startswith("world.getBlocks"):
+                writer.write(b"1,2,3,4\n")
+            elif cmd.startswith("fail"):
+                writer.write(b"Fail\n")
+            await writer.drain()
+        writer.close()
+
+    srv = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    yield port, received
+    srv.close()
+    await srv.wait_closed()
+
+@pytest.mark.asyncio
+async def test_send_receive(server):
+    port, received = server
+    mc = await AsyncMinecraft.create("127.0.0.1", port)
+
+    await mc.setBlock(1, 2, 3, 4)
+    assert await mc.getHeight(10, 20) == 30
+    assert list(await mc.getBlocks(0, 0, 0, 1, 1, 1)) == [1, 2, 3, 4]
+
+    # La primera consulta tras un comando sin respuesta va precedida de la de sincronización
+    assert received[:3] == ["world.setBlock(1,2,3,4)", "world.getBlock(0,0,0)", "world.getHeight(10,20)"]
+    assert received[3].startswith("world.getBlocks(")
+    await mc.close()
+
+@pytest.mark.asyncio
+async def test_get_blocks_array_shape_and_order(server):
+    port, _ = server
+    mc = await AsyncMinecraft.create("127.0.0.1", port)
+
+    # Respuesta en orden y, x, z -> array [y, z, x]
+    blocks = await mc.getBlocksArray(0, 0, 0, 1, 0, 1)
+    assert blocks.shape == (1, 2, 2)
+    assert str(blocks.dtype) == "uint16"
+    assert blocks.tolist() == [[[1, 3], [2, 4]]]
+
+    with pytest.raises(ValueError):
+        await mc.getBlocksArray(0, 0, 0, 1, 1, 1)
+    await mc.close()
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_keep_replies_paired(server):
+    port, _ = server
+    mc = await AsyncMinecraft.create("127.0.0.1", port)
+
+    # Una consulta lenta no debe mezclar su respuesta con las demás
+    results = await asyncio.gather(mc.getBlock(0, 0, 0), mc.getHeight(0, 0), mc.getHeight(1, 1))
+    assert results == [1, 0, 2]
+    await mc.close()
+
+@pytest.mark.asyncio
+async def test_slow_reply_does_not_block_loop(server):
+    port, _ = server
+    mc = await AsyncMinecraft.create("127.0.0.1", port)
+
+    ticks = 0
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(ticker())
+    await mc.getBlock(0, 0, 0)
+    task.cancel()
+
+    assert ticks > 1
+    await mc.close()
+
+@pytest.mark.asyncio
+async def test_request_failed(server):
+    port, _ = server
+    conn = await AsyncConnection.open("127.0.0.1", port)
+    with pytest.raises(RequestError):
+        await conn.sendReceive(b"fail")
+    await conn.close()
+
+@pytest.mark.asyncio
+async def test_send_many_pipelines_in_order(server):
+    port, received = server
+    mc = await AsyncMinecraft.create("127.0.0.1", port)
+
+    points = [(x, z) for x in range(5) for z in range(5)]
+    heights = await mc.getHeights(points)
+
+    assert heights == [x + z for x, z in points]
+    assert len(received) == len(points)
+    assert await mc.getHeights([]) == []
+    await mc.close()
+
+@pytest.mark.asyncio
+async def test_cancelled_request_does_not_shift_replies(server):
+    port, _ = server
+    mc = await AsyncMinecraft.create("127.0.0.1", port)
+
+    slow = asyncio.create_task(mc.getBlock(0, 0, 0))
+    await asyncio.sleep(0.01)
+    slow.cancel()
+
+    # La respuesta de la consulta cancelada se descarta, no se asigna a la siguiente
+    assert await mc.getHeight(3, 4) == 7
+    await mc.close()
+
+@pytest.mark.asyncio
+async def test_pending_requests_fail_when_server_closes():
+    async def handle(reader, writer):
+        await reader.readline()
+        writer.close()
+
+    srv = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = srv.sockets[0].getsockname()[1]
+    conn = await AsyncConnection.open("127.0.0.1", port)
+
+    with pytest.raises(ConnectionError):
+        await conn.sendReceive(b"world.getHeight", 0, 0)
+
+    await conn.close()
+    srv.close()
+    await srv.wait_closed()
+
+@pytest.mark.asyncio
+async def test_write_buffer_combines_commands():
+    writer = FakeWriter()
+    conn = AsyncConnection(None, writer)
+
+    for i in range(10):
+        await conn.send(b"world.setBlock", i, 0, 0, 1)
+    await conn.send(b"chat.post", "hola")
+    assert writer.writes == []
+
+    await conn.flush()
+    assert len(writer.writes) == 1
+    assert writer.writes[0].count(b"\n") == 11
+    assert writer.writes[0].endswith(b"chat.post(hola)\n")
+
+@pytest.mark.asyncio
+async def test_write_buffer_flushes_on_size_and_time():
+    writer = FakeWriter()
+    conn = AsyncConnection(None, writer)
+    conn.write_buffer = WorldWriteBuffer(writer, max_bytes=120, max_delay=0.01)
+
+    for i in range(5):
+        await conn.send(b"world.setBlock", i, 0, 0, 1)
+    assert len(writer.writes) == 1 # Límite de tamaño alcanzado
+
+    await conn.send(b"world.setBlock", 99, 0, 0, 1)
+    await asyncio.sleep(0.03)
+    assert writer.writes[-1] == b"world.setBlock(99,0,0,1)\n" # Vaciado por tiempo
+
+@pytest.mark.asyncio
+async def test_write_buffer_ordered_before_reads_and_other_commands():
+    writer = FakeWriter()
+    conn = AsyncConnection(None, writer)
+
+    await conn.send(b"world.setBlock", 1, 2, 3, 4)
+    await conn.send(b"player.setTile", 0, 0, 0)
+
+    assert writer.writes == [b"world.setBlock(1,2,3,4)\nplayer.setTile(0,0,0)\n"]
+
+@pytest.mark.asyncio
+async def test_buffered_write_visible_to_next_read(server):
+    port, received = server
+    mc = await AsyncMinecraft.create("127.0.0.1", port)
+
+    await mc.setBlocks(0, 0, 0, 1, 1, 1, 4)
+    await mc.postToChat("hola")
+    assert await mc.getHeight(1, 1) == 2
+    assert received == ["world.setBlocks(0,0,0,1,1,1,4)", "chat.post(hola)", "world.getBlock(0,0,0)", "world.getHeight(1,1)"]
+    await mc.close()
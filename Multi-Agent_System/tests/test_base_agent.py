@@ -16,8 +16,9 @@ class ConcreteAgent(BaseAgent):
 
 @pytest.fixture
 def agent():
-    mc = MagicMock()
+    mc = AsyncMock()
     bus = MagicMock()
+    bus.pending.return_value = 0
     with patch("agents.base_agent.Checkpoints") as MockCkpt:
         mock_instance = MockCkpt.return_value
         mock_instance.load.return_value = {}
@@ -67,6 +68,63 @@ async def test_run_cycle_execution(agent):
     except asyncio.CancelledError:
         pass
 
+@pytest.mark.asyncio
+async def test_idle_agent_sleeps_until_message():
+    from messages.message_bus import MessageBus
+
+    class CountingAgent(ConcreteAgent):
+        cycles = 0
+        async def perceive(self):
+            self.cycles += 1
+            msg = self.bus.receive_nowait(self.id)
+            if msg:
+                await self.handle_incoming_message(msg)
+
+    bus = MessageBus()
+    with patch("agents.base_agent.Checkpoints"):
+        ag = CountingAgent("Sleeper", AsyncMock(), bus)
+    task = asyncio.create_task(ag.run())
+    await asyncio.sleep(0.05)
+    idle_cycles = ag.cycles
+    await asyncio.sleep(0.05)
+    assert ag.cycles == idle_cycles <= 2 # IDLE no vuelve a percibir sin mensajes
+
+    await bus.publish("User", {"type": "command.stop.v1", "source": "User", "target": "Sleeper",
+                               "timestamp": "2024-01-01T00:00:00Z", "payload": {}, "status": "SUCCESS"})
+    await asyncio.sleep(0.01)
+    assert ag.state == State.STOPPED
+    assert ag.cycles > idle_cycles
+
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+@pytest.mark.asyncio
+async def test_waiting_action_sleeps_until_woken(agent):
+    agent.WAITING_ACTIONS = frozenset({"idle"})
+    async def decide():
+        agent.context["next_action"] = "idle"
+        agent.context["decisions"] = agent.context.get("decisions", 0) + 1
+    agent.decide = decide
+
+    task = asyncio.create_task(agent.run())
+    await asyncio.sleep(0.01)
+    await agent.set_state(State.RUNNING)
+    await asyncio.sleep(0.05)
+    assert agent.context["decisions"] == 1
+
+    agent.wake() # p.ej. fin de una tarea en segundo plano
+    await asyncio.sleep(0.01)
+    assert agent.context["decisions"] == 2
+
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
 @pytest.mark.asyncio
 async def test_handle_incoming_message_filtering(agent):
     # Test valid message for this agent
@@ -113,7 +171,7 @@ async def test_handle_command_status_help(agent):
     agent.logger.info.assert_called()
     
     # Help
-    agent.mc.postToChat = MagicMock()
+    agent.mc.postToChat = AsyncMock()
     await agent.handle_command("help")
     agent.mc.postToChat.assert_called()
 
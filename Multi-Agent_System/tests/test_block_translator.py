@@ -4,7 +4,7 @@ import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
 
-from utils.block_translator import get_block_id, get_block_name
+from utils.block_translator import get_block_id, get_block_name, get_block_state, BlockTranslator, BLOCK_MAPPING
 
 class TestBlockTranslator:
 
@@ -50,3 +50,32 @@ class TestBlockTranslator:
     def test_get_block_name_not_found(self):
         """Test reverse lookup for unknown ID."""
         assert get_block_name(999999) == "unknown"
+
+    def test_get_block_name_is_first_listed(self):
+        """Test canonical name is the first one listed for the ID."""
+        assert get_block_name(1) == "stone"
+        assert get_block_name(0) == "air"
+        assert get_block_name(5) == "oak_planks"
+
+    def test_translator_lru_is_bounded(self):
+        """Test non-interned names are memoised in a bounded LRU."""
+        translator = BlockTranslator(BLOCK_MAPPING, cache_size=2)
+        assert translator.get_id("minecraft:oak_stairs[facing=east]") == 53
+        assert translator.get_id("Weird_Slab") == 44
+        assert translator.get_id("weird_thing") == 133
+        assert list(translator._cache) == ["Weird_Slab", "weird_thing"]
+        assert translator.get_id("minecraft:stone") == 1 # Interned, no entra en el LRU
+        assert len(translator._cache) == 2
+
+    def test_translator_intern_palette(self):
+        """Test translating a whole palette at once."""
+        translator = BlockTranslator(BLOCK_MAPPING)
+        assert translator.intern(["minecraft:air", "minecraft:dirt", "odd_fence", "red_wool"]) == \
+            [(0, 0), (3, 0), (85, 0), (35, 14)]
+
+    def test_get_block_state_colors(self):
+        """Test dyed blocks carry their colour as data value."""
+        assert get_block_state("minecraft:red_wool") == (35, 14)
+        assert get_block_state("light_blue_wool") == (35, 3)
+        assert get_block_state("minecraft:white_carpet") == (171, 0)
+        assert get_block_state("minecraft:oak_stairs[facing=east]") == (53, 0)
@@ -0,0 +1,67 @@
+import pytest
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from utils.build_ledger import BuildLedger, CrewHalted
+
+def test_ready_needs_every_part():
+    ledger = BuildLedger("job", 2)
+    assert ledger.ready(0)
+    ledger.record(0, 3)
+    assert not ledger.ready(1)
+    ledger.record(1, 2)
+    assert ledger.ready(2) and not ledger.ready(3)
+
+    ledger.record(1, 1) # El progreso nunca retrocede
+    assert ledger.below == [3, 2]
+
+def test_done():
+    ledger = BuildLedger("job", 2)
+    ledger.record(0, None)
+    assert not ledger.done
+    ledger.record(1, None)
+    assert ledger.done and ledger.ready(100)
+
+@pytest.mark.asyncio
+async def test_wait_ready_wakes_on_progress():
+    ledger = BuildLedger("job", 2)
+    ledger.record(0, 5)
+    waiter = asyncio.create_task(ledger.wait_ready(2))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    ledger.record(1, 1)
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    ledger.record(1, 2)
+    await asyncio.wait_for(waiter, timeout=1)
+
+@pytest.mark.asyncio
+async def test_wait_times_out_without_progress():
+    ledger = BuildLedger("job", 3)
+    ledger.record(0, 2)
+    ledger.record(2, None)
+    with pytest.raises(asyncio.TimeoutError, match=r"\[1\]"):
+        await ledger.wait_ready(2, timeout=0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        await ledger.wait_done(timeout=0.01)
+    assert ledger.lagging() == [0, 1]
+
+@pytest.mark.asyncio
+async def test_halted_part_ends_the_wait():
+    ledger = BuildLedger("job", 2)
+    waiter = asyncio.create_task(ledger.wait_ready(1, timeout=5))
+    await asyncio.sleep(0)
+    ledger.halt(1, "paused")
+    with pytest.raises(CrewHalted, match=r"1 \(paused\)"):
+        await asyncio.wait_for(waiter, timeout=1)
+
+    # Al volver a informar, la parte deja de contar como parada
+    ledger.record(1, 1)
+    ledger.record(0, 1)
+    await ledger.wait_ready(1, timeout=1)
+    assert ledger.halted == {}
@@ -0,0 +1,68 @@
+import pytest
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from utils.build_plan import BuildPlan
+from utils.schematic_parser import SchematicParser
+
+def make_plan(ids):
+    ids = np.array(ids, dtype=np.uint16)
+    return BuildPlan(ids, (ids % 3).astype(np.uint8))
+
+def test_layers_in_placement_order():
+    # (height, length, width) = (2, 2, 2); índices [y, z, x]
+    plan = make_plan([[[1, 2], [0, 4]],
+                      [[0, 0], [7, 0]]])
+    assert len(plan) == 4
+    rows = [row for _, batch in plan.batches() for row in batch.tolist()]
+    # Capa a capa y, dentro de la capa, por (x, z)
+    assert rows == [[0, 0, 0, 1, 1], [1, 0, 0, 2, 2], [1, 0, 1, 4, 1], [0, 1, 1, 7, 1]]
+
+def test_batches_resume_from_cursor_and_do_not_mix_layers():
+    plan = make_plan([[[1, 1, 1]], [[2, 2, 0]]])
+    batches = list(plan.batches(cursor=1, batch_size=1))
+    assert [cursor for cursor, _ in batches] == [2, 3, 4, 5]
+    assert [b.tolist() for _, b in batches] == [[[1, 0, 0, 1, 1]], [[2, 0, 0, 1, 1]],
+                                               [[0, 1, 0, 2, 2]], [[1, 1, 0, 2, 2]]]
+
+    batches = list(plan.batches(cursor=0, batch_size=256))
+    assert [len(b) for _, b in batches] == [3, 2] # Un lote por capa
+    assert list(plan.batches(cursor=len(plan))) == []
+
+def test_empty_plan():
+    plan = make_plan(np.zeros((0, 0, 0)))
+    assert len(plan) == 0
+    assert list(plan.batches()) == []
+
+def test_matches_build_list_of_real_schematic():
+    path = os.path.join(os.path.dirname(__file__), '../builder_structures/small_ovni.schem')
+    parser = SchematicParser(path)
+    rows = [row for _, batch in parser.get_build_plan().batches(batch_size=7) for row in batch.tolist()]
+    assert rows == parser.get_build_list()
+
+def plan_rows(plan):
+    return sorted(row for _, batch in plan.batches() for row in batch.tolist())
+
+@pytest.mark.parametrize("mode", ["tiles", "layers"])
+def test_partition_covers_plan_once(mode):
+    rng = np.random.default_rng(0)
+    plan = make_plan(rng.integers(0, 3, (4, 5, 7)))
+    for parts in (1, 2, 3, 5):
+        pieces = plan.partition(parts, mode)
+        assert len(pieces) == parts
+        assert sorted(r for piece in pieces for r in plan_rows(piece)) == plan_rows(plan)
+
+def test_partition_tiles_split_the_longest_side():
+    plan = make_plan(np.ones((2, 2, 6)))
+    left, right = plan.partition(2, "tiles")
+    # Franjas en x con la mitad de bloques cada una, con todas las capas
+    assert {r[0] for r in plan_rows(left)} == {0, 1, 2}
+    assert {r[0] for r in plan_rows(right)} == {3, 4, 5}
+    assert {r[1] for r in plan_rows(right)} == {0, 1}
+
+def test_partition_unknown_mode():
+    with pytest.raises(ValueError):
+        make_plan(np.ones((1, 1, 1))).partition(2, "spiral")
@@ -3,10 +3,20 @@ import asyncio
 from unittest.mock import MagicMock, AsyncMock, patch
 import sys
 import os
+import numpy as np
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
 from agents.builder_bot import BuilderBot
 from agents.state_model import State
+from utils.build_plan import BuildPlan
+from utils.build_ledger import CrewHalted
+
+def structure_with(ids):
+    """Estructura simulada cuyo plan sale del array de ids (height, length, width)."""
+    ids = np.array(ids, dtype=np.uint16)
+    m = MagicMock()
+    m.get_build_plan.side_effect = lambda: BuildPlan(ids, np.zeros_like(ids, dtype=np.uint8))
+    return m
 
 @pytest.fixture
 def mock_structure_class():
@@ -18,6 +28,9 @@ def mock_structure_class():
         {'x': 0, 'y': 0, 'z': 0, 'block': "minecraft:stone"},
         {'x': 1, 'y': 0, 'z': 1, 'block': "minecraft:dirt"}  
     ]
+    m.get_build_list.return_value = [[0, 0, 0, 1, 0], [1, 0, 1, 3, 0]]
+    m.get_build_plan.return_value = BuildPlan(np.array([[[1, 0], [0, 3]]], dtype=np.uint16),
+                                              np.zeros((1, 2, 2), dtype=np.uint8))
     return m
 
 @pytest.fixture
@@ -32,7 +45,7 @@ async def test_initialization(bot):
 
 @pytest.mark.asyncio
 async def test_handle_command_plan_list(bot):
-    with patch('agents.builder_bot.get_all_structures') as mock_get:
+    with patch('agents.builder_bot.get_structure_registry') as mock_get:
         mock_get.return_value = {"house": 1, "tower": 2}
         
         await bot.handle_command("plan", {"args": ["list"], "id": bot.id})
@@ -41,7 +54,7 @@ async def test_handle_command_plan_list(bot):
 
 @pytest.mark.asyncio
 async def test_handle_command_plan_set_success(bot):
-    with patch('agents.builder_bot.get_all_structures') as mock_get:
+    with patch('agents.builder_bot.get_structure_registry') as mock_get:
         mock_get.return_value = {"house": 1}
         
         await bot.handle_command("plan", {"args": ["set", "house"]})
@@ -78,11 +91,10 @@ async def test_perceive_map(bot):
         "target": "BROADCAST"
     }
     
-    bot.bus.receive = AsyncMock(return_value=msg)
+    bot.bus.receive_nowait = MagicMock(side_effect=[msg, None])
     
     # Simulate perceive loop one iteration
-    with patch('asyncio.wait_for', side_effect=[msg, asyncio.TimeoutError()]):
-        await bot.perceive()
+    await bot.perceive()
     
     assert bot.context['latest_map'] == msg['payload']
     assert bot.context['task_phase'] == "ANALYZING_MAP"
@@ -94,12 +106,13 @@ async def test_decide_analyzing_map(bot, mock_structure_class):
     bot.context['current_plan'] = "house"
     bot.context['latest_map'] = {"size": (20, 20), "origin": (100, 100), "average_height": 64}
     
-    with patch('agents.builder_bot.get_all_structures', return_value={"house": mock_structure_class}):
+    with patch('agents.builder_bot.get_structure_registry', return_value={"house": mock_structure_class}):
         await bot.decide()
         
     assert bot.context['target_position'] == (100, 100)
     assert bot.context['next_action'] == 'request_materials'
-    assert len(bot.context['blocks_to_build']) == 2
+    assert bot.context['build_total'] == 2
+    assert bot.context['build_index'] == 0
     
 @pytest.mark.asyncio
 async def test_decide_waiting_materials(bot):
@@ -119,16 +132,15 @@ async def test_decide_waiting_materials(bot):
 @pytest.mark.asyncio
 async def test_act_start_building(bot):
     bot.context['next_action'] = 'start_building'
-    bot.context['blocks_to_build'] = [{'x':0, 'y':0, 'z':0, 'block': 'stone'}]
+    bot.context['current_plan'] = "house"
     bot.context['target_position'] = (10, 10)
     bot.context['target_height'] = 64
     
     with patch('asyncio.sleep', new_callable=AsyncMock):
-        with patch('agents.builder_bot.get_block_id', return_value=1):
-             with patch.object(bot, '_build_structure_task') as mock_task:
-                 await bot.act()
-                 # Task should be launched. We need to verify task_phase change if it happens synchronously or via task
-                 # Here we only test that it branches correctly.
+        with patch.object(bot, '_build_structure_task') as mock_task:
+            await bot.act()
+            # Task should be launched. We need to verify task_phase change if it happens synchronously or via task
+            # Here we only test that it branches correctly.
 
 @pytest.mark.asyncio
 async def test_act_wait_materials(bot):
@@ -152,25 +164,51 @@ async def test_act_request_materials(bot):
 
 @pytest.mark.asyncio
 async def test_build_structure_task_logic(bot):
-    bot.context['blocks_to_build'] = [{'x':0, 'y':0, 'z':0, 'block': 'stone'}]
+    bot.context['current_plan'] = "house"
     bot.context['target_position'] = (0, 0)
     bot.context['target_height'] = 10
     bot.context['build_index'] = 0
     bot.context['building_in_progress'] = True # Must set this true to enter loop
     
-    with patch('asyncio.sleep', new_callable=AsyncMock):
-        with patch('agents.builder_bot.get_block_id', return_value=1):
-             await bot._build_structure_task()
+    with patch('asyncio.sleep', new_callable=AsyncMock), \
+         patch('agents.builder_bot.get_structure_registry', return_value={"house": structure_with([[[1]]])}):
+        await bot._build_structure_task()
     
     bot.mc.setBlock.assert_called_with(0, 10, 0, 1)
     assert bot.context['task_phase'] == 'IDLE'
 
+@pytest.mark.asyncio
+async def test_build_structure_task_resumes_from_cursor(bot):
+    # Capa 0: (0,0) y (1,0); capa 1: (0,0). El cursor 1 salta el primer bloque
+    bot.context['current_plan'] = "house"
+    bot.context['target_position'] = (0, 0)
+    bot.context['target_height'] = 10
+    bot.context['build_index'] = 1
+    bot.context['building_in_progress'] = True
+
+    with patch('asyncio.sleep', new_callable=AsyncMock), \
+         patch('agents.builder_bot.get_structure_registry', return_value={"house": structure_with([[[1, 4]], [[5, 0]]])}):
+        await bot._build_structure_task()
+
+    placed = [c.args for c in bot.mc.setBlock.call_args_list]
+    assert placed == [(1, 10, 0, 4), (0, 11, 0, 5)]
+    assert bot.context['build_index'] == 0 # Reiniciado al terminar
+
+@pytest.mark.asyncio
+async def test_build_structure_task_unknown_plan(bot):
+    bot.context['current_plan'] = "castle"
+    bot.context['target_position'] = (0, 0)
+    bot.context['building_in_progress'] = True
+
+    with patch('agents.builder_bot.get_structure_registry', return_value={}):
+        await bot._build_structure_task()
+
+    assert "Error en construcción" in bot.mc.postToChat.call_args[0][0]
+    assert bot.context['building_in_progress'] is False
+
 @pytest.mark.asyncio
 async def test_build_structure_task_pause(bot):
-    bot.context['blocks_to_build'] = [
-        {'x':0, 'y':0, 'z':0, 'block': 'stone'}, 
-        {'x':1, 'y':0, 'z':0, 'block': 'stone'}
-    ]
+    bot.context['current_plan'] = "house"
     bot.context['target_position'] = (0, 0)
     bot.context['target_height'] = 10
     
@@ -178,13 +216,9 @@ async def test_build_structure_task_pause(bot):
     bot.context['build_index'] = 0
     bot.context['building_in_progress'] = True
     
-    with patch('agents.builder_bot.get_block_id', return_value=1):
-        # We simulate pause setting via side effect or just mocking state check inside loop?
-        # The loop checks `if self.context.get('paused'): ...`
-        
-        # We'll make the first setBlock trigger a pause change? No, it's async loop.
-        # We can just test that if paused is True, it waits.
-        pass
+    # We simulate pause setting via side effect or just mocking state check inside loop?
+    # The loop checks `if self.context.get('paused'): ...`
+    # We can just test that if paused is True, it waits.
     
     # Scenario 2: Started paused
     bot.context['paused'] = True
@@ -197,16 +231,18 @@ async def test_build_structure_task_pause(bot):
     async def side_effect_sleep(*args):
         bot.context['building_in_progress'] = False
     
-    with patch('asyncio.sleep', side_effect=side_effect_sleep):
+    with patch('asyncio.sleep', side_effect=side_effect_sleep), \
+         patch('agents.builder_bot.get_structure_registry', return_value={"house": structure_with([[[1, 1]]])}):
          await bot._build_structure_task()
          
     bot.mc.setBlock.assert_not_called()
+    assert bot.context['build_index'] == 0
 
 @pytest.mark.asyncio
 async def test_bom_command(bot, mock_structure_class):
     # Invalid plan
     bot.context['current_plan'] = "nonexistent"
-    with patch('agents.builder_bot.get_all_structures', return_value={}):
+    with patch('agents.builder_bot.get_structure_registry', return_value={}):
         await bot.handle_command("bom")
         # Ensure postToChat was called
         if bot.mc.postToChat.called:
@@ -215,7 +251,7 @@ async def test_bom_command(bot, mock_structure_class):
 
     # Valid plan (reset mock if needed)
     bot.context['current_plan'] = "house"
-    with patch('agents.builder_bot.get_all_structures', return_value={"house": mock_structure_class}):
+    with patch('agents.builder_bot.get_structure_registry', return_value={"house": mock_structure_class}):
          await bot.handle_command("bom")
          bot.mc.postToChat.assert_called()
          args = bot.mc.postToChat.call_args[0][0]
@@ -244,7 +280,6 @@ async def test_handle_command_overrides(bot):
 
 @pytest.mark.asyncio
 async def test_process_inventory_msg(bot):
-    bot.bus.receive = AsyncMock()
     msg = {
         "type": "inventory.v1",
         "source": "MinerBot",
@@ -255,9 +290,8 @@ async def test_process_inventory_msg(bot):
     bot.context['task_phase'] = 'WAITING_MATERIALS'
     
     # Simulate one message then stop
-    bot.bus.receive.return_value = msg
-    with patch('asyncio.wait_for', side_effect=[msg, asyncio.TimeoutError()]):
-         await bot.perceive()
+    bot.bus.receive_nowait = MagicMock(side_effect=[msg, None])
+    await bot.perceive()
          
     assert bot.context['inventory'] == {"stone": 10}
 
@@ -271,3 +305,144 @@ async def test_decide_idle(bot):
     bot.context['building_in_progress'] = True
     await bot.decide()
     assert bot.context['next_action'] == 'wait_for_build'
+
+@pytest.mark.asyncio
+async def test_parallel_build_with_crew(mock_mc, message_bus):
+    lead = BuilderBot("Builder_Lead", mock_mc, message_bus)
+    helper = BuilderBot("Builder_Helper", mock_mc, message_bus)
+    for b in (lead, helper):
+        b.logger = MagicMock()
+        b.setup_subscriptions()
+    # 2 capas de 1x4: el ayudante construye la franja x=2..3
+    structures = {"wall": structure_with([[[1, 1, 1, 1]], [[2, 2, 2, 2]]])}
+    lead.context.update({'current_plan': "wall", 'target_position': (0, 0), 'target_height': 10,
+                         'build_crew': [helper.id]})
+
+    async def pump():
+        while True:
+            await lead.perceive()
+            await helper.perceive()
+            await asyncio.sleep(0)
+
+    with patch('agents.builder_bot.get_structure_registry', return_value=structures):
+        await lead._assign_parts()
+        await helper.perceive()
+        assert helper.context['build_job']['part'] == 1
+        assert helper.context['task_phase'] == 'BUILDING'
+
+        pumping = asyncio.create_task(pump())
+        await asyncio.wait_for(asyncio.gather(lead._build_structure_task(), helper._build_structure_task()), 2)
+        pumping.cancel()
+
+    placed = [(c.args[0], c.args[1]) for c in mock_mc.setBlocks.call_args_list + mock_mc.setBlock.call_args_list]
+    # Cada capa completa antes de empezar la siguiente, en cualquiera de las partes
+    ys = [y for _, y in placed]
+    assert sorted({x for x, y in placed if y == 10}) == [0, 2]
+    assert ys.index(11) > max(i for i, y in enumerate(ys) if y == 10)
+    assert "Construccion completada" in mock_mc.postToChat.call_args[0][0]
+    assert lead.context['build_job'] is None and helper.context['build_job'] is None
+    assert helper.context['task_phase'] == 'IDLE'
+    # Cada parte vacía su buffer de escritura antes de cada aviso de progreso (2 capas + final)
+    assert mock_mc.flush.await_count == 6
+
+@pytest.mark.asyncio
+async def test_parallel_build_gives_up_without_crew_progress(mock_mc, message_bus):
+    lead = BuilderBot("Builder_Lead", mock_mc, message_bus)
+    lead.logger = MagicMock()
+    lead.checkpoint = MagicMock()
+    lead.CREW_TIMEOUT = 0.05
+    lead.setup_subscriptions()
+    message_bus.register_agent("Builder_Gone")
+    structures = {"wall": structure_with([[[1, 1, 1, 1]], [[2, 2, 2, 2]]])}
+    lead.context.update({'current_plan': "wall", 'target_position': (0, 0), 'target_height': 10,
+                         'build_crew': ["Builder_Gone"]})
+
+    with patch('agents.builder_bot.get_structure_registry', return_value=structures):
+        await lead._assign_parts()
+        # El ayudante nunca informa: la espera de la capa 1 se agota en vez de colgarse
+        await asyncio.wait_for(lead._build_structure_task(), 1)
+
+    assert "sin progreso" in mock_mc.postToChat.call_args[0][0]
+    assert lead.context['building_in_progress'] is False
+    lead.checkpoint.save.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_parallel_build_stops_when_a_part_pauses(mock_mc, message_bus):
+    lead = BuilderBot("Builder_Lead", mock_mc, message_bus)
+    helper = BuilderBot("Builder_Helper", mock_mc, message_bus)
+    for b in (lead, helper):
+        b.logger = MagicMock()
+        b.checkpoint = MagicMock()
+        b.setup_subscriptions()
+    structures = {"wall": structure_with([[[1, 1, 1, 1]], [[2, 2, 2, 2]], [[3, 3, 3, 3]]])}
+    lead.context.update({'current_plan': "wall", 'target_position': (0, 0), 'target_height': 10,
+                         'build_crew': [helper.id]})
+
+    async def pump():
+        while True:
+            await lead.perceive()
+            await helper.perceive()
+            await asyncio.sleep(0)
+
+    with patch('agents.builder_bot.get_structure_registry', return_value=structures):
+        await lead._assign_parts()
+        await helper.perceive()
+        pumping = asyncio.create_task(pump())
+        for b in (lead, helper):
+            b.context['building_in_progress'] = True
+        building = asyncio.gather(lead._build_structure_task(), helper._build_structure_task())
+        await helper.handle_command("pause")
+        # El principal se entera enseguida, sin esperar los 60s de CREW_TIMEOUT
+        await asyncio.wait_for(building, 1)
+        pumping.cancel()
+
+    assert helper.state == State.PAUSED
+    assert helper.context['task_phase'] == 'BUILDING' # La parte pausada se puede reanudar
+    assert lead.context['task_phase'] == 'IDLE' and lead.context['build_job'] is None
+    assert lead.context['building_in_progress'] is False
+    chat = [c.args[0] for c in mock_mc.postToChat.call_args_list]
+    assert any("abandonada" in m and "paused" in m for m in chat)
+    # Sin reintentos: el principal ya no vuelve a 'resume_building'
+    await lead.decide()
+    assert lead.context['next_action'] == 'idle'
+
+@pytest.mark.asyncio
+async def test_lead_pause_is_passed_to_the_crew(mock_mc, message_bus):
+    lead = BuilderBot("Builder_Lead", mock_mc, message_bus)
+    lead.logger = MagicMock()
+    lead.setup_subscriptions()
+    message_bus.register_agent("Builder_Helper")
+    message_bus.subscribe("Builder_Helper", "command.*.v1")
+    lead.context.update({'current_plan': "wall", 'build_crew': ["Builder_Helper"]})
+    await lead._assign_parts()
+
+    # La tarea de construcción del principal, esperando a su ayudante
+    waiter = asyncio.create_task(lead.ledger.wait_done())
+    await asyncio.sleep(0)
+    await lead.handle_command("pause")
+
+    msg = message_bus.receive_nowait("Builder_Helper")
+    while msg and msg["type"] != "command.pause.v1":
+        msg = message_bus.receive_nowait("Builder_Helper")
+    assert msg["target"] == "Builder_Helper" and msg["payload"]["id"] == "Builder_Helper"
+    # La espera del principal termina en vez de agotar el timeout
+    with pytest.raises(CrewHalted, match="paused"):
+        await asyncio.wait_for(waiter, 1)
+
+@pytest.mark.asyncio
+async def test_busy_helper_rejects_assignment(mock_mc, message_bus):
+    lead = BuilderBot("Builder_Lead", mock_mc, message_bus)
+    helper = BuilderBot("Builder_Helper", mock_mc, message_bus)
+    for b in (lead, helper):
+        b.logger = MagicMock()
+        b.setup_subscriptions()
+    helper.context['task_phase'] = 'WAITING_MATERIALS'
+    lead.context.update({'current_plan': "wall", 'build_crew': [helper.id]})
+
+    await lead._assign_parts()
+    await helper.perceive()
+    await lead.perceive()
+
+    assert lead.ledger.halted == {1: "rejected"}
+    with pytest.raises(CrewHalted):
+        await lead.ledger.wait_done(timeout=1)
@@ -10,7 +10,7 @@ class MockChatPost:
 
 @pytest.fixture
 def mock_mc():
-    mc = MagicMock()
+    mc = AsyncMock()
     # pollChatPosts debe devolver una lista vacía por defecto para no loopar infinito error
     mc.events.pollChatPosts.return_value = []
     return mc
@@ -0,0 +1,77 @@
+import pytest
+import socket
+import threading
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from mcpi.connection import Connection, RequestError
+
+@pytest.fixture
+def conn_pair(monkeypatch):
+    """Connection conectada a un extremo de un socketpair; el otro hace de servidor."""
+    client, server = socket.socketpair()
+    monkeypatch.setattr(socket.socket, "connect", lambda self, addr: None)
+    conn = Connection("localhost", 4711)
+    conn.socket.close()
+    conn.socket = client
+    client.settimeout(5)
+    server.settimeout(5)
+    yield conn, server
+    client.close()
+    server.close()
+
+def reply_to(server, command, reply):
+    """Responde 'reply' cuando el servidor recibe 'command'; devuelve todo lo recibido."""
+    received = bytearray()
+    def run():
+        while command not in received:
+            received.extend(server.recv(4096))
+        server.sendall(reply)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, received
+
+def test_replies_in_one_packet_are_not_lost(conn_pair):
+    conn, server = conn_pair
+    server.sendall(b"1\n2\n3")
+    assert conn.receive() == "1"
+    assert conn.receive() == "2"
+    server.sendall(b"4\n")
+    assert conn.receive() == "34"
+
+def test_line_longer_than_buffer(conn_pair):
+    conn, server = conn_pair
+    conn._buffer = bytearray(8)
+    server.sendall(b"1,2,3,4,5,6,7,8,9\n")
+    assert conn.receive() == "1,2,3,4,5,6,7,8,9"
+
+def test_cp437_decoding(conn_pair):
+    conn, server = conn_pair
+    server.sendall("¡hola!\n".encode("cp437"))
+    assert conn.receive() == "¡hola!"
+
+def test_failed_request(conn_pair):
+    conn, server = conn_pair
+    reply_to(server, b"world.getHeight", b"Fail\n")
+    with pytest.raises(RequestError):
+        conn.sendReceive(b"world.getHeight", 0, 0)
+
+def test_send_receive_drains_stray_data(conn_pair, capsys):
+    conn, server = conn_pair
+    server.sendall(b"stray\n")
+    conn.send(b"world.setBlock", 0, 0, 0, 1)
+    thread, received = reply_to(server, b"world.getHeight", b"64\n")
+
+    # La respuesta perdida se descarta antes de la siguiente petición
+    assert conn.sendReceive(b"world.getHeight", 0, 0) == "64"
+    thread.join()
+    assert bytes(received) == b"world.setBlock(0,0,0,1)\nworld.getHeight(0,0)\n"
+    assert "stray" in capsys.readouterr().err
+
+def test_closed_connection(conn_pair):
+    conn, server = conn_pair
+    server.close()
+    with pytest.raises(ConnectionError):
+        conn.receive()
@@ -0,0 +1,139 @@
+import pytest
+import asyncio
+import sys
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from utils.connection_pool import ConnectionPool
+from mcpi.connection import RequestError
+
+@pytest.fixture
+def connect():
+    """Cada llamada devuelve una conexión simulada nueva."""
+    return AsyncMock(side_effect=lambda address, port: AsyncMock())
+
+@pytest.fixture
+async def pool(connect):
+    pool = ConnectionPool(size=2, connect=connect)
+    pool.logger = MagicMock()
+    await pool.open()
+    yield pool
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_open_creates_connections(pool, connect):
+    assert connect.call_count == 2
+    assert len(pool.connections) == 2
+
+@pytest.mark.asyncio
+async def test_sessions_round_robin(pool):
+    s1 = pool.session("Explorer")
+    s2 = pool.session("Builder")
+    s3 = pool.session("Miner")
+
+    assert pool.session("Explorer") is s1
+    assert s1.mc is pool.connections[0]
+    assert s2.mc is pool.connections[1]
+    assert s3.mc is pool.connections[0]
+
+@pytest.mark.asyncio
+async def test_session_delegates_to_connection(pool):
+    session = pool.session("Builder")
+    await session.setBlock(1, 2, 3, 4)
+    session.mc.setBlock.assert_called_once_with(1, 2, 3, 4)
+
+@pytest.mark.asyncio
+async def test_health_check_reconnects_dead_connection(pool):
+    session = pool.session("Explorer")
+    dead = session.mc
+    dead.getPlayerEntityIds.side_effect = ConnectionError("closed")
+
+    await pool.check_health()
+
+    assert session.mc is not dead
+    dead.close.assert_called_once()
+    pool.connections[1].close.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_health_check_accepts_failed_reply(pool):
+    # Servidor sin jugadores: world.getPlayerIds responde "Fail", pero la conexión responde
+    pool.connections[0].getPlayerEntityIds.side_effect = RequestError("world.getPlayerIds() failed")
+    pool.connections[1].getPlayerEntityIds.side_effect = asyncio.TimeoutError()
+    healthy, silent = pool.connections
+
+    await pool.check_health()
+
+    assert pool.connections[0] is healthy
+    healthy.close.assert_not_called()
+    # Sin respuesta a tiempo sí se reconecta
+    assert pool.connections[1] is not silent
+    silent.close.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_failed_reconnect_keeps_old_connection(pool, connect):
+    old = pool.connections[0]
+    connect.side_effect = ConnectionRefusedError()
+
+    await pool.reconnect(0)
+
+    assert pool.connections[0] is old
+    pool.logger.error.assert_called()
+
+@pytest.mark.asyncio
+async def test_session_requires_open_pool():
+    with pytest.raises(RuntimeError):
+        ConnectionPool().session("Explorer")
+    with pytest.raises(ValueError):
+        ConnectionPool(size=0)
+
+async def start_sequential_server(delay):
+    """Servidor que responde las consultas de una en una, 'delay' segundos cada una (None = nunca)."""
+    async def handle(reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if delay is not None:
+                await asyncio.sleep(delay)
+                writer.write(b"1\n")
+                await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+@pytest.mark.asyncio
+async def test_busy_slot_is_not_reconnected():
+    server, port = await start_sequential_server(0.01)
+    pool = ConnectionPool("127.0.0.1", port, size=1, health_timeout=0.1)
+    pool.logger = MagicMock()
+    await pool.open()
+    conn = pool.connections[0]
+
+    # 0.5 s de cola delante de la consulta de salud, con un plazo de 0.1 s
+    backlog = asyncio.gather(*(conn.getHeight(i, 0) for i in range(50)))
+    await asyncio.sleep(0)
+    await pool.check_health()
+
+    assert pool.connections[0] is conn
+    assert len(await backlog) == 50 # Ninguna consulta en curso ha fallado
+    await pool.close()
+    server.close()
+    await server.wait_closed()
+
+@pytest.mark.asyncio
+async def test_hung_slot_is_reconnected():
+    server, port = await start_sequential_server(None)
+    pool = ConnectionPool("127.0.0.1", port, size=1, health_timeout=0.05)
+    pool.logger = MagicMock()
+    await pool.open()
+    hung = pool.connections[0]
+
+    await pool.check_health()
+
+    assert pool.connections[0] is not hung
+    await pool.close()
+    server.close()
+    await server.wait_closed()
@@ -0,0 +1,74 @@
+import pytest
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from messages.envelope import Envelope, from_iso, to_iso
+from utils.json_schema import SchemaError, validate_message
+
+def test_defaults_and_mapping_access():
+    before = time.monotonic_ns()
+    msg = Envelope(type="map.v1", source="Explorer", payload={"n": 1})
+
+    assert before <= msg.timestamp <= time.monotonic_ns()
+    assert msg["type"] == "map.v1" and msg.get("target") == "BROADCAST"
+    assert msg["status"] == "SUCCESS" and msg["payload"] == {"n": 1}
+    assert "context" not in msg and msg.get("context") is None
+    assert set(msg) == {"type", "source", "target", "timestamp", "payload", "status"}
+    assert not hasattr(msg, "__dict__")
+
+def test_immutable():
+    msg = Envelope(type="map.v1", source="Explorer")
+    with pytest.raises(TypeError):
+        msg["type"] = "other.v1"
+    with pytest.raises(AttributeError):
+        msg.type = "other.v1"
+
+@pytest.mark.parametrize("fields", [
+    {"type": "", "source": "A"},
+    {"type": "map.v1", "source": None},
+    {"type": "map.v1", "source": "A", "payload": "data"},
+    {"type": "map.v1", "source": "A", "status": "DONE"},
+    {"type": "map.v1", "source": "A", "timestamp": "2025-01-01T12:00:00Z"},
+    {"type": "map.v1", "source": "A", "context": []},
+])
+def test_invalid_fields_raise(fields):
+    with pytest.raises(SchemaError):
+        Envelope(**fields)
+
+def test_dict_round_trip():
+    msg = {"type": "command.stop.v1", "source": "User", "target": "BROADCAST",
+           "timestamp": "2025-01-01T12:00:00.500000Z", "payload": {"a": 1},
+           "status": "INITIATED", "context": {"chat": True}}
+    envelope = Envelope.from_dict(msg)
+
+    assert isinstance(envelope.timestamp, int)
+    assert envelope == dict(msg, timestamp=envelope.timestamp) # Se compara como un diccionario
+    assert envelope.to_dict() == msg
+    validate_message(Envelope(type="map.v1", source="A").to_dict())
+
+def test_from_dict_validates():
+    with pytest.raises(SchemaError):
+        Envelope.from_dict({"type": "map.v1", "source": "A", "target": "B", "payload": {}})
+    with pytest.raises(SchemaError):
+        Envelope.from_dict({"type": "map.v1", "source": "A", "target": "B", "payload": {},
+                            "status": "SUCCESS", "timestamp": "ayer"})
+
+def test_timestamps_keep_order_across_conversion():
+    first = Envelope(type="a.v1", source="A")
+    second = Envelope(type="a.v1", source="A")
+    assert first.timestamp <= second.timestamp
+    # ISO 8601 llega a microsegundos
+    assert abs(from_iso(to_iso(first.timestamp)) - first.timestamp) < 1_000
+
+def test_payload_is_a_read_only_snapshot():
+    inventory = {"stone": 1}
+    msg = Envelope(type="inventory.v1", source="Miner", payload=inventory)
+    inventory["stone"] = 5 # El emisor sigue usando su diccionario
+
+    assert msg["payload"] == {"stone": 1}
+    with pytest.raises(TypeError):
+        msg["payload"]["stone"] = 2
+    assert type(msg.to_dict()["payload"]) is dict
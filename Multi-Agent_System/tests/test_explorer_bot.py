@@ -65,22 +65,22 @@ class TestExplorerBot:
         assert bot.state == State.IDLE
 
     @pytest.mark.asyncio
-    async def test_scan_and_find_zones_mocked(self, bot):
+    async def test_scan_and_find_zones_mocked(self, bot, flat_terrain):
         bot.context['target_x'] = 0
         bot.context['target_z'] = 0
         bot.range = 2 
-        bot.mc.getHeight.return_value = 64
+        flat_terrain(bot.mc, 64)
         bot.bus.publish = AsyncMock()
         await bot._scan_and_find_zones()
         assert bot.context['scan_complete'] is True
         bot.bus.publish.assert_called()
 
     @pytest.mark.asyncio
-    async def test_scan_pausing(self, bot):
+    async def test_scan_pausing(self, bot, flat_terrain):
         bot.context['target_x'] = 0
         bot.context['target_z'] = 0
         bot.range = 10
-        bot.mc.getHeight.return_value = 64
+        flat_terrain(bot.mc, 64)
         bot.context['paused'] = True
         await bot._scan_and_find_zones()
         assert 'scan_state' in bot.context
@@ -147,7 +147,7 @@ class TestExplorerBot:
 
     @pytest.mark.asyncio
     async def test_handle_command_misc(self, bot):
-        bot.mc.postToChat = MagicMock()
+        bot.mc.postToChat = AsyncMock()
         await bot.handle_command("help")
         bot.mc.postToChat.assert_called()
         await bot.handle_command("status")
@@ -165,19 +165,16 @@ class TestExplorerBot:
 
     @pytest.mark.asyncio
     async def test_perceive_ignores(self, bot):
-        bot.bus.receive = AsyncMock()
-        bot.bus.receive.side_effect = asyncio.TimeoutError()
+        bot.bus.receive_nowait = MagicMock(return_value=None)
         await bot.perceive() 
         
         msg = {"source": bot.id, "target": "BROADCAST"}
-        bot.bus.receive.side_effect = None
-        bot.bus.receive.return_value = msg
-        with patch('asyncio.wait_for', return_value=msg):
-             await bot.perceive()
+        bot.bus.receive_nowait.return_value = msg
+        await bot.perceive()
         
         msg = {"source": "Unknown", "target": "BROADCAST", "type": "test"}
-        with patch('asyncio.wait_for', return_value=msg):
-             await bot.perceive()
+        bot.bus.receive_nowait.return_value = msg
+        await bot.perceive()
 
 
 
@@ -205,8 +202,8 @@ class TestExplorerBot:
         bot.context['target_z'] = 0
         bot.range = 2
         
-        # getHeight fails
-        bot.mc.getHeight.side_effect = Exception("MC Error")
+        # getBlocks fails
+        bot.mc.getBlocksArray.side_effect = Exception("MC Error")
         
         await bot._scan_and_find_zones()
         # Code catches exception inside loop -> log error -> continue/break
@@ -0,0 +1,108 @@
+import pytest
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from utils.fake_server import FakeRaspberryJuice
+from utils.heightmap import HeightmapProvider
+from mcpi.minecraft import AsyncMinecraft
+from mcpi.connection import RequestError
+
+@pytest.fixture
+async def world():
+    server = FakeRaspberryJuice(size=64, seed=1)
+    port = await server.start()
+    mc = await AsyncMinecraft.create("127.0.0.1", port)
+    yield server, mc
+    await mc.close()
+    await server.stop()
+
+@pytest.mark.asyncio
+async def test_terrain_reads(world):
+    server, mc = world
+    h = await mc.getHeight(5, -7)
+
+    assert h == server.get_height(5, -7)
+    assert await mc.getBlock(5, h - 1, -7) == 2 # Hierba en la superficie
+    assert await mc.getBlock(5, h, -7) == 0
+    assert await mc.getBlock(5, 0, -7) == 7 # Lecho de roca
+    assert await mc.getBlock(500, 10, 0) == 0 # Fuera del mundo
+
+@pytest.mark.asyncio
+async def test_writes_and_region_reads(world):
+    server, mc = world
+    await mc.setBlocks(0, 100, 0, 2, 101, 1, 35, 4)
+    await mc.setBlock(3, 100, 0, 57)
+
+    blocks = await mc.getBlocksArray(0, 100, 0, 3, 101, 1)
+    assert blocks.shape == (2, 2, 4)
+    assert blocks[:, :, :3].tolist() == [[[35] * 3] * 2] * 2
+    assert blocks[0, 0, 3] == 57
+    wool = await mc.getBlockWithData(1, 101, 1)
+    assert (wool.id, wool.data) == (35, 4)
+    assert await mc.getHeight(0, 0) == 102
+
+@pytest.mark.asyncio
+async def test_heightmap_matches_get_height(world):
+    server, mc = world
+    heights = await HeightmapProvider(mc, tile_size=16).get_heights(-20, -20, 20, 20)
+    assert all(h == server.get_height(x, z) for (x, z), h in heights.items())
+
+@pytest.mark.asyncio
+async def test_chat_and_player(world):
+    server, mc = world
+    await mc.postToChat("hola, mundo")
+    server.inject_chat("./explorer start x=1")
+
+    posts = await mc.events.pollChatPosts()
+    assert [(p.entityId, p.message) for p in posts] == [(1, "./explorer start x=1")]
+    assert await mc.events.pollChatPosts() == []
+    assert server.chat_log == ["hola, mundo"]
+
+    await mc.player.setTilePos(3, 70, -2)
+    pos = await mc.player.getTilePos()
+    assert (pos.x, pos.y, pos.z) == (3, 70, -2)
+
+@pytest.mark.asyncio
+async def test_block_hits(world):
+    server, mc = world
+    server.inject_block_hit(1, 2, 3)
+    hits = await mc.events.pollBlockHits()
+    assert (hits[0].pos.x, hits[0].pos.y, hits[0].pos.z) == (1, 2, 3)
+
+@pytest.mark.asyncio
+async def test_unsupported_command_fails(world):
+    server, mc = world
+    with pytest.raises(RequestError):
+        await mc.conn.sendReceive(b"world.getBiome", 0, 0)
+    assert server.counters["unsupported"] == 1
+
+@pytest.mark.asyncio
+async def test_failed_command_does_not_shift_pipelined_replies(world):
+    server, mc = world
+    h = server.get_height(0, 0)
+    # world.setting no existe en el servidor: responde "Fail" aunque no se espere respuesta
+    await mc.setting("world_immutable", True)
+    await mc.conn.send(b"world.setBlock", 0, "x", 0, 1) # Coordenada no numérica: también "Fail"
+
+    replies = await asyncio.gather(mc.getBlock(0, 0, 0), mc.getHeight(0, 0))
+    assert replies == [7, h]
+    assert await mc.getBlock(0, 0, 0) == 7
+    with pytest.raises(RequestError):
+        await mc.conn.sendReceive(b"world.getBiome", 0, 0)
+
+@pytest.mark.asyncio
+async def test_counters_and_latency_pipelining(world):
+    server, mc = world
+    server.latency = 0.05
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    await mc.getHeights([(x, 0) for x in range(20)])
+
+    # 20 consultas encadenadas cuestan una latencia, no veinte
+    assert loop.time() - start < 0.5
+    assert server.counters["world.getHeight"] == 20
+    assert server.bytes_in > 0 and server.bytes_out > 0
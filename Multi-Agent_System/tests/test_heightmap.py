@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from utils.heightmap import HeightmapProvider
+
+class FakeWorld:
+    """Mundo sintético con la semántica de RaspberryJuice para getHeight/getBlocks."""
+    def __init__(self, surface):
+        self.surface = surface # (x, z) -> Y del primer bloque de aire
+        self.calls = []
+
+    def block(self, x, y, z):
+        return 1 if y < self.surface(x, z) else 0
+
+    async def getHeight(self, x, z):
+        self.calls.append("getHeight")
+        return self.surface(x, z)
+
+    async def getHeights(self, points):
+        self.calls.append("getHeights")
+        return [self.surface(x, z) for x, z in points]
+
+    async def getBlocksArray(self, x0, y0, z0, x1, y1, z1):
+        self.calls.append("getBlocks")
+        return np.array([[[self.block(x, y, z) for x in range(x0, x1 + 1)]
+                          for z in range(z0, z1 + 1)] for y in range(y0, y1 + 1)], dtype=np.uint16)
+
+def reference(world, min_x, min_z, max_x, max_z):
+    return {(x, z): world.surface(x, z)
+            for x in range(min_x, max_x + 1) for z in range(min_z, max_z + 1)}
+
+@pytest.mark.asyncio
+async def test_flat_terrain_few_requests():
+    world = FakeWorld(lambda x, z: 64)
+    provider = HeightmapProvider(world)
+
+    heights = await provider.get_heights(-50, -50, 50, 50)
+
+    assert heights == reference(world, -50, -50, 50, 50)
+    # 101x101 columnas: un lote de alturas de referencia + un getBlocks por tesela
+    assert world.calls.count("getBlocks") == 16
+    assert len(world.calls) == 17
+
+@pytest.mark.asyncio
+async def test_rough_terrain_matches_get_height():
+    # Pendiente, torre alta y pozo profundo fuera del corte inicial
+    def surface(x, z):
+        if (x, z) == (3, 3):
+            return 120
+        if (x, z) == (7, 2):
+            return 5
+        return 60 + x // 2
+    world = FakeWorld(surface)
+    provider = HeightmapProvider(world, tile_size=8, slab_height=8)
+
+    heights = await provider.get_heights(0, 0, 15, 9)
+
+    assert heights == reference(world, 0, 0, 15, 9)
+
+@pytest.mark.asyncio
+async def test_world_limits():
+    world = FakeWorld(lambda x, z: 256 if x == 0 else 0)
+    provider = HeightmapProvider(world, slab_height=16)
+
+    heights = await provider.get_heights(0, 0, 1, 0)
+
+    assert heights == {(0, 0): 256, (1, 0): 0}
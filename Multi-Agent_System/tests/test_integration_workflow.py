@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from agents.workflow_manager import WorkflowManager
 from agents.state_model import State
 
@@ -43,4 +43,23 @@ class TestIntegrationWorkflow:
         call_args = mock_explorer.handle_command.call_args[0]
         assert call_args[0] == "start"
         assert isinstance(call_args[1], dict)
-        assert call_args[1]["x"] == 100
\ No newline at end of file
+        assert call_args[1]["x"] == 100
+    async def test_workflow_with_builder_crew(self, agent_manager):
+        """builders=N crea ayudantes del builder y los conecta como compañeros."""
+        agents = [AsyncMock() for _ in range(4)]
+        explorer, builder, miner, helper = agents
+        helper.id = "BuilderBot_WF1_2"
+        for agent in agents:
+            agent.context = {}
+        agent_manager.create_agent = AsyncMock(side_effect=agents)
+        agent_manager.get_agent = MagicMock(return_value=None)
+
+        wf_manager = WorkflowManager(agent_manager)
+        with patch('asyncio.sleep', new_callable=AsyncMock):
+            await wf_manager.execute_workflow("x=0 z=0 template=house builders=2 builder.mode=layers")
+
+        assert agent_manager.create_agent.call_args_list[3].args == ("BuilderBot", "BuilderBot_WF1_2")
+        assert builder.context['build_crew'] == ["BuilderBot_WF1_2"]
+        assert builder.context['build_mode'] == "layers"
+        assert "BuilderBot_WF1_2" in builder.context['partners'].values()
+        assert helper.context['partners']['builder'] == "BuilderBot_WF1"
@@ -0,0 +1,104 @@
+import pytest
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from messages.mailbox import Mailbox, BLOCK, DROP_NEWEST, DROP_OLDEST, COALESCE
+
+def msg(msg_type, n=0, source="A"):
+    return {"type": msg_type, "source": source, "payload": {"n": n}}
+
+def drain(box):
+    out = []
+    while not box.empty():
+        m = box.get_nowait()
+        out.append((m["type"], m["payload"]["n"]))
+    return out
+
+def test_fifo_and_stats():
+    box = Mailbox()
+    for i in range(3):
+        assert box.offer(msg("map.v1", i)) is True
+    assert box.stats()["pending"] == {"map.v1": 3}
+    assert drain(box) == [("map.v1", 0), ("map.v1", 1), ("map.v1", 2)]
+    stats = box.stats()
+    assert stats["depth"] == 0 and stats["max_depth"] == 3 and stats["delivered"] == 3
+    with pytest.raises(asyncio.QueueEmpty):
+        box.get_nowait()
+
+def test_type_drop_oldest_keeps_other_types_in_order():
+    box = Mailbox()
+    box.limit("map.v1", 2, DROP_OLDEST)
+    box.offer(msg("map.v1", 0))
+    box.offer(msg("command.stop.v1", 0))
+    box.offer(msg("map.v1", 1))
+    box.offer(msg("map.v1", 2))
+
+    assert box.qsize() == 3
+    assert drain(box) == [("command.stop.v1", 0), ("map.v1", 1), ("map.v1", 2)]
+    assert box.stats()["dropped"] == {"map.v1": 1}
+
+def test_type_drop_newest():
+    box = Mailbox()
+    box.limit("map.v1", 1, DROP_NEWEST)
+    assert box.offer(msg("map.v1", 0)) is True
+    assert box.offer(msg("map.v1", 1)) is False
+    assert drain(box) == [("map.v1", 0)]
+    assert box.dropped["map.v1"] == 1
+
+def test_coalesce_latest_by_key_keeps_position():
+    box = Mailbox()
+    box.limit("inventory.v1", overflow=COALESCE)
+    box.offer(msg("inventory.v1", 0, source="Miner1"))
+    box.offer(msg("map.v1", 0))
+    box.offer(msg("inventory.v1", 0, source="Miner2"))
+    box.offer(msg("inventory.v1", 5, source="Miner1"))
+
+    assert box.qsize() == 3
+    assert drain(box) == [("inventory.v1", 5), ("map.v1", 0), ("inventory.v1", 0)]
+    assert box.stats()["coalesced"] == {"inventory.v1": 1}
+
+    # Una vez leído, el siguiente mensaje de la misma clave vuelve a encolarse
+    box.offer(msg("inventory.v1", 6, source="Miner1"))
+    assert drain(box) == [("inventory.v1", 6)]
+
+def test_agent_limit_drop_oldest():
+    box = Mailbox(max_size=2, overflow=DROP_OLDEST)
+    for i in range(4):
+        assert box.offer(msg("map.v1", i)) is True
+    assert drain(box) == [("map.v1", 2), ("map.v1", 3)]
+    assert box.stats()["dropped"] == {"map.v1": 2}
+    assert box.stats()["max_depth"] == 2
+
+def test_dropped_entries_do_not_accumulate():
+    box = Mailbox()
+    box.limit("map.v1", 8, DROP_OLDEST)
+    box.offer(msg("inventory.v1", 0)) # Se queda en cabeza sin leer
+    for i in range(100_000):
+        box.offer(msg("map.v1", i))
+
+    assert box.qsize() == 9
+    assert len(box._entries) <= 2 * box.qsize() + Mailbox.COMPACT_MIN
+    assert drain(box) == [("inventory.v1", 0)] + [("map.v1", i) for i in range(99_992, 100_000)]
+    assert len(box._entries) == 0 and box._dead == 0
+
+def test_agent_limit_rejects_coalesce():
+    with pytest.raises(ValueError):
+        Mailbox(max_size=2, overflow=COALESCE)
+
+@pytest.mark.asyncio
+async def test_agent_limit_blocks_publisher():
+    box = Mailbox(max_size=1, overflow=BLOCK)
+    await box.put(msg("map.v1", 0))
+    assert box.offer(msg("map.v1", 1)) is None
+
+    blocked = asyncio.create_task(box.put(msg("map.v1", 1)))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    assert (await box.get())["payload"]["n"] == 0
+    assert await asyncio.wait_for(blocked, timeout=1) is True
+    assert box.stats()["blocked"] == 1
+    assert drain(box) == [("map.v1", 1)]
@@ -2,10 +2,10 @@ import pytest
 import asyncio
 from unittest.mock import MagicMock, AsyncMock
 from messages.message_bus import MessageBus
+from messages.envelope import Envelope
 
 @pytest.fixture(autouse=True)
 def mock_deps(monkeypatch):
-    monkeypatch.setattr("messages.message_bus.validate_message", lambda m: True)
     # Mockear Logger
     mock_logger = MagicMock()
     monkeypatch.setattr("messages.message_bus.Logger", MagicMock(return_value=mock_logger))
@@ -36,7 +36,7 @@ async def test_publish_subscribe_delivery(bus):
     bus.register_agent("Subscriber1")
     bus.subscribe("Subscriber1", "broadcast.v1")
     
-    msg = {"type": "broadcast.v1", "payload": "data", "target": None}
+    msg = Envelope(type="broadcast.v1", source="Sender", payload={"data": 1})
     await bus.publish("Sender", msg)
     
     received = await bus.receive("Subscriber1")
@@ -47,13 +47,160 @@ async def test_publish_direct_delivery(bus):
     """Verifica entrega punto a punto usando 'target'."""
     bus.register_agent("TargetAgent")
     
-    msg = {"type": "generic.v1", "payload": "secret", "target": "TargetAgent"}
+    msg = Envelope(type="generic.v1", source="Sender", payload={"secret": 1}, target="TargetAgent")
     await bus.publish("Sender", msg)
     
     received = await bus.receive("TargetAgent")
     assert received == msg
 
+@pytest.mark.asyncio
+async def test_external_dict_is_validated_and_wrapped(bus):
+    bus.register_agent("A")
+    bus.subscribe("A", "command.stop.v1")
+
+    msg = {"type": "command.stop.v1", "source": "User", "target": "BROADCAST",
+           "timestamp": "2025-01-01T12:00:00Z", "payload": {}, "status": "INITIATED"}
+    await bus.publish("User", msg)
+    received = bus.receive_nowait("A")
+    assert isinstance(received, Envelope)
+    assert received.to_dict() == msg
+
+    # Sin timestamp ni status no pasa el esquema
+    await bus.publish("User", {"type": "command.stop.v1", "source": "User", "target": "BROADCAST", "payload": {}})
+    assert bus.pending("A") == 0
+
+@pytest.mark.asyncio
+async def test_envelope_skips_schema_validation(bus, monkeypatch):
+    validate = MagicMock()
+    monkeypatch.setattr("messages.envelope.validate_message", validate)
+    bus.register_agent("A")
+
+    msg = Envelope(type="generic.v1", source="Sender", target="A")
+    await bus.publish("Sender", msg)
+    assert bus.receive_nowait("A") is msg
+    validate.assert_not_called()
+
 @pytest.mark.asyncio
 async def test_receive_unregistered_raises_error(bus):
     with pytest.raises(ValueError, match="is not registered"):
         await bus.receive("GhostAgent")
+
+@pytest.mark.asyncio
+async def test_delivery_wakes_only_the_recipient(bus):
+    woken = []
+    bus.register_agent("A", on_message=lambda: woken.append("A"))
+    bus.register_agent("B", on_message=lambda: woken.append("B"))
+
+    await bus.publish("Sender", Envelope(type="generic.v1", source="Sender", payload={}, target="B"))
+
+    assert woken == ["B"]
+    assert bus.pending("B") == 1 and bus.pending("A") == 0
+
+@pytest.mark.asyncio
+async def test_receive_nowait(bus):
+    bus.register_agent("A")
+    assert bus.receive_nowait("A") is None
+
+    msg = Envelope(type="generic.v1", source="Sender", payload={}, target="A")
+    await bus.publish("Sender", msg)
+    assert bus.receive_nowait("A") == msg
+    assert bus.pending("A") == 0
+
+    with pytest.raises(ValueError, match="is not registered"):
+        bus.receive_nowait("GhostAgent")
+
+@pytest.mark.asyncio
+async def test_broadcast_shares_one_frozen_message(bus):
+    for agent in ("A", "B", "C"):
+        bus.register_agent(agent)
+        bus.subscribe(agent, "map.v1")
+
+    await bus.publish("Explorer", Envelope(type="map.v1", source="Explorer", payload={"cells": list(range(1000))}, target="BROADCAST"))
+
+    received = [bus.receive_nowait(agent) for agent in ("A", "B", "C")]
+    assert received[0] is received[1] is received[2] # Sin copias por destinatario
+    with pytest.raises(TypeError):
+        received[0]["type"] = "other.v1"
+
+@pytest.mark.asyncio
+async def test_subscription_drop_policy(bus):
+    bus.register_agent("A")
+    bus.subscribe("A", "map.v1", max_pending=2, overflow="drop")
+    bus.subscribe("A", "inventory.v1")
+
+    for i in range(4):
+        await bus.publish("Explorer", Envelope(type="map.v1", source="Explorer", payload={"n": i}, target="BROADCAST"))
+    await bus.publish("Miner", Envelope(type="inventory.v1", source="Miner", payload={}, target="BROADCAST"))
+
+    # El límite es por tipo: inventory.v1 sigue entrando
+    assert [bus.receive_nowait("A")["payload"].get("n") for _ in range(3)] == [0, 1, None]
+    assert bus._queues["A"].dropped["map.v1"] == 2
+
+@pytest.mark.asyncio
+async def test_subscription_block_policy_applies_backpressure(bus):
+    bus.register_agent("Slow")
+    bus.register_agent("Fast")
+    bus.subscribe("Slow", "map.v1", max_pending=1, overflow="block")
+    bus.subscribe("Fast", "map.v1")
+
+    await bus.publish("Explorer", Envelope(type="map.v1", source="Explorer", payload={"n": 0}, target="BROADCAST"))
+    second = asyncio.create_task(bus.publish("Explorer", Envelope(type="map.v1", source="Explorer", payload={"n": 1}, target="BROADCAST")))
+    await asyncio.sleep(0.01)
+
+    # El suscriptor sin límite ya lo tiene; el publicador espera al lento
+    assert not second.done()
+    assert bus.pending("Fast") == 2
+
+    assert bus.receive_nowait("Slow")["payload"]["n"] == 0
+    await asyncio.wait_for(second, timeout=1)
+    assert bus.receive_nowait("Slow")["payload"]["n"] == 1
+
+def test_unknown_overflow_policy(bus):
+    bus.register_agent("A")
+    with pytest.raises(ValueError):
+        bus.subscribe("A", "map.v1", max_pending=1, overflow="explode")
+
+@pytest.mark.asyncio
+async def test_mailbox_limits_and_stats(bus):
+    bus.register_agent("Builder", max_size=3, overflow="drop_oldest")
+    bus.subscribe("Builder", "inventory.v1", overflow="coalesce")
+    bus.subscribe("Builder", "map.v1")
+
+    for i in range(3):
+        await bus.publish("Miner", Envelope(type="inventory.v1", source="Miner", payload={"n": i}, target="BROADCAST"))
+    for i in range(4):
+        await bus.publish("Explorer", Envelope(type="map.v1", source="Explorer", payload={"n": i}, target="BROADCAST"))
+
+    stats = bus.mailbox_stats("Builder")
+    assert stats["depth"] == 3
+    assert stats["coalesced"] == {"inventory.v1": 2}
+    # El buzón lleno descarta lo más antiguo, incluido el inventario
+    assert stats["dropped"] == {"inventory.v1": 1, "map.v1": 1}
+    assert [bus.receive_nowait("Builder")["payload"]["n"] for _ in range(3)] == [1, 2, 3]
+    assert "Builder" in bus.mailbox_stats()
+
+@pytest.mark.asyncio
+async def test_wildcard_subscriptions_and_route_cache(bus):
+    bus.register_agent("Miner")
+    bus.register_agent("Auditor")
+    bus.subscribe("Miner", "command.*.v1")
+    bus.subscribe("Miner", "command.stop.v1") # Solapada: una sola copia
+    bus.subscribe("Auditor", "region.#")
+
+    assert bus.route("command.stop.v1") == ("Miner",)
+    assert bus.route("region.lock.v1") == ("Auditor",)
+    assert bus.route("map.v1") == ()
+
+    await bus.publish("User", Envelope(type="command.stop.v1", source="User", payload={}, target="BROADCAST"))
+    assert bus.pending("Miner") == 1
+
+    # Las rutas se recalculan al cambiar las suscripciones
+    bus.subscribe("Auditor", "command.#")
+    assert bus.route("command.stop.v1") == ("Auditor", "Miner")
+    bus.unsubscribe("Miner", "command.*.v1")
+    assert bus.route("command.plan.v1") == ("Auditor",)
+
+def test_type_limits_need_exact_topic(bus):
+    bus.register_agent("A")
+    with pytest.raises(ValueError):
+        bus.subscribe("A", "region.*.v1", max_pending=1)
@@ -190,6 +190,20 @@ async def test_loose_ignored_id_argument(mock_message_bus):
     assert control_msg['target'] == "BROADCAST"
     assert 'list' in payload['args']
 
+@pytest.mark.asyncio
+async def test_structure_added_later_is_not_an_id(mock_message_bus, monkeypatch):
+    structures = {"wall"}
+    monkeypatch.setattr("messages.message_parser.get_structure_registry", lambda path: structures)
+    parser = MessageParser(mock_message_bus)
+
+    # Estructura que aparece en builder_structures después de arrancar
+    structures.add("tower")
+    await parser.process_chat_message("./builder build tower")
+
+    payload = mock_message_bus.publish.call_args[0][1]['payload']
+    assert 'id' not in payload
+    assert 'tower' in payload['args']
+
 @pytest.mark.asyncio
 async def test_parse_range_value_error(mock_message_bus):
     parser = MessageParser(mock_message_bus)
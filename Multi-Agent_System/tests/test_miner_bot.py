@@ -17,6 +17,13 @@ class TestMinerBot:
         bot.strategy = MagicMock() 
         return bot
 
+    def test_setup_subscriptions_once_per_topic(self, bot):
+        bot.setup_subscriptions()
+        assert bot.id in bot.bus._subscriptions["command.*.v1"]
+        for topic in ("command.fulfill.v1", "materials.requirements.v1", "region.lock.v1", "region.unlock.v1", "build.v1"):
+            assert bot.bus.route(topic) == (bot.id,)
+        assert bot.bus.route("map.v1") == ()
+
     @pytest.mark.asyncio
     async def test_process_bom_resets_inventory(self, bot):
         payload = {
@@ -24,7 +31,7 @@ class TestMinerBot:
             "build_position": (10, 64, 10)
         }
         with patch('agents.miner_bot.get_block_id', return_value=1):
-             bot._process_bom(payload)
+             await bot._process_bom(payload)
              await asyncio.sleep(0) 
              
         assert bot.context['requirements']['stone'] == 10
@@ -39,7 +46,7 @@ class TestMinerBot:
         }
         # get_block_id returns None for unknown
         with patch('agents.miner_bot.get_block_id', return_value=None):
-             bot._process_bom(payload)
+             await bot._process_bom(payload)
              await asyncio.sleep(0)
         
         # Should be in requirements but not in inventory_ids maybe?
@@ -116,9 +123,8 @@ class TestMinerBot:
         
     @pytest.mark.asyncio
     async def test_perceive_locks(self, bot):
-        bot.bus.receive = AsyncMock()
         msg_lock = {"type": "region.lock.v1", "source": "Other", "payload": {"zone": {"x":0, "z":0, "radius":10}}}
-        bot.bus.receive.return_value = msg_lock
+        bot.bus.receive_nowait = MagicMock(return_value=msg_lock)
         await bot.perceive()
         assert len(bot.context['forbidden_zones']) == 1
 
@@ -178,15 +184,15 @@ class TestMinerBot:
 
     @pytest.mark.asyncio
     async def test_handle_command_set_strategy(self, bot):
-        with patch('agents.miner_bot.MinerBot.load_strategy_dynamically') as mock:
+        with patch('agents.miner_bot.MinerBot.load_strategy_dynamically', new_callable=AsyncMock) as mock:
             await bot.handle_command("set", {"strategy": "Vertical"})
             mock.assert_called()
             
-    def test_load_strategy_dynamically(self, bot):
+    async def test_load_strategy_dynamically(self, bot):
         mock_cls = MagicMock()
         mock_cls.__name__ = "MockStrat"
         with patch('utils.reflection.get_all_strategies', return_value={"MockStrat": mock_cls}):
-             bot.load_strategy_dynamically("Mock")
+             await bot.load_strategy_dynamically("Mock")
              assert isinstance(bot.strategy, MagicMock)
 
 # --- Extended Tests ---
@@ -200,11 +206,11 @@ def mock_extended_message_bus():
     return mock
 
 @pytest.fixture
-def extended_bot(mock_mc, mock_extended_message_bus):
+async def extended_bot(mock_mc, mock_extended_message_bus):
     bot = MinerBot("Miner_Test", mock_mc, mock_extended_message_bus)
     bot.logger = MagicMock()
     with patch('utils.reflection.get_all_strategies', return_value={}):
-        bot.load_strategy_dynamically("GridStrategy")
+        await bot.load_strategy_dynamically("GridStrategy")
     # Reset context for clean testing
     bot.context['partners'] = {}
     bot.context['forbidden_zones'] = []
@@ -216,7 +222,7 @@ async def test_perceive_filtering_partners(extended_bot):
     bot.context['partners'] = {'Explorer': 'ExplorerBot_1'}
     
     msg = {"source": "StrangeAgent", "target": "Miner_Test", "type": "some.type", "payload": {}}
-    bot.bus.receive.side_effect = [msg, asyncio.TimeoutError]
+    bot.bus.receive_nowait = MagicMock(side_effect=[msg, None])
     
     bot.handle_incoming_message = AsyncMock()
     
@@ -230,14 +236,12 @@ async def test_perceive_region_lock_unlock(extended_bot):
     msg_lock = {"source": "OtherBot", "target": "BROADCAST", "type": "region.lock.v1", "payload": {"zone": "ZoneA"}}
     msg_unlock = {"source": "OtherBot", "target": "BROADCAST", "type": "region.unlock.v1", "payload": {"zone": "ZoneA"}}
     
-    bot.bus.receive.side_effect = [msg_lock, msg_unlock, asyncio.TimeoutError]
+    bot.bus.receive_nowait = MagicMock(side_effect=[msg_lock, msg_unlock, None])
     bot.handle_incoming_message = AsyncMock() 
     
-    bot.bus.receive.side_effect = [msg_lock]
     await bot.perceive()
     assert "ZoneA" in bot.context['forbidden_zones']
     
-    bot.bus.receive.side_effect = [msg_unlock]
     await bot.perceive()
     assert "ZoneA" not in bot.context['forbidden_zones']
 
@@ -246,7 +250,7 @@ async def test_process_bom_without_build_pos(extended_bot):
     bot = extended_bot
     payload = {"requirements": {"stone": 10}}
     with patch.object(bot, '_calculate_random_zone') as mock_calc:
-        bot._process_bom(payload)
+        await bot._process_bom(payload)
         mock_calc.assert_called_once()
     
     assert bot.context['target_y'] is None
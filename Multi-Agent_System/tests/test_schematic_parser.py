@@ -8,7 +8,8 @@ import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
 
-from utils.schematic_parser import SimpleNBT, SchematicParser
+from utils.schematic_parser import SimpleNBT, FastNBT, SchematicParser
+from utils.block_translator import TRANSLATOR
 
 class TestSimpleNBT:
     """Test individual NBT tag parsing using BytesIO."""
@@ -68,11 +69,56 @@ class TestSimpleNBT:
         assert SimpleNBT.read_payload(stream, SimpleNBT.TAG_List) == [10, 20]
 
 
+def _named(tag_type, name, payload):
+    data = name.encode('utf-8')
+    return struct.pack('>bH', tag_type, len(data)) + data + payload
+
+class TestFastNBT:
+    """Same trees as SimpleNBT, decoded from an in-memory buffer."""
+
+    def test_parse_matches_simple_nbt(self):
+        root = _named(SimpleNBT.TAG_Compound, "Schematic",
+            _named(SimpleNBT.TAG_Short, "Width", struct.pack('>h', 3)) +
+            _named(SimpleNBT.TAG_String, "Name", struct.pack('>H', 4) + b'casa') +
+            _named(SimpleNBT.TAG_Byte_Array, "BlockData", struct.pack('>i', 3) + b'\x00\x01\x02') +
+            _named(SimpleNBT.TAG_Int_Array, "Offset", struct.pack('>i3i', 3, -1, 0, 70000)) +
+            _named(SimpleNBT.TAG_Long_Array, "Longs", struct.pack('>i2q', 2, 1, -1)) +
+            _named(SimpleNBT.TAG_List, "Doubles", struct.pack('>bi2d', SimpleNBT.TAG_Double, 2, 1.5, -2.0)) +
+            _named(SimpleNBT.TAG_List, "Empty", struct.pack('>bi', SimpleNBT.TAG_End, 0)) +
+            _named(SimpleNBT.TAG_Compound, "Palette",
+                _named(SimpleNBT.TAG_Int, "minecraft:stone", struct.pack('>i', 0)) + b'\x00') +
+            b'\x00')
+
+        fast = FastNBT.parse(root)
+        simple = SimpleNBT.parse(io.BytesIO(root))
+
+        assert fast["Offset"].tolist() == simple["Offset"] == [-1, 0, 70000]
+        assert fast["Longs"].tolist() == simple["Longs"] == [1, -1]
+        for key in ("Offset", "Longs"):
+            del fast[key], simple[key]
+        assert fast == simple
+        assert fast["BlockData"] == b'\x00\x01\x02'
+
+    def test_parse_real_schematic(self):
+        path = os.path.join(os.path.dirname(__file__), '../builder_structures/vsmall_bloque5x4.schem')
+        with open(path, 'rb') as f:
+            raw = gzip.decompress(f.read())
+        fast = FastNBT.parse(raw)
+        simple = SimpleNBT.parse(io.BytesIO(raw))
+        assert fast["Palette"] == simple["Palette"]
+        assert fast["BlockData"] == simple["BlockData"]
+        assert (fast["Width"], fast["Height"], fast["Length"]) == (simple["Width"], simple["Height"], simple["Length"])
+
+    def test_unknown_tag(self):
+        with pytest.raises(ValueError):
+            FastNBT.parse(_named(42, "", b''))
+
+
 class TestSchematicParser:
 
-    @patch("utils.schematic_parser.gzip.open")
+    @patch("utils.schematic_parser.gzip.decompress")
     def test_load_error(self, mock_gzip):
-        mock_gzip.side_effect = Exception("File not found")
+        mock_gzip.side_effect = Exception("Not a gzip file")
         parser = SchematicParser("dummy.schem")
         assert parser.data == {}
 
@@ -88,11 +134,25 @@ class TestSchematicParser:
         
         byte_array = b'\x80\x01' 
         decoded = parser.decode_block_data(byte_array)
-        assert decoded == [128]
+        assert decoded.tolist() == [128]
 
         # Test [1, 2] -> 0x01, 0x02
         decoded = parser.decode_block_data(b'\x01\x02')
-        assert decoded == [1, 2]
+        assert decoded.tolist() == [1, 2]
+
+    def test_decode_block_data_multibyte(self):
+        parser = SchematicParser("dummy")
+        values = [0, 127, 128, 5, 300, 16383, 16384, 1, 2097151, 70000]
+        encoded = bytearray()
+        for v in values:
+            while v >= 0x80:
+                encoded.append((v & 0x7F) | 0x80)
+                v >>= 7
+            encoded.append(v)
+        assert parser.decode_block_data(bytes(encoded)).tolist() == values
+        # Un VarInt truncado al final se decodifica con los bytes que hay
+        assert parser.decode_block_data(b'\x05\x81').tolist() == [5, 1]
+        assert parser.decode_block_data(b'').tolist() == []
 
     def test_get_blocks_and_bom(self):
         parser = SchematicParser("dummy")
@@ -136,3 +196,35 @@ class TestSchematicParser:
         blocks = parser.get_blocks()
         assert len(blocks) == 1
         assert blocks[0]['block'] == "minecraft:dirt"
+
+    def test_palette_translated_once_to_voxels(self):
+        parser = SchematicParser("dummy")
+        parser.data = {
+            "Width": 2, "Height": 2, "Length": 1,
+            "Palette": {"minecraft:air": 0, "minecraft:stone": 1, "minecraft:red_wool": 2,
+                        "minecraft:oak_stairs[facing=east]": 3},
+            # (y, z, x): y=0 -> [stone, red_wool], y=1 -> [air, stairs]
+            "BlockData": b'\x01\x02\x00\x03'
+        }
+        parser._parse_dimensions()
+
+        with patch.object(TRANSLATOR, "intern", wraps=TRANSLATOR.intern) as translate:
+            ids, data = parser.get_voxels()
+            parser.get_build_list()
+            parser.get_bom()
+        translate.assert_called_once() # Toda la paleta de una vez
+        assert len(list(translate.call_args[0][0])) == 4
+
+        assert ids.shape == (2, 1, 2)
+        assert ids.tolist() == [[[1, 35]], [[0, 53]]]
+        assert data.tolist() == [[[0, 14]], [[0, 0]]]
+        assert parser.get_build_list() == [[0, 0, 0, 1, 0], [1, 0, 0, 35, 14], [1, 1, 0, 53, 0]]
+        assert parser.get_bom() == {"stone": 1, "red_wool": 1, "oak_stairs": 1}
+
+    def test_missing_block_data_is_air(self):
+        parser = SchematicParser("dummy")
+        parser.data = {"Width": 2, "Height": 1, "Length": 1,
+                       "Palette": {"minecraft:dirt": 0}, "BlockData": b'\x00'}
+        parser._parse_dimensions()
+        assert parser.get_build_list() == [[0, 0, 0, 3, 0]]
+        assert len(parser.get_blocks()) == 1
@@ -13,7 +13,7 @@ from strategies.vein_strategy import VeinStrategy
 
 @pytest.fixture
 def mock_mc():
-    return MagicMock()
+    return AsyncMock()
 
 @pytest.fixture
 def mock_logger():
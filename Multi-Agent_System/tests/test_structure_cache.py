@@ -0,0 +1,61 @@
+import pytest
+import os
+import shutil
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from utils.schematic_parser import SchematicParser
+from utils.structure_cache import load_structure, sidecar_path
+from utils.reflection import get_all_structures
+
+SOURCE = os.path.join(os.path.dirname(__file__), '../builder_structures/vsmall_bloque5x4.schem')
+
+@pytest.fixture
+def schem(tmp_path):
+    path = tmp_path / "bloque.schem"
+    shutil.copy(SOURCE, path)
+    return str(path)
+
+def test_cold_load_writes_sidecar(schem):
+    parser = load_structure(schem)
+    assert os.path.exists(sidecar_path(schem))
+    assert parser.get_bom() == SchematicParser(schem).get_bom()
+
+def test_warm_load_does_not_parse(schem):
+    reference = SchematicParser(schem)
+    load_structure(schem)
+
+    with patch('utils.structure_cache.SchematicParser.__init__', side_effect=AssertionError("parsed")):
+        parser = load_structure(schem)
+        # Dimensiones, BOM y caja sin tocar los bloques
+        assert (parser.width, parser.height, parser.length) == (reference.width, reference.height, reference.length)
+        assert parser.get_bom() == reference.get_bom()
+        assert parser.get_bbox() == reference.get_bbox()
+        assert parser.indices_cache is None
+
+        assert parser.get_build_list() == reference.get_build_list()
+        assert parser.get_blocks() == reference.get_blocks()
+
+def test_changed_file_invalidates_sidecar(schem):
+    load_structure(schem)
+    stat = os.stat(schem)
+    os.utime(schem, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    with patch('utils.structure_cache.write_sidecar') as write:
+        load_structure(schem)
+    write.assert_called_once() # Se ha vuelto a parsear y compilar
+
+def test_corrupt_sidecar_falls_back_to_parsing(schem):
+    load_structure(schem)
+    with open(sidecar_path(schem), "wb") as f:
+        f.write(b"no es un npz")
+
+    parser = load_structure(schem)
+    assert parser.get_build_list() == SchematicParser(schem).get_build_list()
+
+def test_get_all_structures_uses_cache(schem, tmp_path):
+    structures = get_all_structures(str(tmp_path))
+    assert list(structures) == ["bloque"]
+    assert os.path.exists(sidecar_path(schem))
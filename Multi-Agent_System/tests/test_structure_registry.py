@@ -0,0 +1,80 @@
+import pytest
+import asyncio
+import os
+import shutil
+import sys
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from utils.schematic_parser import SchematicParser
+from utils.structure_registry import StructureRegistry, get_structure_registry
+
+STRUCTURES = os.path.join(os.path.dirname(__file__), '../builder_structures')
+
+@pytest.fixture
+def structures_dir(tmp_path):
+    for name in ("vsmall_bloque5x4", "small_ovni", "mid_coche"):
+        shutil.copy(os.path.join(STRUCTURES, name + ".schem"), tmp_path / (name + ".schem"))
+    return str(tmp_path)
+
+def test_names_without_parsing(structures_dir):
+    registry = StructureRegistry(structures_dir)
+    with patch('utils.structure_cache.SchematicParser.__init__', side_effect=AssertionError("parsed")):
+        assert registry.names() == ["mid_coche", "small_ovni", "vsmall_bloque5x4"]
+        assert "small_ovni" in registry
+        assert "castle" not in registry
+        assert len(registry) == 3
+    assert registry.loads == 0
+
+def test_lazy_shared_load(structures_dir):
+    registry = StructureRegistry(structures_dir)
+    first = registry["small_ovni"]
+    assert registry["small_ovni"] is first # Mismo objeto para todos los agentes
+    assert registry.loads == 1
+    assert registry.get("castle") is None
+
+    ids, _ = first.get_voxels()
+    with pytest.raises(ValueError):
+        ids[0, 0, 0] = 1 # Bloques de solo lectura
+
+def test_memory_budget_evicts_least_recently_used(structures_dir):
+    registry = StructureRegistry(structures_dir, memory_budget=1)
+    coche = registry["mid_coche"]
+    coche.get_voxels()
+    ovni = registry["small_ovni"]
+    ovni.get_voxels()
+
+    registry["vsmall_bloque5x4"]
+    # Se descarta la usada hace más tiempo; la pedida ahora se conserva
+    assert "mid_coche" not in registry._loaded
+    assert "vsmall_bloque5x4" in registry._loaded
+    assert registry.evictions >= 1
+    assert registry["mid_coche"] is not coche # Se vuelve a cargar al pedirla
+
+def test_detects_new_changed_and_removed_files(structures_dir):
+    registry = StructureRegistry(structures_dir)
+    ovni = registry["small_ovni"]
+
+    shutil.copy(os.path.join(STRUCTURES, "small_coche.schem"), os.path.join(structures_dir, "small_coche.schem"))
+    os.remove(os.path.join(structures_dir, "mid_coche.schem"))
+    path = os.path.join(structures_dir, "small_ovni.schem")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    added, changed, removed = registry.refresh()
+    assert (added, changed, removed) == (["small_coche"], ["small_ovni"], ["mid_coche"])
+    assert registry["small_ovni"] is not ovni
+
+@pytest.mark.asyncio
+async def test_watching(structures_dir):
+    registry = StructureRegistry(structures_dir)
+    registry.names()
+    registry.start_watching(interval=0.01)
+    shutil.copy(os.path.join(STRUCTURES, "small_coche.schem"), os.path.join(structures_dir, "small_coche.schem"))
+    await asyncio.sleep(0.05)
+    assert "small_coche" in registry._files
+    await registry.close()
+
+def test_shared_registry_per_directory(structures_dir):
+    assert get_structure_registry(structures_dir) is get_structure_registry(structures_dir + os.sep)
@@ -0,0 +1,50 @@
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from messages.topics import TopicTrie, is_pattern
+
+@pytest.fixture
+def trie():
+    t = TopicTrie()
+    for pattern, value in [("command.*.v1", "commands"), ("command.stop.v1", "stop"),
+                           ("region.#", "region"), ("a.#.c", "a_c"), ("map.v1", "map")]:
+        t.add(pattern, value)
+    return t
+
+@pytest.mark.parametrize("topic, expected", [
+    ("command.stop.v1", {"commands", "stop"}),
+    ("command.plan.v1", {"commands"}),
+    ("command.workflow.run", set()), # '*' es exactamente un segmento
+    ("region", {"region"}),          # '#' admite cero segmentos
+    ("region.lock.v1", {"region"}),
+    ("a.c", {"a_c"}),
+    ("a.x.y.c", {"a_c"}),
+    ("a.x.c.d", set()),
+    ("map.v1", {"map"}),
+    ("map.v2", set()),
+])
+def test_match(trie, topic, expected):
+    assert trie.match(topic) == expected
+
+def test_catch_all_and_chained_hashes():
+    t = TopicTrie()
+    t.add("#", "all")
+    t.add("x.#.#", "x")
+    assert t.match("anything.at.all") == {"all"}
+    assert t.match("x") == {"all", "x"}
+
+def test_remove_prunes_empty_branches(trie):
+    trie.remove("command.stop.v1", "stop")
+    assert trie.match("command.stop.v1") == {"commands"}
+    assert "stop" not in trie._root.children["command"].children
+
+    trie.remove("a.#.c", "a_c")
+    assert "a" not in trie._root.children
+    trie.remove("missing.topic", "x") # No falla
+
+def test_is_pattern():
+    assert is_pattern("command.*.v1") and is_pattern("region.#")
+    assert not is_pattern("map.v1")
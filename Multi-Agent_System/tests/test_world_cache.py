@@ -0,0 +1,107 @@
+import pytest
+import numpy as np
+import sys
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from utils.world_cache import WorldCache
+from mcpi.event import BlockEvent
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def fake_mc():
+    """Mundo en el que el id de cada bloque es (x + y + z) % 5."""
+    mc = AsyncMock()
+
+    def get_blocks_array(x0, y0, z0, x1, y1, z1):
+        y, z, x = np.mgrid[y0:y1 + 1, z0:z1 + 1, x0:x1 + 1]
+        return ((x + y + z) % 5).astype(np.uint16)
+    mc.getBlocksArray.side_effect = get_blocks_array
+    mc.events.pollBlockHits.return_value = []
+    return mc
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def cache(clock):
+    # Presupuesto para dos chunks de uint16
+    return WorldCache(fake_mc(), ttl=5.0, max_bytes=2 * 16 * 16 * 16 * 2, clock=clock)
+
+@pytest.mark.asyncio
+async def test_reads_served_from_chunk(cache):
+    assert await cache.getBlock(1, 2, 3) == 1
+    assert await cache.getBlock(15, 15, 15) == 0
+    assert await cache.getBlock(-1, 0, 0) == 4
+
+    # Dos chunks distintos -> dos getBlocks, el resto son aciertos
+    assert cache.mc.getBlocksArray.call_count == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+    cache.mc.getBlocksArray.assert_any_call(0, 0, 0, 15, 15, 15)
+    cache.mc.getBlocksArray.assert_any_call(-16, 0, 0, -1, 15, 15)
+
+@pytest.mark.asyncio
+async def test_write_through(cache):
+    await cache.getBlock(0, 0, 0)
+
+    await cache.setBlock(1, 1, 1, 0)
+    await cache.setBlocks(2, 2, 2, 20, 3, 3, 7)
+
+    cache.mc.setBlock.assert_called_once_with(1, 1, 1, 0)
+    cache.mc.setBlocks.assert_called_once_with(2, 2, 2, 20, 3, 3, 7)
+    assert await cache.getBlock(1, 1, 1) == 0
+    assert await cache.getBlock(15, 3, 2) == 7
+    assert await cache.getBlock(4, 4, 4) == 2 # Fuera del cuboide
+    assert cache.mc.getBlocksArray.call_count == 1
+
+@pytest.mark.asyncio
+async def test_ttl_expiry(cache, clock):
+    await cache.getBlock(0, 0, 0)
+    clock.now = 6.0
+    await cache.getBlock(0, 0, 0)
+    assert cache.mc.getBlocksArray.call_count == 2
+
+@pytest.mark.asyncio
+async def test_lru_cap(cache):
+    await cache.getBlock(0, 0, 0)
+    await cache.getBlock(16, 0, 0)
+    await cache.getBlock(0, 0, 0) # El chunk 0 pasa a ser el más reciente
+    await cache.getBlock(32, 0, 0) # Expulsa el chunk 16
+
+    assert len(cache._chunks) == 2
+    assert cache.memory_bytes == 2 * 16 * 16 * 16 * 2
+    await cache.getBlock(0, 0, 0)
+    assert cache.mc.getBlocksArray.call_count == 3
+
+    cache.invalidate(0, 0, 0)
+    assert cache.memory_bytes == 16 * 16 * 16 * 2 <= cache.max_bytes
+
+@pytest.mark.asyncio
+async def test_negative_fractional_coordinates_floor(cache):
+    # -0.5 es el bloque -1 (chunk -1), no el 0 como daría int()
+    assert await cache.getBlock(-0.5, 2.7, 3) == (-1 + 2 + 3) % 5
+    cache.mc.getBlocksArray.assert_called_once_with(-16, 0, 0, -1, 15, 15)
+
+    await cache.setBlock(-1.5, 0.9, 0, 9)
+    assert await cache.getBlock(-2, 0, 0) == 9 # Mismo bloque: x=-2, y=0
+    assert cache.mc.getBlocksArray.call_count == 1
+
+@pytest.mark.asyncio
+async def test_block_hits_invalidate(cache, clock):
+    await cache.getBlock(0, 0, 0)
+    cache.mc.events.pollBlockHits.return_value = [BlockEvent.Hit(3, 3, 3, 1, 7)]
+    clock.now = 1.0
+
+    await cache.getBlock(0, 0, 0)
+    assert cache.mc.getBlocksArray.call_count == 2
+
+def test_delegates_other_calls(cache):
+    assert cache.player is cache.mc.player
@@ -0,0 +1,102 @@
+import pytest
+import asyncio
+import sys
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from utils.world_scheduler import (WorldScheduler, TokenBucket, ScheduledSession, classify,
+                                   INTERACTIVE, PERCEPTION, BULK)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_classify():
+    assert classify("postToChat") == INTERACTIVE
+    assert classify("events.pollChatPosts") == INTERACTIVE
+    assert classify("player.setTilePos") == INTERACTIVE
+    assert classify("getHeight") == PERCEPTION
+    assert classify("player.getTilePos") == PERCEPTION
+    assert classify("setBlocks") == BULK
+
+def test_token_bucket():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock)
+    bucket.take()
+    bucket.take()
+    assert bucket.delay() == pytest.approx(0.1)
+
+    clock.now = 1.0 # Se recarga hasta la ráfaga máxima
+    assert bucket.delay() == 0
+    assert bucket.tokens == 2
+
+@pytest.mark.asyncio
+async def test_priority_and_fair_queuing():
+    scheduler = WorldScheduler(rate=1000, burst=1)
+    await scheduler.acquire("warmup", BULK) # Agota la ráfaga para forzar la cola
+    order = []
+
+    async def request(agent, priority, tag):
+        await scheduler.acquire(agent, priority)
+        order.append(tag)
+
+    tasks = [asyncio.create_task(request(*r)) for r in [
+        ("Builder", BULK, "b1"), ("Builder", BULK, "b2"), ("Builder", BULK, "b3"),
+        ("Miner", BULK, "m1"),
+        ("Explorer", PERCEPTION, "e1"),
+        ("Builder", INTERACTIVE, "chat"),
+    ]]
+    await asyncio.gather(*tasks)
+    await scheduler.close()
+
+    assert order[:2] == ["chat", "e1"]
+    # Turnos alternos entre agentes de la misma clase
+    assert order[2:] == ["b1", "m1", "b2", "b3"]
+    assert scheduler.granted == {INTERACTIVE: 1, PERCEPTION: 1, BULK: 5}
+
+@pytest.mark.asyncio
+async def test_rate_limit():
+    scheduler = WorldScheduler(rate=100, burst=1)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    for _ in range(6):
+        await scheduler.acquire("Builder", BULK)
+
+    # 1 token inicial + 5 a 100/s -> al menos ~50 ms
+    assert loop.time() - start >= 0.04
+    await scheduler.close()
+
+@pytest.mark.asyncio
+async def test_cancelled_request_is_skipped():
+    scheduler = WorldScheduler(rate=50, burst=1)
+    await scheduler.acquire("Builder", BULK)
+
+    cancelled = asyncio.create_task(scheduler.acquire("Builder", BULK))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    await asyncio.wait_for(scheduler.acquire("Miner", BULK), timeout=1)
+    assert scheduler.granted[BULK] == 2
+    await scheduler.close()
+
+@pytest.mark.asyncio
+async def test_scheduled_session_routes_calls():
+    mc = AsyncMock()
+    mc.getHeight.return_value = 63
+    scheduler = WorldScheduler()
+    session = scheduler.session("Explorer", mc)
+
+    assert await session.getHeight(1, 2) == 63
+    await session.player.getTilePos()
+    await session.setBlock(0, 0, 0, 1)
+
+    mc.getHeight.assert_called_once_with(1, 2)
+    mc.player.getTilePos.assert_called_once()
+    assert scheduler.granted == {INTERACTIVE: 0, PERCEPTION: 2, BULK: 1}
+    assert isinstance(session, ScheduledSession)
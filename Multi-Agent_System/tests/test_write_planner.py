@@ -0,0 +1,68 @@
+import pytest
+import sys
+import os
+from unittest.mock import AsyncMock, call
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from utils.write_planner import WritePlanner, plan_cuboids
+
+def covered_cells(cuboids):
+    """Expande los cuboides a {(x, y, z): (id, data)} para comparar con la entrada."""
+    cells = {}
+    for (x0, y0, z0, x1, y1, z1, bid, data) in cuboids:
+        for x in range(x0, x1 + 1):
+            for y in range(y0, y1 + 1):
+                for z in range(z0, z1 + 1):
+                    assert (x, y, z) not in cells # Sin solapes
+                    cells[(x, y, z)] = (bid, data)
+    return cells
+
+class TestWritePlanner:
+
+    def test_solid_block_single_cuboid(self):
+        writes = [(x, y, z, 1) for x in range(5) for y in range(4) for z in range(3)]
+        cuboids = plan_cuboids(writes)
+        assert cuboids == [(0, 0, 0, 4, 3, 2, 1, 0)]
+
+    def test_single_cell(self):
+        assert plan_cuboids([(7, 8, 9, 35, 4)]) == [(7, 8, 9, 7, 8, 9, 35, 4)]
+
+    def test_mixed_blocks_cover_exactly(self):
+        writes = []
+        for x in range(6):
+            for z in range(6):
+                writes.append((x, 0, z, 1 if x < 3 else 2))
+                writes.append((x, 1, z, 5, 1 if z % 2 else 0))
+        cuboids = plan_cuboids(writes)
+
+        expected = {}
+        for w in writes:
+            expected[w[:3]] = (w[3], w[4] if len(w) > 4 else 0)
+        assert covered_cells(cuboids) == expected
+        assert len(cuboids) < len(writes) // 4
+
+    def test_last_write_wins(self):
+        planner = WritePlanner()
+        planner.add(0, 0, 0, 1)
+        planner.add(0, 0, 0, 0)
+        assert len(planner) == 1
+        assert planner.plan() == [(0, 0, 0, 0, 0, 0, 0, 0)]
+
+    def test_cuboids_sorted_by_layer(self):
+        writes = [(0, 2, 0, 1), (5, 0, 5, 3), (1, 1, 1, 2)]
+        layers = [c[1] for c in plan_cuboids(writes)]
+        assert layers == sorted(layers)
+
+    @pytest.mark.asyncio
+    async def test_apply_uses_set_blocks(self):
+        mc = AsyncMock()
+        planner = WritePlanner()
+        planner.add_many([(0, 0, 0, 35, 3), (1, 0, 0, 35, 3), (5, 5, 5, 1)])
+
+        sent = await planner.apply(mc)
+
+        assert sent == 2
+        mc.setBlocks.assert_called_once_with(0, 0, 0, 1, 0, 0, 35, 3)
+        mc.setBlock.assert_called_once_with(5, 5, 5, 1)
+        assert len(planner) == 0